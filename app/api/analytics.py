@@ -4,6 +4,11 @@ Analytics API — "The Lens"
 Phase 1: /summary, /drill
 Phase 2: /decompose, /compare — built on shared filter + aggregation core
 Phase 3: /signals — rolling-window anomaly detection (z-score, no ML)
+         /signals/multi — vectorized multi-window + same-weekday baselines
+Export:  /export — filtered orders / order_items as CSV, Parquet or Arrow
+
+Aggregations run on the DuckDB snapshot (app/services/lens_olap.py) when
+LENS_OLAP_ENABLED, and on Postgres otherwise or whenever it can't answer.
 
 Recommended indexes (run once in Supabase SQL editor):
     CREATE INDEX IF NOT EXISTS idx_orders_created_status
@@ -15,17 +20,24 @@ Recommended indexes (run once in Supabase SQL editor):
 """
 
 import statistics as _stats
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import text, extract as _sa_extract
-from typing import Any, Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from sqlalchemy import extract as _sa_extract
+from functools import lru_cache
+from typing import Any, Callable, NamedTuple, Optional, List
 from datetime import date, datetime, timedelta
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core import query_templates
+from app.core.database import get_analytics_db
 from app.core.tenant import get_tenant_id
-from app.models.order import Order, Table, OrderStatus
+from app.models.order import Order, OrderItem, Table, OrderStatus
+from app.services import lens_export, lens_olap, sampling, signal_detector
 
 router = APIRouter()
 
@@ -43,6 +55,10 @@ class AnalyticsFilter(BaseModel):
     table_id: Optional[int] = None
     category_id: Optional[int] = None  # narrows to items in this category
     item_id: Optional[int] = None      # narrows to a specific item
+    # Estimate from a sample of orders instead of scanning them all; responses
+    # then carry an `approximation` block with 95% error margins.
+    approximate: bool = False
+    sample_pct: Optional[float] = None  # default LENS_APPROX_SAMPLE_PCT
 
 
 def parse_filter(
@@ -53,6 +69,8 @@ def parse_filter(
     table_id: Optional[int] = Query(None),
     category_id: Optional[int] = Query(None),
     item_id: Optional[int] = Query(None),
+    approximate: bool = Query(False),
+    sample_pct: Optional[float] = Query(None, gt=0, le=100),
 ) -> AnalyticsFilter:
     return AnalyticsFilter(
         start_date=start_date,
@@ -62,6 +80,8 @@ def parse_filter(
         table_id=table_id,
         category_id=category_id,
         item_id=item_id,
+        approximate=approximate,
+        sample_pct=sample_pct,
     )
 
 
@@ -69,6 +89,21 @@ def parse_filter(
 # Compiled filter conditions (SQL fragments + bound params)
 # ---------------------------------------------------------------------------
 
+class FilterShape(NamedTuple):
+    """
+    The SQL half of FilterConditions — everything except the bound values.
+    Hashable, so query builders can cache one compiled statement per shape.
+    """
+    order_clause: str
+    item_clause: str
+    needs_items_join: bool
+    orders_from: str = "orders o"
+
+    @property
+    def sampled(self) -> bool:
+        return self.orders_from != "orders o"
+
+
 @dataclass
 class FilterConditions:
     """
@@ -81,11 +116,25 @@ class FilterConditions:
                     are active. Must only be included when those joins exist.
     params        — SQLAlchemy bind params dict for this filter.
     needs_items_join — True when item_clause is non-empty.
+    orders_from   — FROM source for orders: the table, or a TABLESAMPLE of
+                    it in approximate mode.
+    sample_fraction — share of orders sampled (None = exact).
     """
     order_clause: str
     item_clause: str
     params: dict
     needs_items_join: bool
+    orders_from: str = "orders o"
+    sample_fraction: Optional[float] = None
+
+    @property
+    def shape(self) -> FilterShape:
+        return FilterShape(self.order_clause, self.item_clause, self.needs_items_join, self.orders_from)
+
+
+# Fixed seed: the same filter samples the same orders, so an approximate
+# chart doesn't jitter on reload.
+_SAMPLE_SEED = 42
 
 
 def build_conditions(f: AnalyticsFilter, tenant_id: int) -> FilterConditions:
@@ -138,12 +187,24 @@ def build_conditions(f: AnalyticsFilter, tenant_id: int) -> FilterConditions:
         item_parts.append("oi.menu_item_id = :item_id")
         params["item_id"] = f.item_id
 
+    # Approximate mode: Bernoulli row sample of orders (all lines of each
+    # sampled order come along through the joins).  The percentage is part of
+    # the SQL, not a bind, so it is rounded to keep the statement cache small.
+    orders_from, sample_fraction = "orders o", None
+    if f.approximate:
+        pct = round(min(max(f.sample_pct or settings.LENS_APPROX_SAMPLE_PCT, 0.1), 100.0), 1)
+        if pct < 100:
+            orders_from = f"orders o TABLESAMPLE BERNOULLI ({pct:g}) REPEATABLE ({_SAMPLE_SEED})"
+            sample_fraction = pct / 100
+
     item_clause = (" AND " + " AND ".join(item_parts)) if item_parts else ""
     return FilterConditions(
         order_clause=" AND ".join(order_parts),
         item_clause=item_clause,
         params=params,
         needs_items_join=bool(item_parts),
+        orders_from=orders_from,
+        sample_fraction=sample_fraction,
     )
 
 
@@ -156,6 +217,21 @@ class SummaryGroup(BaseModel):
     order_count: int
     total_revenue: float
     avg_order_value: float
+    # Approximate mode only: 95% margins as a fraction of the estimate
+    order_count_error: Optional[float] = None
+    revenue_error: Optional[float] = None
+
+
+class Approximation(BaseModel):
+    """How an approximate response was estimated (see app/services/sampling.py)."""
+    method: str = "bernoulli_sample"
+    sample_pct: float
+    sampled_orders: int
+    order_value_cv: float  # spread of order totals in the sample
+    # 95% margins of the window totals, as a fraction of the estimate
+    order_count_error: Optional[float] = None
+    revenue_error: Optional[float] = None
+    avg_order_value_error: Optional[float] = None
 
 
 class SummaryResponse(BaseModel):
@@ -163,6 +239,7 @@ class SummaryResponse(BaseModel):
     order_count: int
     avg_order_value: float
     groups: Optional[List[SummaryGroup]] = None
+    approximation: Optional[Approximation] = None
 
 
 class DrillRow(BaseModel):
@@ -172,6 +249,8 @@ class DrillRow(BaseModel):
     # Generic metadata bag — contains drillable IDs (item_id, category_id, etc.)
     # Frontend reads this to determine what filter to push when a row is clicked.
     metadata: dict[str, Any] = field(default_factory=dict)
+    # Approximate mode only: 95% margin of `value`, as a fraction of it
+    error: Optional[float] = None
 
     class Config:
         # pydantic v1 compat
@@ -183,6 +262,7 @@ class DrillResponse(BaseModel):
     dimension: str
     rows: List[DrillRow]
     total: float
+    approximation: Optional[Approximation] = None
 
 
 class CompareRow(BaseModel):
@@ -280,6 +360,59 @@ def _pick_metric_and_join(
     return _order_metric_expr(metric), ""
 
 
+# ---------------------------------------------------------------------------
+# Parallel sub-queries (compare A/B, totals + breakdown)
+# ---------------------------------------------------------------------------
+
+_pool_lock = threading.Lock()
+_query_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_query_pool() -> ThreadPoolExecutor:
+    global _query_pool
+    if _query_pool is not None:
+        return _query_pool
+    with _pool_lock:
+        if _query_pool is None:
+            _query_pool = ThreadPoolExecutor(
+                max_workers=settings.ANALYTICS_QUERY_WORKERS,
+                thread_name_prefix="analytics-query",
+            )
+        return _query_pool
+
+
+def shutdown_query_pool() -> None:
+    """Stop the sub-query pool (called on app shutdown)."""
+    global _query_pool
+    with _pool_lock:
+        pool, _query_pool = _query_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_parallel(db: Session, *calls: tuple) -> list:
+    """
+    Run independent read-only queries concurrently and return their results
+    in call order.
+
+    Each call is (fn, *args) and fn takes a Session first.  Every call gets
+    its own short-lived Session on db's engine, so each runs on a separate
+    pooled connection and the request waits for the slowest query instead of
+    the sum.  With ANALYTICS_QUERY_WORKERS <= 1 everything runs on `db`.
+    """
+    if settings.ANALYTICS_QUERY_WORKERS <= 1 or len(calls) < 2:
+        return [fn(db, *args) for fn, *args in calls]
+
+    bind = db.get_bind()
+
+    def run(fn, *args):
+        with Session(bind=bind) as session:
+            return fn(session, *args)
+
+    futures = [_get_query_pool().submit(run, *call) for call in calls]
+    return [future.result() for future in futures]
+
+
 # ---------------------------------------------------------------------------
 # GET /analytics/summary
 # ---------------------------------------------------------------------------
@@ -288,7 +421,7 @@ def _pick_metric_and_join(
 def get_analytics_summary(
     group_by: Optional[str] = Query(None),
     f: AnalyticsFilter = Depends(parse_filter),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
     """
@@ -297,30 +430,188 @@ def get_analytics_summary(
     """
     fc = build_conditions(f, tenant_id)
 
-    totals_row = db.execute(
-        text(f"""
+    if group_by and group_by in VALID_GROUP_BYS:
+        totals, groups = _summary_and_groups(db, group_by, fc)
+        totals.groups = groups
+        return totals
+    return _summary_totals(db, fc)
+
+
+def _execute(db: Session, sql: str, params: dict):
+    """Run a Lens aggregation on the columnar snapshot when enabled, else on `db`."""
+    result = lens_olap.execute(sql, params)
+    if result is None:
+        result = query_templates.execute(db, sql, params)
+    return result
+
+
+def _sample_columns(fc: FilterShape) -> str:
+    """Σ order_total² alongside the totals of a sampled query, for its error margins."""
+    return "COALESCE(SUM(o.total_amount * o.total_amount), 0) AS revenue_sq," if fc.sampled else ""
+
+
+@lru_cache(maxsize=256)
+def _totals_sql(fc: FilterShape) -> str:
+    return f"""
             SELECT
+                {_sample_columns(fc)}
                 COUNT(*)                          AS order_count,
                 COALESCE(SUM(o.total_amount), 0)  AS total_revenue,
                 COALESCE(AVG(o.total_amount), 0)  AS avg_order_value
-            FROM orders o
+            FROM {fc.orders_from}
             WHERE {fc.order_clause}
-        """),
-        fc.params,
-    ).fetchone()
+        """
 
-    groups: Optional[List[SummaryGroup]] = None
-    if group_by and group_by in VALID_GROUP_BYS:
-        groups = _grouped_summary(db, group_by, fc)
 
-    return SummaryResponse(
-        total_revenue=float(totals_row.total_revenue),
-        order_count=int(totals_row.order_count),
-        avg_order_value=float(totals_row.avg_order_value),
-        groups=groups,
+def _summary_totals(db: Session, fc: FilterConditions) -> SummaryResponse:
+    """Window totals shared by /summary and /decompose."""
+    totals_row = _execute(db, _totals_sql(fc.shape), fc.params).fetchone()
+    return _totals_response(totals_row, fc)
+
+
+def _totals_response(row: Any, fc: FilterConditions) -> SummaryResponse:
+    """SummaryResponse from a totals row — scaled up, with margins, when sampled."""
+    if row is None:
+        return SummaryResponse(total_revenue=0.0, order_count=0, avg_order_value=0.0)
+    totals = SummaryResponse(
+        total_revenue=float(row.total_revenue),
+        order_count=int(row.order_count),
+        avg_order_value=float(row.avg_order_value),
+    )
+    p = fc.sample_fraction
+    if p is None:
+        return totals
+
+    n = totals.order_count
+    cv = sampling.order_value_cv(n, totals.total_revenue, float(row.revenue_sq))
+    totals.approximation = Approximation(
+        sample_pct=round(p * 100, 1),
+        sampled_orders=n,
+        order_value_cv=round(cv, 4),
+        order_count_error=sampling.count_error(n, p),
+        revenue_error=sampling.sum_error(n, p, cv),
+        avg_order_value_error=sampling.mean_error(n, cv),
+    )
+    totals.order_count = round(sampling.scale(n, p))
+    totals.total_revenue = sampling.scale(totals.total_revenue, p)
+    return totals
+
+
+def _approximate_groups(groups: List[SummaryGroup], totals: SummaryResponse, fc: FilterConditions) -> List[SummaryGroup]:
+    """Scale sampled breakdown rows up to the window and attach their margins."""
+    p, approx = fc.sample_fraction, totals.approximation
+    if p is None or approx is None:
+        return groups
+    for g in groups:
+        n = g.order_count
+        g.order_count_error = sampling.count_error(n, p)
+        g.revenue_error = sampling.sum_error(n, p, approx.order_value_cv)
+        g.order_count = round(sampling.scale(n, p))
+        g.total_revenue = sampling.scale(g.total_revenue, p)
+    return groups
+
+
+# Breakdowns that only read the orders table:
+#   group_by → (label expression, GROUP BY expressions, ORDER BY expression)
+# Their metrics match the totals query exactly, so both can come from one scan.
+# day / day_of_week need the order_items join (and can't share the scan) when
+# item filters are active.
+_ORDER_LEVEL_GROUPS: dict[str, tuple[str, str, str]] = {
+    "day": (
+        "TO_CHAR(DATE(o.created_at), 'YYYY-MM-DD')",
+        "DATE(o.created_at)",
+        "DATE(o.created_at)",
+    ),
+    "week": (
+        "TO_CHAR(DATE_TRUNC('week', o.created_at), 'YYYY-MM-DD')",
+        "DATE_TRUNC('week', o.created_at)",
+        "DATE_TRUNC('week', o.created_at)",
+    ),
+    "day_of_week": (
+        "TO_CHAR(o.created_at, 'Dy')",
+        "EXTRACT(DOW FROM o.created_at), TO_CHAR(o.created_at, 'Dy')",
+        "EXTRACT(DOW FROM o.created_at)",
+    ),
+    "hour": (
+        "TO_CHAR(o.created_at, 'HH24')",
+        "TO_CHAR(o.created_at, 'HH24')",
+        "TO_CHAR(o.created_at, 'HH24')::int",
+    ),
+    "order_type": (
+        "CASE WHEN o.ayce_order THEN 'AYCE' ELSE 'Regular' END",
+        "o.ayce_order",
+        "total_revenue DESC",
+    ),
+}
+
+
+def _single_pass(group_by: str, fc: FilterShape) -> bool:
+    """True when totals + this breakdown can share one scan of orders."""
+    if group_by not in _ORDER_LEVEL_GROUPS:
+        return False
+    return not (fc.needs_items_join and group_by in ("day", "day_of_week"))
+
+
+@lru_cache(maxsize=256)
+def _order_level_group_sql(group_by: str, fc: FilterShape, with_totals: bool = False) -> str:
+    """
+    GROUP BY query for an orders-only breakdown.
+
+    with_totals groups by GROUPING SETS ((key), ()) instead: the empty set adds
+    the window totals as one extra row (is_total, sorted last) computed in the
+    same scan — the same numbers _summary_totals would return.
+    """
+    label, group_exprs, order = _ORDER_LEVEL_GROUPS[group_by]
+    if with_totals:
+        is_total = f"GROUPING({group_exprs}) > 0"
+        grouping = f"GROUPING SETS (({group_exprs}), ())"
+        order = f"is_total, {order}"
+        extra = f"{is_total} AS is_total, {_sample_columns(fc)}"
+    else:
+        grouping = group_exprs
+        extra = ""
+    return f"""
+            SELECT
+                {extra}
+                {label}                           AS group_key,
+                COUNT(*)                          AS order_count,
+                COALESCE(SUM(o.total_amount), 0)  AS total_revenue,
+                COALESCE(AVG(o.total_amount), 0)  AS avg_order_value
+            FROM {fc.orders_from}
+            WHERE {fc.order_clause}
+            GROUP BY {grouping}
+            ORDER BY {order}
+        """
+
+
+def _summary_group(r: Any) -> SummaryGroup:
+    return SummaryGroup(
+        group_key=str(r.group_key).strip(),
+        order_count=int(r.order_count),
+        total_revenue=float(r.total_revenue),
+        avg_order_value=float(r.avg_order_value),
     )
 
 
+def _summary_and_groups(
+    db: Session, group_by: str, fc: FilterConditions
+) -> tuple[SummaryResponse, List[SummaryGroup]]:
+    """
+    Window totals plus a breakdown.  Orders-only breakdowns come back from a
+    single GROUPING SETS statement (one scan); joined ones (item, category,
+    item-filtered day/day_of_week) run as two queries in parallel.
+    """
+    if not _single_pass(group_by, fc):
+        totals, groups = _run_parallel(db, (_summary_totals, fc), (_grouped_summary, group_by, fc))
+        return totals, _approximate_groups(groups, totals, fc)
+
+    sql = _order_level_group_sql(group_by, fc.shape, with_totals=True)
+    rows = _execute(db, sql, fc.params).fetchall()
+    totals = _totals_response(next((r for r in rows if r.is_total), None), fc)
+    groups = [_summary_group(r) for r in rows if not r.is_total]
+    return totals, _approximate_groups(groups, totals, fc)
+
+
 def _grouped_summary(
     db: Session, group_by: str, fc: FilterConditions
 ) -> List[SummaryGroup]:
@@ -330,83 +621,51 @@ def _grouped_summary(
     Time/type dimensions use order-level metrics; joins are added when
     item filters are active so those filters are still applied.
     """
+    sql = _grouped_sql(group_by, fc.shape)
+    if sql is None:
+        return []
+    rows = _execute(db, sql, fc.params).fetchall()
+    return [_summary_group(r) for r in rows]
+
+
+@lru_cache(maxsize=256)
+def _grouped_sql(group_by: str, fc: FilterShape) -> Optional[str]:
     needs_join = group_by in ("item", "category") or fc.needs_items_join
     item_filter = fc.item_clause if needs_join else ""
 
+    if _single_pass(group_by, fc):
+        return _order_level_group_sql(group_by, fc)
+
     if group_by == "day":
-        join = (
-            "JOIN order_items oi ON oi.order_id = o.id JOIN menu_items mi ON mi.id = oi.menu_item_id"
-            if needs_join else ""
-        )
-        rev = _item_metric_expr("revenue") if needs_join else _order_metric_expr("revenue")
         sql = f"""
             SELECT
                 TO_CHAR(DATE(o.created_at), 'YYYY-MM-DD') AS group_key,
                 COUNT(DISTINCT o.id)                      AS order_count,
-                {rev}                                     AS total_revenue,
+                {_item_metric_expr("revenue")}            AS total_revenue,
                 COALESCE(AVG(o.total_amount), 0)          AS avg_order_value
-            FROM orders o {join}
+            FROM {fc.orders_from}
+            JOIN order_items oi ON oi.order_id = o.id
+            JOIN menu_items  mi ON mi.id = oi.menu_item_id
             WHERE {fc.order_clause} {item_filter}
             GROUP BY DATE(o.created_at)
             ORDER BY DATE(o.created_at)
         """
 
-    elif group_by == "week":
-        sql = f"""
-            SELECT
-                TO_CHAR(DATE_TRUNC('week', o.created_at), 'YYYY-MM-DD') AS group_key,
-                COUNT(*)                                                  AS order_count,
-                COALESCE(SUM(o.total_amount), 0)                         AS total_revenue,
-                COALESCE(AVG(o.total_amount), 0)                         AS avg_order_value
-            FROM orders o
-            WHERE {fc.order_clause}
-            GROUP BY DATE_TRUNC('week', o.created_at)
-            ORDER BY DATE_TRUNC('week', o.created_at)
-        """
-
     elif group_by == "day_of_week":
-        join = (
-            "JOIN order_items oi ON oi.order_id = o.id JOIN menu_items mi ON mi.id = oi.menu_item_id"
-            if needs_join else ""
-        )
         sql = f"""
             SELECT
                 TO_CHAR(o.created_at, 'Dy')  AS group_key,
                 COUNT(DISTINCT o.id)         AS order_count,
                 COALESCE(SUM(o.total_amount), 0) AS total_revenue,
                 COALESCE(AVG(o.total_amount), 0) AS avg_order_value
-            FROM orders o {join}
+            FROM {fc.orders_from}
+            JOIN order_items oi ON oi.order_id = o.id
+            JOIN menu_items  mi ON mi.id = oi.menu_item_id
             WHERE {fc.order_clause} {item_filter}
             GROUP BY EXTRACT(DOW FROM o.created_at), TO_CHAR(o.created_at, 'Dy')
             ORDER BY EXTRACT(DOW FROM o.created_at)
         """
 
-    elif group_by == "hour":
-        sql = f"""
-            SELECT
-                TO_CHAR(o.created_at, 'HH24') AS group_key,
-                COUNT(*)                                AS order_count,
-                COALESCE(SUM(o.total_amount), 0)        AS total_revenue,
-                COALESCE(AVG(o.total_amount), 0)        AS avg_order_value
-            FROM orders o
-            WHERE {fc.order_clause}
-            GROUP BY TO_CHAR(o.created_at, 'HH24')
-            ORDER BY TO_CHAR(o.created_at, 'HH24')::int
-        """
-
-    elif group_by == "order_type":
-        sql = f"""
-            SELECT
-                CASE WHEN o.ayce_order THEN 'AYCE' ELSE 'Regular' END AS group_key,
-                COUNT(*)                               AS order_count,
-                COALESCE(SUM(o.total_amount), 0)       AS total_revenue,
-                COALESCE(AVG(o.total_amount), 0)       AS avg_order_value
-            FROM orders o
-            WHERE {fc.order_clause}
-            GROUP BY o.ayce_order
-            ORDER BY total_revenue DESC
-        """
-
     elif group_by == "item":
         sql = f"""
             SELECT
@@ -414,7 +673,7 @@ def _grouped_summary(
                 COUNT(DISTINCT o.id)                          AS order_count,
                 COALESCE(SUM(oi.quantity * oi.unit_price), 0) AS total_revenue,
                 COALESCE(AVG(oi.unit_price), 0)               AS avg_order_value
-            FROM orders o
+            FROM {fc.orders_from}
             JOIN order_items oi ON oi.order_id = o.id
             JOIN menu_items  mi ON mi.id = oi.menu_item_id
             WHERE {fc.order_clause} {fc.item_clause}
@@ -430,7 +689,7 @@ def _grouped_summary(
                 COUNT(DISTINCT o.id)                          AS order_count,
                 COALESCE(SUM(oi.quantity * oi.unit_price), 0) AS total_revenue,
                 COALESCE(AVG(oi.unit_price), 0)               AS avg_order_value
-            FROM orders o
+            FROM {fc.orders_from}
             JOIN order_items oi ON oi.order_id = o.id
             JOIN menu_items  mi ON mi.id = oi.menu_item_id
             LEFT JOIN categories c ON c.id = mi.category_id
@@ -440,18 +699,8 @@ def _grouped_summary(
         """
 
     else:
-        return []
-
-    rows = db.execute(text(sql), fc.params).fetchall()
-    return [
-        SummaryGroup(
-            group_key=str(r.group_key).strip(),
-            order_count=int(r.order_count),
-            total_revenue=float(r.total_revenue),
-            avg_order_value=float(r.avg_order_value),
-        )
-        for r in rows
-    ]
+        return None
+    return sql
 
 
 # ---------------------------------------------------------------------------
@@ -463,7 +712,7 @@ def get_analytics_drill(
     metric: str = Query("revenue"),
     dimension: str = Query("category"),
     f: AnalyticsFilter = Depends(parse_filter),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
     """
@@ -476,8 +725,38 @@ def get_analytics_drill(
         dimension = "category"
 
     fc = build_conditions(f, tenant_id)
-    rows, total = _drill_query(db, dimension, metric, fc)
-    return DrillResponse(metric=metric, dimension=dimension, rows=rows, total=total)
+    if fc.sample_fraction is None:
+        rows, total = _drill_query(db, dimension, metric, fc)
+        return DrillResponse(metric=metric, dimension=dimension, rows=rows, total=total)
+
+    # Sampled: the window totals supply the sample size and order-value
+    # spread behind each row's margin.
+    (rows, total), totals = _run_parallel(db, (_drill_query, dimension, metric, fc), (_summary_totals, fc))
+    rows, total = _approximate_drill(rows, total, metric, totals, fc)
+    return DrillResponse(
+        metric=metric, dimension=dimension, rows=rows, total=total, approximation=totals.approximation
+    )
+
+
+def _approximate_drill(
+    rows: List[DrillRow], total: float, metric: str, totals: SummaryResponse, fc: FilterConditions
+) -> tuple[List[DrillRow], float]:
+    """Scale sampled drill rows up to the window and attach their margins."""
+    p, approx = fc.sample_fraction, totals.approximation
+    if p is None or approx is None:
+        return rows, total
+    for r in rows:
+        n = r.order_count
+        if metric == "avg_order_value":
+            r.error = sampling.mean_error(n, approx.order_value_cv)
+        else:
+            r.error = (sampling.count_error(n, p) if metric == "order_count"
+                       else sampling.sum_error(n, p, approx.order_value_cv))
+            r.value = sampling.scale(r.value, p)
+        r.order_count = round(sampling.scale(n, p))
+    if metric != "avg_order_value":
+        total = sampling.scale(total, p)
+    return rows, total
 
 
 def _drill_query(
@@ -494,6 +773,37 @@ def _drill_query(
     for the frontend to determine drillability and accumulate filters.
     """
 
+    sql = _drill_sql(dimension, metric, fc.shape)
+    if sql is None:
+        return [], 0.0
+    make_meta = _DRILL_META.get(dimension, lambda _: {})
+
+    raw = _execute(db, sql, fc.params).fetchall()
+    total = sum(float(r.value) for r in raw)
+    rows = [
+        DrillRow(
+            label=str(r.label).strip(),
+            value=float(r.value),
+            order_count=int(r.order_count),
+            metadata=make_meta(r),
+        )
+        for r in raw
+    ]
+    return rows, total
+
+
+# Drillable IDs per dimension (see DrillRow.metadata)
+_DRILL_META: dict[str, Callable[[Any], dict]] = {
+    "item": lambda r: {"item_id": int(r.meta_item_id)},
+    "category": lambda r: {"category_id": int(r.meta_category_id)} if r.meta_category_id is not None else {},
+    "order_type": lambda r: {"order_type": "ayce" if r.label == "AYCE" else "regular"},
+    "table": lambda r: {"table_id": int(r.meta_table_id)},
+}
+
+
+@lru_cache(maxsize=512)
+def _drill_sql(dimension: str, metric: str, fc: FilterShape) -> Optional[str]:
+    """One SQL statement per (dimension, metric, filter shape), built once."""
     if dimension == "item":
         metric_expr = _item_metric_expr(metric)
         sql = f"""
@@ -502,7 +812,7 @@ def _drill_query(
                 {metric_expr} AS value,
                 COUNT(DISTINCT o.id) AS order_count,
                 mi.id     AS meta_item_id
-            FROM orders o
+            FROM {fc.orders_from}
             JOIN order_items oi ON oi.order_id = o.id
             JOIN menu_items  mi ON mi.id = oi.menu_item_id
             WHERE {fc.order_clause} {fc.item_clause}
@@ -510,8 +820,6 @@ def _drill_query(
             ORDER BY value DESC
             LIMIT 50
         """
-        def make_meta(r: Any) -> dict:
-            return {"item_id": int(r.meta_item_id)}
 
     elif dimension == "category":
         metric_expr = _item_metric_expr(metric)
@@ -521,7 +829,7 @@ def _drill_query(
                 {metric_expr}                     AS value,
                 COUNT(DISTINCT o.id)              AS order_count,
                 c.id                              AS meta_category_id
-            FROM orders o
+            FROM {fc.orders_from}
             JOIN order_items oi ON oi.order_id = o.id
             JOIN menu_items  mi ON mi.id = oi.menu_item_id
             LEFT JOIN categories c ON c.id = mi.category_id
@@ -529,8 +837,6 @@ def _drill_query(
             GROUP BY c.id, c.name
             ORDER BY value DESC
         """
-        def make_meta(r: Any) -> dict:
-            return {"category_id": int(r.meta_category_id)} if r.meta_category_id is not None else {}
 
     elif dimension == "day_of_week":
         metric_expr, join_clause = _pick_metric_and_join(metric, fc.needs_items_join)
@@ -540,13 +846,11 @@ def _drill_query(
                 TO_CHAR(o.created_at, 'Dy') AS label,
                 {metric_expr}               AS value,
                 COUNT(DISTINCT o.id)        AS order_count
-            FROM orders o {join_clause}
+            FROM {fc.orders_from} {join_clause}
             WHERE {fc.order_clause} {item_filter}
             GROUP BY EXTRACT(DOW FROM o.created_at), TO_CHAR(o.created_at, 'Dy')
             ORDER BY EXTRACT(DOW FROM o.created_at)
         """
-        def make_meta(_: Any) -> dict:
-            return {}
 
     elif dimension == "hour":
         metric_expr, join_clause = _pick_metric_and_join(metric, fc.needs_items_join)
@@ -556,13 +860,11 @@ def _drill_query(
                 TO_CHAR(o.created_at, 'HH24') AS label,
                 {metric_expr}                           AS value,
                 COUNT(DISTINCT o.id)                    AS order_count
-            FROM orders o {join_clause}
+            FROM {fc.orders_from} {join_clause}
             WHERE {fc.order_clause} {item_filter}
             GROUP BY TO_CHAR(o.created_at, 'HH24')
             ORDER BY TO_CHAR(o.created_at, 'HH24')::int
         """
-        def make_meta(_: Any) -> dict:
-            return {}
 
     elif dimension == "order_type":
         metric_expr = _order_metric_expr(metric)
@@ -571,13 +873,11 @@ def _drill_query(
                 CASE WHEN o.ayce_order THEN 'AYCE' ELSE 'Regular' END AS label,
                 {metric_expr}        AS value,
                 COUNT(DISTINCT o.id) AS order_count
-            FROM orders o
+            FROM {fc.orders_from}
             WHERE {fc.order_clause}
             GROUP BY o.ayce_order
             ORDER BY value DESC
         """
-        def make_meta(r: Any) -> dict:
-            return {"order_type": "ayce" if r.label == "AYCE" else "regular"}
 
     elif dimension == "table":
         metric_expr = _order_metric_expr(metric)
@@ -587,30 +887,16 @@ def _drill_query(
                 {metric_expr}              AS value,
                 COUNT(DISTINCT o.id)       AS order_count,
                 t.id                       AS meta_table_id
-            FROM orders o
+            FROM {fc.orders_from}
             JOIN tables t ON t.id = o.table_id
             WHERE {fc.order_clause}
             GROUP BY t.id, t.number
             ORDER BY value DESC
         """
-        def make_meta(r: Any) -> dict:
-            return {"table_id": int(r.meta_table_id)}
 
     else:
-        return [], 0.0
-
-    raw = db.execute(text(sql), fc.params).fetchall()
-    total = sum(float(r.value) for r in raw)
-    rows = [
-        DrillRow(
-            label=str(r.label).strip(),
-            value=float(r.value),
-            order_count=int(r.order_count),
-            metadata=make_meta(r),
-        )
-        for r in raw
-    ]
-    return rows, total
+        return None
+    return sql
 
 
 # ---------------------------------------------------------------------------
@@ -620,7 +906,7 @@ def _drill_query(
 @router.get("/analytics/decompose", response_model=DecomposeResponse)
 def get_analytics_decompose(
     f: AnalyticsFilter = Depends(parse_filter),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
     """
@@ -630,26 +916,8 @@ def get_analytics_decompose(
     """
     fc = build_conditions(f, tenant_id)
 
-    totals_row = db.execute(
-        text(f"""
-            SELECT
-                COUNT(*)                          AS order_count,
-                COALESCE(SUM(o.total_amount), 0)  AS total_revenue,
-                COALESCE(AVG(o.total_amount), 0)  AS avg_order_value
-            FROM orders o
-            WHERE {fc.order_clause}
-        """),
-        fc.params,
-    ).fetchone()
-
-    # Reuse _grouped_summary for the daily breakdown (all three metrics per day)
-    timeseries = _grouped_summary(db, "day", fc)
-
-    total = SummaryResponse(
-        total_revenue=float(totals_row.total_revenue),
-        order_count=int(totals_row.order_count),
-        avg_order_value=float(totals_row.avg_order_value),
-    )
+    # Totals and the daily breakdown — one scan unless item filters are active
+    total, timeseries = _summary_and_groups(db, "day", fc)
     return DecomposeResponse(total=total, timeseries=timeseries)
 
 
@@ -674,7 +942,7 @@ def get_analytics_compare(
     # Shared dimensional filters (applied to both cohorts)
     category_id: Optional[int] = Query(None),
     item_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
     """
@@ -712,8 +980,12 @@ def get_analytics_compare(
 
     # Run the same _drill_query logic for both cohorts — zero duplication
     # Both cohorts are scoped to the same tenant (apples-to-apples comparison)
-    rows_a, _ = _drill_query(db, dimension, metric, build_conditions(filter_a, tenant_id))
-    rows_b, _ = _drill_query(db, dimension, metric, build_conditions(filter_b, tenant_id))
+    # and run concurrently on separate connections.
+    (rows_a, _), (rows_b, _) = _run_parallel(
+        db,
+        (_drill_query, dimension, metric, build_conditions(filter_a, tenant_id)),
+        (_drill_query, dimension, metric, build_conditions(filter_b, tenant_id)),
+    )
 
     # Align by label (full outer join semantics)
     a_map: dict[str, float] = {r.label: r.value for r in rows_a}
@@ -759,6 +1031,9 @@ class SignalResult(BaseModel):
     severity: str   # "high" (|z| > 3) | "medium" (|z| > 2)
     direction: str  # "increase" | "decrease"
     message: str
+    # /signals/multi only: strongest baseline and every baseline that agreed
+    method: Optional[str] = None
+    confirmed_by: Optional[List[str]] = None
 
 
 @router.get("/analytics/signals", response_model=List[SignalResult])
@@ -766,7 +1041,7 @@ def get_analytics_signals(
     window_days: int = Query(14, ge=7, le=90),
     meal_period: Optional[str] = Query(None),
     order_type: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
     """
@@ -793,7 +1068,38 @@ def get_analytics_signals(
     )
     fc = build_conditions(window_filter, tenant_id)
     daily = _grouped_summary(db, "day", fc)
+    return _window_zscore_signals(daily, window_days)
+
+
+def _signal_result(
+    metric_key: str, day: str, value: float, mean: float, z: float, baseline: str, **extra: Any
+) -> SignalResult:
+    """Severity, direction and message for one flagged day (shared by both detectors)."""
+    severity = "high" if abs(z) > 3.0 else "medium"
+    direction = "increase" if z > 0 else "decrease"
+    pct = abs(value - mean) / mean * 100 if mean != 0 else 0
+    label = _SIGNAL_METRIC_LABELS[metric_key]
 
+    if direction == "increase":
+        msg = f"{label} was {pct:.0f}% above {baseline}"
+    else:
+        msg = f"{label} dropped {pct:.0f}% below {baseline}"
+
+    return SignalResult(
+        metric=metric_key,
+        date=day,
+        value=round(value, 2),
+        mean=round(mean, 2),
+        z_score=round(z, 2),
+        severity=severity,
+        direction=direction,
+        message=msg,
+        **extra,
+    )
+
+
+def _window_zscore_signals(daily: List[SummaryGroup], window_days: int) -> List[SignalResult]:
+    """The /signals detector: one mean/stdev per metric over the whole window."""
     if len(daily) < 3:
         return []
 
@@ -818,33 +1124,136 @@ def get_analytics_signals(
             z = (v - mean) / std
             if abs(z) <= 2.0:
                 continue
-
-            severity = "high" if abs(z) > 3.0 else "medium"
-            direction = "increase" if z > 0 else "decrease"
-            pct = abs(v - mean) / mean * 100 if mean != 0 else 0
-            label = _SIGNAL_METRIC_LABELS[metric_key]
-
-            if direction == "increase":
-                msg = f"{label} was {pct:.0f}% above {window_days}-day average"
-            else:
-                msg = f"{label} dropped {pct:.0f}% below {window_days}-day average"
-
-            signals.append(SignalResult(
-                metric=metric_key,
-                date=row.group_key,
-                value=round(v, 2),
-                mean=round(mean, 2),
-                z_score=round(z, 2),
-                severity=severity,
-                direction=direction,
-                message=msg,
-            ))
+            signals.append(
+                _signal_result(metric_key, row.group_key, v, mean, z, f"{window_days}-day average")
+            )
 
     # Strongest anomalies first
     signals.sort(key=lambda s: abs(s.z_score), reverse=True)
     return signals
 
 
+# ---------------------------------------------------------------------------
+# GET /analytics/signals/multi  — vectorized multi-baseline detection
+# ---------------------------------------------------------------------------
+
+def _baseline_label(method: str) -> str:
+    kind, _, span = method.partition("_")
+    if kind == "seasonal":
+        return f"the same weekday over the previous {span[:-1]} weeks"
+    if kind == "robust":
+        return f"{span[:-1]}-day median"
+    return f"{span[:-1]}-day average"
+
+
+def _daily_cube(
+    db: Session,
+    tenant_ids: List[int],
+    start_d: date,
+    end_d: date,
+    meal_period: Optional[str] = None,
+    order_type: Optional[str] = None,
+):
+    """
+    Daily metrics for several tenants as one (tenant, metric, day) array.
+
+    Each tenant is fetched through build_conditions + _grouped_summary, so
+    tenant scoping and filter translation stay exactly as in every other
+    endpoint; only the scoring is batched.
+    """
+    daily_by_tenant = []
+    for tid in tenant_ids:
+        f = AnalyticsFilter(
+            start_date=start_d, end_date=end_d, meal_period=meal_period, order_type=order_type
+        )
+        daily_by_tenant.append(_grouped_summary(db, "day", build_conditions(f, tid)))
+    return signal_detector.build_cube(daily_by_tenant, start_d, (end_d - start_d).days + 1)
+
+
+@router.get("/analytics/signals/multi", response_model=List[SignalResult])
+def get_analytics_signals_multi(
+    window_days: int = Query(14, ge=7, le=90),
+    windows: List[int] = Query(list(signal_detector.DEFAULT_WINDOWS)),
+    seasonal_weeks: int = Query(signal_detector.DEFAULT_SEASONAL_WEEKS, ge=0, le=12),
+    meal_period: Optional[str] = Query(None),
+    order_type: Optional[str] = Query(None),
+    db: Session = Depends(get_analytics_db),
+    tenant_id: int = Depends(get_tenant_id),
+):
+    """
+    Like /signals, but each of the last `window_days` days is scored against
+    its own history: trailing mean/stdev and median/MAD for every window in
+    `windows`, plus a same-weekday baseline over `seasonal_weeks` weeks.
+
+    A day is reported once, under its strongest baseline (`method`), with
+    every baseline that also flagged it in `confirmed_by`.  Without NumPy this
+    falls back to the /signals computation.
+    """
+    windows = sorted({w for w in windows if 3 <= w <= 90}) or list(signal_detector.DEFAULT_WINDOWS)
+    end_d = date.today()
+    report_start = end_d - timedelta(days=window_days)
+
+    if not signal_detector.numpy_available():
+        f = AnalyticsFilter(
+            start_date=report_start, end_date=end_d, meal_period=meal_period, order_type=order_type
+        )
+        return _window_zscore_signals(_grouped_summary(db, "day", build_conditions(f, tenant_id)), window_days)
+
+    # Fetch enough history for the longest baseline to be full on day one.
+    history_days = max(max(windows), 7 * seasonal_weeks)
+    start_d = report_start - timedelta(days=history_days)
+    cube = _daily_cube(db, [tenant_id], start_d, end_d, meal_period, order_type)
+    found = signal_detector.detect(
+        cube, [tenant_id], start_d, windows, seasonal_weeks, report_from=history_days
+    )[tenant_id]
+
+    return [
+        _signal_result(
+            s.metric, s.date.isoformat(), s.value, s.baseline, s.z_score, _baseline_label(s.method),
+            method=s.method, confirmed_by=s.confirmed_by,
+        )
+        for s in found
+    ]
+
+
+# ---------------------------------------------------------------------------
+# GET /analytics/export  — streamed CSV / Parquet / Arrow download
+# ---------------------------------------------------------------------------
+
+@router.get("/analytics/export")
+def export_analytics_data(
+    table: str = Query("orders"),
+    fmt: str = Query("csv", alias="format"),
+    f: AnalyticsFilter = Depends(parse_filter),
+    db: Session = Depends(get_analytics_db),
+    tenant_id: int = Depends(get_tenant_id),
+):
+    """
+    Download every order (table=orders) or order line (table=order_items)
+    matching the Lens filters, as format=csv | parquet | arrow.
+
+    Rows stream from a server-side cursor in EXPORT_BATCH_ROWS batches, so a
+    year-long export costs the same memory as a day.
+    """
+    if table not in lens_export.EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of {', '.join(lens_export.EXPORT_TABLES)}")
+    if fmt not in lens_export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(lens_export.FORMATS)}")
+    media_type, ext, needs_arrow = lens_export.FORMATS[fmt]
+    if needs_arrow and not lens_export.pyarrow_available():
+        raise HTTPException(status_code=501, detail=f"{fmt} export needs pyarrow installed; use format=csv")
+
+    fc = build_conditions(f, tenant_id)
+    filename = f"lens-{table}-{fc.params['start_dt']:%Y%m%d}-{fc.params['end_dt']:%Y%m%d}{ext}"
+    return StreamingResponse(
+        # The request session closes before the body streams; the export
+        # opens its own connection on the same engine.
+        lens_export.iter_export(db.get_bind(), table, fc, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ---------------------------------------------------------------------------
 # GET /analytics/orders  — orders for a specific hour slot
 # ---------------------------------------------------------------------------
@@ -870,19 +1279,32 @@ def get_orders_for_hour(
     end_date: Optional[date] = Query(None),
     hour: int = Query(..., ge=0, le=23),
     meal_period: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
     """
     Returns every non-cancelled order placed during a specific clock hour
     (e.g. hour=14 → 2pm–3pm) within the given date range.
     Used by the Lens hour-by-hour chart drill-down.
+
+    On Postgres this is one statement: each order row carries its lines as
+    a json_agg array, mapped straight onto HourOrder.  Elsewhere the ORM
+    path eager-loads lines, menu items and tables (three queries in all).
     """
     start_dt, end_dt = _resolve_dates(start_date, end_date)
 
+    if db.get_bind().dialect.name == "postgresql":
+        params = {"tenant_id": tenant_id, "start_dt": start_dt, "end_dt": end_dt, "hour": hour}
+        rows = query_templates.execute(db, _hour_orders_sql(meal_period), params).fetchall()
+        return [_hour_order(r) for r in rows]
+
     query = (
         db.query(Order)
         .join(Table, Order.table_id == Table.id)
+        .options(
+            contains_eager(Order.table),
+            selectinload(Order.items).joinedload(OrderItem.menu_item),
+        )
         .filter(
             Order.tenant_id == tenant_id,  # scope to current restaurant
             Order.status != OrderStatus.CANCELLED,
@@ -922,3 +1344,57 @@ def get_orders_for_hour(
         ))
 
     return result
+
+
+@lru_cache(maxsize=8)
+def _hour_orders_sql(meal_period: Optional[str]) -> str:
+    """Orders in one clock hour, each with its lines as a JSON array (Postgres)."""
+    meal_clause = {
+        "lunch": "AND EXTRACT(HOUR FROM o.created_at) < 16",
+        "dinner": "AND EXTRACT(HOUR FROM o.created_at) >= 16",
+    }.get(meal_period, "")
+    return f"""
+            SELECT
+                o.id,
+                t.number         AS table_number,
+                o.status::text   AS status,
+                o.total_amount,
+                o.ayce_order,
+                o.created_at,
+                COALESCE(
+                    (SELECT json_agg(json_build_object(
+                                'name', COALESCE(mi.name, 'Item #' || oi.menu_item_id),
+                                'quantity', oi.quantity,
+                                'unit_price', oi.unit_price
+                            ) ORDER BY oi.id)
+                     FROM order_items oi
+                     LEFT JOIN menu_items mi ON mi.id = oi.menu_item_id
+                     WHERE oi.order_id = o.id),
+                    '[]'::json
+                ) AS items
+            FROM orders o
+            JOIN tables t ON t.id = o.table_id
+            WHERE o.tenant_id = :tenant_id
+              AND LOWER(o.status::text) != 'cancelled'
+              AND o.created_at >= :start_dt
+              AND o.created_at <= :end_dt
+              {meal_clause}
+              AND EXTRACT(HOUR FROM o.created_at) = :hour
+            ORDER BY o.created_at
+        """
+
+
+def _hour_order(r: Any) -> HourOrder:
+    """One _hour_orders_sql row → HourOrder (psycopg2 decodes the json column)."""
+    return HourOrder(
+        id=r.id,
+        table_number=r.table_number,
+        status=r.status,
+        total_amount=float(r.total_amount),
+        ayce_order=bool(r.ayce_order),
+        created_at=r.created_at,
+        items=[
+            HourOrderItem(name=i["name"], quantity=i["quantity"], unit_price=float(i["unit_price"]))
+            for i in r.items
+        ],
+    )
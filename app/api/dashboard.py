@@ -6,11 +6,11 @@ This module provides endpoints for dashboard statistics and recent orders.
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from app.core.database import get_db
+from typing import Dict, List
+from app.core.database import get_analytics_db
 from app.core.tenant import get_tenant_id
-from app.models.order import Order, OrderStatus
+from app.models.order import Order
+from app.services import dashboard_counters
 from pydantic import BaseModel
 from decimal import Decimal
 
@@ -19,8 +19,11 @@ router = APIRouter()
 class DashboardStats(BaseModel):
     total_orders: int
     total_revenue: float
-    average_order_time: int
+    average_order_time: int  # minutes, over orders completed today
     active_orders: int
+    orders_today: int = 0
+    revenue_today: float = 0.0
+    status_counts: Dict[str, int] = {}
 
 class RecentOrder(BaseModel):
     id: int
@@ -30,39 +33,42 @@ class RecentOrder(BaseModel):
     created_at: str
 
 @router.get("/stats", response_model=DashboardStats)
-def get_dashboard_stats(db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+def get_dashboard_stats(db: Session = Depends(get_analytics_db), tenant_id: int = Depends(get_tenant_id)):
     """
     Get dashboard statistics including total orders, revenue, and active orders.
     All stats are scoped to the current tenant.
+
+    Reads the tenant's single dashboard_counters row, which order writes keep
+    current (see app/services/dashboard_counters.py) — constant cost however
+    many orders the tenant has.
     """
     try:
-        # Single aggregation query for total orders and revenue — scoped to tenant
-        row = db.query(
-            func.count(Order.id),
-            func.coalesce(func.sum(Order.total_amount), 0)
-        ).filter(Order.tenant_id == tenant_id).one()
-        total_orders = row[0]
-        total_revenue = float(Decimal(str(row[1])).quantize(Decimal('0.01')))
+        counters = dashboard_counters.read(db, tenant_id)
 
-        avg_time = 15  # Default value
+        status_counts = {
+            status.value: int(counters[column])
+            for status, column in dashboard_counters.STATUS_COLUMNS.items()
+        }
+        active_orders = sum(status_counts[s.value] for s in dashboard_counters.ACTIVE_STATUSES)
 
-        # Get active orders for this tenant (not completed or cancelled)
-        active_orders = db.query(func.count(Order.id)).filter(
-            Order.tenant_id == tenant_id,
-            Order.status.in_([OrderStatus.PENDING, OrderStatus.PREPARING, OrderStatus.READY])
-        ).scalar() or 0
+        # created → completed, averaged over today's completed orders
+        completed_today = int(counters["completed_today"])
+        avg_time = round(counters["ticket_seconds_today"] / completed_today / 60) if completed_today else 0
 
         return DashboardStats(
-            total_orders=total_orders,
-            total_revenue=total_revenue,
+            total_orders=int(counters["total_orders"]),
+            total_revenue=float(Decimal(str(counters["total_revenue"])).quantize(Decimal('0.01'))),
             average_order_time=avg_time,
-            active_orders=active_orders
+            active_orders=active_orders,
+            orders_today=int(counters["orders_today"]),
+            revenue_today=float(Decimal(str(counters["revenue_today"])).quantize(Decimal('0.01'))),
+            status_counts=status_counts,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/recent-orders", response_model=List[RecentOrder])
-def get_recent_orders(db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+def get_recent_orders(db: Session = Depends(get_analytics_db), tenant_id: int = Depends(get_tenant_id)):
     """
     Get recent orders for the dashboard, scoped to the current tenant.
     """
@@ -4,7 +4,7 @@ User-generated image endpoints.
 Handles uploading, viewing, reporting, and deleting user photos for menu items.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from app.core.database import get_db
@@ -12,6 +12,7 @@ from app.core.tenant import get_tenant_id
 from app.models.menu import MenuItemImage, ImageReport, ImageStatusEnum, MenuItem
 from app.schemas.menu import MenuItemImageResponse, ImageReportCreate, ImageReportResponse, ImageStatusUpdate
 from app.core.error_handling import RecordNotFoundError
+from app.services.image_derivatives import delete_derivatives, process_user_image
 from datetime import datetime, timezone
 import logging
 import os
@@ -34,11 +35,12 @@ def _uploads_dir() -> str:
 @router.post("/menu-items/{menu_item_id}/images", response_model=MenuItemImageResponse)
 def upload_user_image(
     menu_item_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
-    from app.core.s3 import upload_image
+    from app.core.s3 import upload_image_stream
 
     # ensure the menu item exists and belongs to this tenant
     item = db.query(MenuItem).filter(MenuItem.id == menu_item_id, MenuItem.tenant_id == tenant_id).first()
@@ -50,12 +52,11 @@ def upload_user_image(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, WebP, and GIF images are allowed")
 
-    from app.core.upload_limits import CUSTOMER_IMAGE_MAX_BYTES, buffer_upload_file
+    from app.core.upload_limits import CUSTOMER_IMAGE_MAX_BYTES, iter_upload_chunks
 
-    buf = buffer_upload_file(file, CUSTOMER_IMAGE_MAX_BYTES, "customer")
-
-    # upload to S3
-    s3_url = upload_image(buf, "user-images", menu_item_id, file.filename or "image.jpg", file.content_type)
+    # stream to S3 with the size limit enforced as chunks arrive
+    chunks = iter_upload_chunks(file, CUSTOMER_IMAGE_MAX_BYTES, "customer")
+    s3_url = upload_image_stream(chunks, "user-images", menu_item_id, file.filename or "image.jpg", file.content_type)
 
     # save the record in the database
     db_image = MenuItemImage(
@@ -65,6 +66,8 @@ def upload_user_image(
     db.add(db_image)
     db.commit()
     db.refresh(db_image)
+    # render thumbnails / WebP sizes after the response is sent
+    background_tasks.add_task(process_user_image, db, db_image.id)
     return db_image
 
 
@@ -179,6 +182,7 @@ def delete_image(image_id: int, db: Session = Depends(get_db), tenant_id: int =
 
     if image.image_url:
         s3_delete(image.image_url)
+    delete_derivatives(image.image_variants)
 
     db.delete(image)
     db.commit()
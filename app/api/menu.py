@@ -6,6 +6,7 @@ This module provides endpoints for managing menu items and categories.
 
 # all the stuff we need to make the API work
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -32,9 +33,11 @@ from app.schemas.menu import (
     TagCreate,
     ItemTagsUpdate,
 )
-from app.services import ask_shari_cache
+from app.services import ask_shari_cache, cache_warmup
+from app.services.image_derivatives import delete_derivatives, process_menu_item_image
 from app.schemas.bulk_operations import BulkMenuItemOperation, BulkMenuItemResponse, BulkOperationType
 from app.core.error_handling import RecordNotFoundError
+import json
 import logging
 import os
 import uuid
@@ -134,6 +137,10 @@ def search_menu_items(
     """
     from app.services.embedding_service import hybrid_search
 
+    cache_warmup.record_query(tenant_id, "search", q, {
+        "category_id": category_id, "meal_period": meal_period,
+        "min_price": min_price, "max_price": max_price,
+    })
     result = hybrid_search(
         db,
         tenant_id,
@@ -183,6 +190,15 @@ def search_menu_items(
 
 # ── Ask Shari (LLM explanation layer, cached) ─────────────────────────────────
 
+def _ask_shari_filters(payload: AskShariRequest) -> dict:
+    return {
+        "category_id": payload.category_id,
+        "meal_period": payload.meal_period,
+        "min_price": payload.min_price,
+        "max_price": payload.max_price,
+    }
+
+
 @router.post("/menu-items/ask-shari", response_model=AskShariResponse)
 def ask_shari_endpoint(
     payload: AskShariRequest,
@@ -199,6 +215,7 @@ def ask_shari_endpoint(
     """
     from app.services.ask_shari_service import ask_shari
 
+    cache_warmup.record_query(tenant_id, "ask_shari", payload.query, _ask_shari_filters(payload))
     result = ask_shari(
         db,
         tenant_id,
@@ -211,6 +228,46 @@ def ask_shari_endpoint(
     return result
 
 
+@router.post("/menu-items/ask-shari/stream")
+def ask_shari_stream_endpoint(
+    payload: AskShariRequest,
+    db: Session = Depends(get_db),
+    tenant_id: int = Depends(get_tenant_id),
+):
+    """
+    Server-sent-events variant of Ask Shari.
+
+    Retrieval results are sent as soon as they're ready (`event: results`),
+    then the narrative streams in as `delta` events with a `featured` event
+    per validated pick, and a final `done` event carries the same body as the
+    blocking endpoint.  Retrieval runs before the response starts, so the DB
+    session is not needed while the LLM streams.
+    """
+    from app.services.ask_shari_service import ask_shari_stream
+
+    cache_warmup.record_query(tenant_id, "ask_shari", payload.query, _ask_shari_filters(payload))
+    events = ask_shari_stream(
+        db,
+        tenant_id,
+        payload.query,
+        category_id=payload.category_id,
+        meal_period=payload.meal_period,
+        min_price=payload.min_price,
+        max_price=payload.max_price,
+    )
+
+    def sse():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        # no proxy buffering — each event should reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ── Background re-embed helper ────────────────────────────────────────────────
 
 def _trigger_reembed(tenant_id: int, item_ids: list[int], db: Session) -> None:
@@ -271,13 +328,19 @@ def patch_menu_item(
         raise RecordNotFoundError("MenuItem", item_id)
 
     # only update the fields that were actually provided
-    for key, value in item.model_dump(exclude_unset=True).items():
+    updates = item.model_dump(exclude_unset=True)
+    framing_before = (db_item.image_position_x, db_item.image_position_y, db_item.image_zoom)
+    for key, value in updates.items():
         setattr(db_item, key, value)
 
     db.commit()
     db.refresh(db_item)
     # re-embed after any content change (hash check inside the service skips no-ops)
     background_tasks.add_task(_trigger_reembed, tenant_id, [item_id], db)
+    # thumbnails bake in the crop, so re-render them when the framing moves
+    framing_after = (db_item.image_position_x, db_item.image_position_y, db_item.image_zoom)
+    if db_item.image_url and framing_after != framing_before:
+        background_tasks.add_task(process_menu_item_image, db, tenant_id, item_id, db_item.image_url)
     ask_shari_cache.bump_menu_version(tenant_id)
     return db_item
 
@@ -285,11 +348,12 @@ def patch_menu_item(
 @router.post("/menu-items/{item_id}/upload-image", response_model=MenuItemResponse)
 def upload_menu_item_image(
     item_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     tenant_id: int = Depends(get_tenant_id),
 ):
-    from app.core.s3 import upload_image, delete_image
+    from app.core.s3 import upload_image_stream, delete_image
 
     # check the item exists within this tenant
     db_item = db.query(MenuItem).filter(MenuItem.id == item_id, MenuItem.tenant_id == tenant_id).first()
@@ -301,20 +365,24 @@ def upload_menu_item_image(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, WebP, and GIF images are allowed")
 
-    from app.core.upload_limits import MANAGER_IMAGE_MAX_BYTES, buffer_upload_file
-
-    buf = buffer_upload_file(file, MANAGER_IMAGE_MAX_BYTES, "manager")
-
-    # delete old image from S3 if one exists
-    if db_item.image_url:
-        delete_image(db_item.image_url)
+    from app.core.upload_limits import MANAGER_IMAGE_MAX_BYTES, iter_upload_chunks
 
-    # upload new image to S3
-    s3_url = upload_image(buf, "menu-images", item_id, file.filename or "image.jpg", file.content_type)
+    # stream the new image to S3 chunk by chunk — the size limit is enforced
+    # as bytes arrive, so an oversize file aborts before it's stored
+    chunks = iter_upload_chunks(file, MANAGER_IMAGE_MAX_BYTES, "manager")
+    s3_url = upload_image_stream(chunks, "menu-images", item_id, file.filename or "image.jpg", file.content_type)
 
+    # only drop the old image once the replacement is safely stored
+    old_url, old_variants = db_item.image_url, db_item.image_variants
     db_item.image_url = s3_url
+    db_item.image_variants = None
     db.commit()
     db.refresh(db_item)
+    if old_url:
+        delete_image(old_url)
+    delete_derivatives(old_variants)
+    # thumbnails / WebP sizes are rendered off the request thread
+    background_tasks.add_task(process_menu_item_image, db, tenant_id, item_id, s3_url)
     return db_item
 
 
@@ -329,7 +397,9 @@ def delete_menu_item_image(item_id: int, db: Session = Depends(get_db), tenant_i
 
     if db_item.image_url:
         delete_image(db_item.image_url)
+        delete_derivatives(db_item.image_variants)
         db_item.image_url = None
+        db_item.image_variants = None
         db.commit()
         db.refresh(db_item)
 
@@ -6,7 +6,7 @@ It includes functionality for creating, retrieving, updating, and managing order
 including bulk operations and status management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -33,6 +33,7 @@ from app.schemas.order import (
 )
 from app.schemas.bulk_operations import BulkOrderOperation
 from app.core.error_handling import RecordNotFoundError
+from app.services import idempotency
 import logging
 from pydantic import BaseModel
 from enum import Enum
@@ -397,6 +398,14 @@ def get_orders(
             detail="An error occurred while fetching orders"
         )
 
+def _commit_with_response(db: Session, order: Order, claim) -> dict:
+    """Commit `order` together with its serialized response on the idempotency claim."""
+    db.flush()
+    db.refresh(order)
+    body = idempotency.complete(claim, OrderResponse.model_validate(order))
+    db.commit()
+    return body
+
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(order_id: int, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
     """
@@ -419,22 +428,40 @@ def get_order(order_id: int, db: Session = Depends(get_db), tenant_id: int = Dep
     return order
 
 @router.post("/", response_model=OrderResponse)
-def create_order(order: OrderCreate, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+def create_order(
+    order: OrderCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    tenant_id: int = Depends(get_tenant_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+):
     """
     Create a new order.
 
     Args:
         order: Order data
+        response: Outgoing response (for the replay header)
         db: Database session
         tenant_id: Current tenant
+        idempotency_key: Client key; a retry with the same key returns the
+            first response instead of creating a second order
 
     Returns:
         Created order
 
     Raises:
-        HTTPException: If menu item not found
+        HTTPException: If menu item not found, or the key was used for a different request
     """
-    def _build_order() -> Order:
+    request_hash = idempotency.fingerprint("POST /orders/", order) if idempotency_key else None
+
+    def _build_order():
+        claim = None
+        if idempotency_key:
+            claim, replay = idempotency.claim(db, tenant_id, idempotency_key, request_hash)
+            if claim is None:
+                response.headers[idempotency.REPLAYED_HEADER] = "true"
+                return replay
+
         # Create the order — inject tenant_id so it's scoped to this restaurant
         db_order = Order(
             tenant_id=tenant_id,
@@ -475,6 +502,8 @@ def create_order(order: OrderCreate, db: Session = Depends(get_db), tenant_id: i
         # Calculate initial total
         db_order.total_amount = _calculate_order_total_amount(db_order, db, tenant_id)
 
+        if claim is not None:
+            return _commit_with_response(db, db_order, claim)
         db.commit()
         db.refresh(db_order)
         return db_order
@@ -829,8 +858,10 @@ def calculate_order_total(
 def add_items_to_order(
     order_id: int,
     order_items: OrderItemsCreate,
+    response: Response,
     db: Session = Depends(get_db),
     tenant_id: int = Depends(get_tenant_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
 ):
     """
     Add items to an existing order.
@@ -838,15 +869,28 @@ def add_items_to_order(
     Args:
         order_id: ID of the order
         order_items: List of items to add
+        response: Outgoing response (for the replay header)
         db: Database session
         tenant_id: Current tenant
+        idempotency_key: Client key; a retry with the same key returns the
+            first response instead of adding the items again
 
     Returns:
         Updated order
 
     Raises:
-        HTTPException: If order not found, menu items not found, or order is completed
+        HTTPException: If order not found, menu items not found, order is completed,
+            or the key was used for a different request
     """
+    claim = None
+    if idempotency_key:
+        claim, replay = idempotency.claim(
+            db, tenant_id, idempotency_key,
+            idempotency.fingerprint(f"POST /orders/{order_id}/items", order_items),
+        )
+        if claim is None:
+            response.headers[idempotency.REPLAYED_HEADER] = "true"
+            return replay
     try:
         # Tenant filter prevents adding items to another restaurant's order
         order = db.query(Order).filter(Order.id == order_id, Order.tenant_id == tenant_id).first()
@@ -904,6 +948,8 @@ def add_items_to_order(
         # Recalculate order total
         order.total_amount = _calculate_order_total_amount(order, db, tenant_id)
 
+        if claim is not None:
+            return _commit_with_response(db, order, claim)
         db.commit()
         db.refresh(order)
         return order
@@ -0,0 +1,147 @@
+"""
+Process-wide registry of outbound service clients (S3, OpenAI).
+
+Building a boto3 or OpenAI client re-does credential resolution and opens a
+fresh connection pool, so constructing one per upload / per embedding call
+meant a new TLS handshake on every hot-path request.  This module builds each
+client once per process and hands the same instance out afterwards, keeping
+its keep-alive pool warm.
+
+Pool sizing:
+  * S3      — botocore `max_pool_connections` = S3_MAX_POOL_CONNECTIONS
+  * OpenAI  — an httpx.Client with OPENAI_MAX_CONNECTIONS total,
+              OPENAI_MAX_KEEPALIVE_CONNECTIONS idle, HTTP_KEEPALIVE_EXPIRY_S
+
+Fork safety:
+  Sockets must never be shared between a parent and a forked worker (uvicorn
+  / gunicorn `--workers N`).  Every cached client records the PID that built
+  it; a lookup from a different PID discards the inherited instance and builds
+  a new one.  `os.register_at_fork` clears the registry in the child as well,
+  so whichever check runs first wins.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.lazy_imports import optional_module, require_module
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# name → (owning pid, client)
+_clients: dict[str, tuple[int, Any]] = {}
+
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    pid = os.getpid()
+    entry = _clients.get(name)
+    if entry is not None and entry[0] == pid:
+        return entry[1]
+    with _lock:
+        entry = _clients.get(name)
+        if entry is not None and entry[0] == pid:
+            return entry[1]
+        if entry is not None:
+            # Inherited across fork — drop it without closing the parent's sockets.
+            logger.info("Discarding %s client inherited from pid=%d", name, entry[0])
+        client = factory()
+        _clients[name] = (pid, client)
+        logger.info("Created shared %s client (pid=%d)", name, pid)
+        return client
+
+
+# ── S3 ───────────────────────────────────────────────────────────────────────
+
+def _build_s3_client():
+    boto3 = require_module("boto3")
+    botocore_config = require_module("botocore.config")
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION", "us-east-1"),
+        config=botocore_config.Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={"max_attempts": 3, "mode": "standard"},
+        ),
+    )
+
+
+def get_s3_client():
+    """Return the shared boto3 S3 client (thread-safe; boto3 clients are)."""
+    return _get_or_create("s3", _build_s3_client)
+
+
+# ── OpenAI ───────────────────────────────────────────────────────────────────
+
+def _build_openai_client():
+    openai = optional_module("openai", "OpenAI features")
+    if openai is None:
+        return None
+    httpx = require_module("httpx")  # hard dependency of the openai package
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_S,
+        ),
+    )
+    return openai.OpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
+
+
+def get_openai_client(timeout: Optional[float] = None):
+    """
+    Return the shared OpenAI client, or None if the key/package is unavailable.
+
+    Pass `timeout` for a per-call deadline — the returned view shares the
+    same underlying connection pool, so it is still warm.
+    """
+    if not settings.OPENAI_API_KEY:
+        return None
+    client = _get_or_create("openai", _build_openai_client)
+    if client is None or timeout is None:
+        return client
+    return client.with_options(timeout=timeout)
+
+
+# ── Lifecycle ────────────────────────────────────────────────────────────────
+
+def close_clients() -> None:
+    """Close pooled connections owned by this process (called on shutdown)."""
+    pid = os.getpid()
+    with _lock:
+        entries = list(_clients.items())
+        _clients.clear()
+    for name, (owner_pid, client) in entries:
+        if owner_pid != pid or client is None:
+            continue
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception as exc:
+            logger.warning("Failed to close %s client: %s", name, exc)
+
+
+def _reset_after_fork() -> None:
+    global _lock
+    # The parent's lock may have been held mid-fork; replace rather than reuse.
+    _lock = threading.Lock()
+    _clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def reset_for_tests() -> None:
+    """Test helper: forget every cached client without closing it."""
+    with _lock:
+        _clients.clear()
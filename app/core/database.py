@@ -7,9 +7,10 @@ for the Sushi POS system. It includes:
 - Session management
 - Base model configuration
 - Connection pooling
+- A separate, bounded analytics engine (read replica when configured)
 """
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -21,9 +22,9 @@ logger = logging.getLogger(__name__)
 # Create SQLAlchemy engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=5,  # Number of connections to keep in the pool
-    max_overflow=10,  # Maximum number of connections that can be created beyond pool_size
-    pool_timeout=30,  # Seconds to wait before giving up on getting a connection from the pool
+    pool_size=settings.DB_POOL_SIZE,  # Number of connections to keep in the pool
+    max_overflow=settings.DB_MAX_OVERFLOW,  # Maximum number of connections that can be created beyond pool_size
+    pool_timeout=settings.DB_POOL_TIMEOUT_S,  # Seconds to wait before giving up on getting a connection from the pool
     pool_recycle=1800,  # Recycle connections after 30 minutes
     echo=settings.SQL_ECHO  # Enable SQL query logging in development
 )
@@ -31,6 +32,36 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Lens / dashboard reads get their own engine so a long report can't take
+# connections away from order-taking.  It points at the read replica when
+# ANALYTICS_DATABASE_URL is set, otherwise at the primary through this
+# smaller pool, which waits less before giving up.
+analytics_engine = create_engine(
+    settings.ANALYTICS_DATABASE_URL or settings.DATABASE_URL,
+    pool_size=settings.ANALYTICS_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_MAX_OVERFLOW,
+    pool_timeout=settings.ANALYTICS_POOL_TIMEOUT_S,
+    pool_recycle=1800,
+    echo=settings.SQL_ECHO
+)
+
+
+@event.listens_for(analytics_engine, "connect")
+def _set_statement_timeout(dbapi_connection, connection_record):
+    """Cap every analytics statement on this connection (Postgres only)."""
+    if analytics_engine.dialect.name != "postgresql" or settings.ANALYTICS_STATEMENT_TIMEOUT_MS <= 0:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"SET statement_timeout = {int(settings.ANALYTICS_STATEMENT_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
+    # psycopg2 opens a transaction for the SET; don't leave the connection in it
+    dbapi_connection.commit()
+
+
+AnalyticsSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=analytics_engine)
+
 # Create declarative base for models
 Base = declarative_base()
 
@@ -55,6 +86,24 @@ def get_db():
     finally:
         db.close()
 
+def get_analytics_db():
+    """
+    Dependency function to get a read-only-workload database session.
+
+    Same contract as get_db(), but bound to analytics_engine: the read
+    replica if one is configured, else a separate bounded pool on the
+    primary, with ANALYTICS_STATEMENT_TIMEOUT_MS applied to every query.
+    Use it for reporting endpoints (Lens, dashboard), never for writes.
+
+    Yields:
+        Session: SQLAlchemy database session
+    """
+    db = AnalyticsSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def ensure_schema_columns() -> None:
     """
     Apply idempotent column additions for fields added after initial DB creation.
@@ -75,6 +124,18 @@ def ensure_schema_columns() -> None:
         ALTER TABLE orders
           ADD COLUMN IF NOT EXISTS leftover_charge_note VARCHAR(255)
         """,
+        """
+        ALTER TABLE menu_items
+          ADD COLUMN IF NOT EXISTS image_variants JSON
+        """,
+        """
+        ALTER TABLE menu_item_images
+          ADD COLUMN IF NOT EXISTS image_variants JSON
+        """,
+        """
+        ALTER TABLE orders
+          ADD COLUMN IF NOT EXISTS completion_time TIMESTAMP
+        """,
     ]
     with engine.begin() as conn:
         for stmt in statements:
@@ -39,6 +39,8 @@ class ErrorCodes:
     INVALID_STATUS_TRANSITION = "INVALID_STATUS_TRANSITION"
     INVALID_OPERATION = "INVALID_OPERATION"
     RESOURCE_NOT_AVAILABLE = "RESOURCE_NOT_AVAILABLE"
+    IDEMPOTENCY_KEY_REUSED = "IDEMPOTENCY_KEY_REUSED"
+    IDEMPOTENCY_KEY_IN_USE = "IDEMPOTENCY_KEY_IN_USE"
     
     # Validation errors
     VALIDATION_ERROR = "VALIDATION_ERROR"
@@ -119,6 +121,15 @@ class ValidationError(CustomException):
             details=details
         )
 
+class IdempotencyKeyError(CustomException):
+    """Exception raised when an Idempotency-Key can't be honoured for this request."""
+    def __init__(self, status_code: int, code: str, message: str):
+        super().__init__(
+            status_code=status_code,
+            code=code,
+            message=message
+        )
+
 class AuthenticationError(CustomException):
     """Exception raised for authentication errors."""
     def __init__(self, message: str):
@@ -0,0 +1,68 @@
+"""
+Lazy loaders for heavy optional dependencies.
+
+boto3, openai and pgvector (which pulls in numpy) are only needed by the
+image, search and Ask Shari paths.  Importing them at module load made every
+API worker pay for them at boot even if it never served one of those routes.
+
+Everything here imports on first call and memoises the result, so the cost is
+paid once per process by whichever request needs the package first.
+
+  * `require_module`  — the package is mandatory for the caller (e.g. boto3
+    for S3 uploads); a missing install raises ImportError as before.
+  * `optional_module` — the caller has a graceful fallback (e.g. keyword-only
+    search without openai); a missing install returns None and logs once.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+from types import ModuleType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loaded: dict[str, Optional[ModuleType]] = {}
+
+
+def _load(module_name: str) -> Optional[ModuleType]:
+    # Fast path — no lock once the module has been resolved (or found missing).
+    if module_name in _loaded:
+        return _loaded[module_name]
+    with _lock:
+        if module_name not in _loaded:
+            try:
+                _loaded[module_name] = importlib.import_module(module_name)
+            except ImportError:
+                _loaded[module_name] = None
+        return _loaded[module_name]
+
+
+def require_module(module_name: str) -> ModuleType:
+    """Import `module_name` on first use; raise ImportError if it is not installed."""
+    module = _load(module_name)
+    if module is None:
+        raise ImportError(f"{module_name} is required for this operation but is not installed")
+    return module
+
+
+def optional_module(module_name: str, feature: str) -> Optional[ModuleType]:
+    """
+    Import `module_name` on first use, or return None if it is not installed.
+
+    `feature` is only used for the one-time warning so logs say what got
+    disabled (e.g. "semantic search").
+    """
+    first_attempt = module_name not in _loaded
+    module = _load(module_name)
+    if module is None and first_attempt:
+        logger.warning("%s package not installed — %s disabled", module_name, feature)
+    return module
+
+
+def is_loaded(module_name: str) -> bool:
+    """True once `module_name` has been successfully imported through this layer."""
+    return _loaded.get(module_name) is not None
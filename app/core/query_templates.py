@@ -0,0 +1,90 @@
+"""
+Compiled, server-side prepared query templates for hot read paths (Lens).
+
+Lens builds its SQL from a small set of shapes — (dimension or group_by,
+metric, which filters are present) — and only the bound values change from
+one request to the next.  Sent as fresh text() statements, Postgres parses
+and plans every one of them.  Here:
+
+  * each distinct SQL string is compiled once into a QueryTemplate: a stable
+    statement name (hash of the SQL), its bind-parameter order and the
+    positional ($1, $2, …) form Postgres' PREPARE expects;
+  * on Postgres the template is PREPAREd the first time it runs on a pooled
+    connection, and every later run on that connection is a bare EXECUTE —
+    no parse, and a cached plan once Postgres settles on a generic one.
+
+Prepared names are tracked in the pooled connection's `info` dict, which
+lives exactly as long as the DBAPI connection: a recycled or invalidated
+connection starts empty, just like its new server session.
+
+Other dialects (SQLite in tests) run the plain text() statement, as does
+Postgres with ANALYTICS_PREPARED_STATEMENTS=false — set that behind a
+transaction-mode pooler (PgBouncer / Supabase port 6543), where consecutive
+statements can land on different server sessions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# `:name` binds, but not the `::type` casts
+_BIND_RE = re.compile(r"(?<![:\w]):(\w+)")
+_INFO_KEY = "prepared_statements"
+
+
+@dataclass(frozen=True)
+class QueryTemplate:
+    sql: str                      # original text() form with :named binds
+    name: str                     # server-side statement name
+    param_names: tuple[str, ...]  # bind order for EXECUTE
+    positional_sql: str           # $1, $2, … form for PREPARE
+
+
+@lru_cache(maxsize=1024)
+def compile_template(sql: str) -> QueryTemplate:
+    names: list[str] = []
+
+    def positional(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+
+    positional_sql = _BIND_RE.sub(positional, sql)
+    digest = hashlib.sha1(sql.encode()).hexdigest()[:16]
+    return QueryTemplate(sql, f"q_{digest}", tuple(names), positional_sql)
+
+
+def _use_prepared(conn) -> bool:
+    return settings.ANALYTICS_PREPARED_STATEMENTS and conn.dialect.name == "postgresql"
+
+
+def execute(db, sql: str, params: dict):
+    """
+    Run `sql` with `params` on `db` (a Session or Connection) and return the
+    result, through a prepared statement where possible.
+    """
+    conn = db.connection() if isinstance(db, Session) else db
+    if not _use_prepared(conn):
+        return conn.execute(text(sql), params)
+
+    template = compile_template(sql)
+    prepared: set = conn.info.setdefault(_INFO_KEY, set())
+    if template.name not in prepared:
+        conn.exec_driver_sql(f"PREPARE {template.name} AS {template.positional_sql}")
+        prepared.add(template.name)
+    if not template.param_names:
+        return conn.exec_driver_sql(f"EXECUTE {template.name}")
+    placeholders = ", ".join(["%s"] * len(template.param_names))
+    return conn.exec_driver_sql(
+        f"EXECUTE {template.name}({placeholders})",
+        tuple(params[name] for name in template.param_names),
+    )
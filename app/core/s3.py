@@ -1,49 +1,326 @@
 """
 S3 storage helpers for image uploads and deletions.
+
+boto3 is loaded through `app.core.lazy_imports` on the first upload or delete
+so API workers that never touch images don't pay for it at import time.  The
+client itself comes from the shared registry in `app.core.clients`, so uploads
+reuse one warm connection pool instead of building a client per request.
+
+Uploads are streamed: callers hand over an iterator of byte chunks, which are
+hashed into a spool file and then forwarded to storage.  Per-upload memory is
+bounded by UPLOAD_CHUNK_BYTES — spool and part buffers spill to a temp file
+past that size.
+
+Storage is content-addressed: objects live at `<prefix>/<sha256><ext>` and
+the `stored_images` table maps each hash to its URL and a reference count.
+Re-uploading a photo we already have costs a hash and an UPDATE — no storage
+transfer — and `delete_image` only removes the object with its last reference.
+
+Since uploads became content-addressed the request body is no longer piped
+straight to S3: the object key is the hash, so the whole body is spooled and
+hashed first, and only then sent.  The live path for API uploads is therefore
+spool → single PUT.  Multipart (`_s3_put_stream` above one part) only runs
+for objects larger than S3_MULTIPART_PART_BYTES (default 8 MB, never below
+S3's 5 MB minimum), which the 5 MB request limit in app/core/upload_limits.py
+rules out; it remains for uncapped callers such as
+scripts/upload_menu_images.py and for a raised limit.
+
+Backends (IMAGE_STORAGE_BACKEND):
+  * "s3"    — single PUT for objects up to one part, multipart upload above
+              S3_MULTIPART_PART_BYTES (aborted if the stream fails midway).
+  * "local" — writes under LOCAL_UPLOADS_DIR, served by the /uploads static
+              mount.  Used for development and as the test stand-in for S3.
 """
 
-import boto3
 import os
-import uuid
-from botocore.exceptions import ClientError
+import hashlib
 import logging
+import tempfile
+from typing import Iterable, Iterator
+
+from sqlalchemy import text
+
+from app.core.clients import get_s3_client
+from app.core.config import settings
+from app.core.lazy_imports import require_module
 
 logger = logging.getLogger(__name__)
 
+# S3 rejects multipart parts smaller than this (except the final one).
+_S3_MIN_PART_BYTES = 5 * 1024 * 1024
+
 
 def _s3_client():
-    return boto3.client(
-        "s3",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        region_name=os.getenv("AWS_REGION", "us-east-1"),
-    )
+    return get_s3_client()
 
 
 def _bucket() -> str:
     return os.getenv("S3_BUCKET_NAME", "sushi-pos-uploads")
 
 
-def upload_image(file_obj, prefix: str, item_id: int, original_filename: str, content_type: str) -> str:
-    """Upload a file-like object to S3 and return its public URL."""
-    ext = os.path.splitext(original_filename or "image.jpg")[1].lower() or ".jpg"
-    key = f"{prefix}/{item_id}_{uuid.uuid4().hex}{ext}"
-    _s3_client().upload_fileobj(
-        file_obj,
-        _bucket(),
-        key,
-        ExtraArgs={"ContentType": content_type},
-    )
+def _local_root() -> str:
+    if settings.LOCAL_UPLOADS_DIR:
+        return settings.LOCAL_UPLOADS_DIR
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
+
+
+def _use_local() -> bool:
+    return settings.IMAGE_STORAGE_BACKEND.lower() == "local"
+
+
+def _iter_file(file_obj, chunk_size: int) -> Iterator[bytes]:
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+# ── S3 backend ───────────────────────────────────────────────────────────────
+
+def _new_part_buffer():
+    # Stays in memory up to one chunk, then spills to disk.
+    return tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_CHUNK_BYTES)
+
+
+def _s3_put_stream(key: str, chunks: Iterable[bytes], content_type: str) -> None:
+    client = _s3_client()
+    bucket = _bucket()
+    part_bytes = max(settings.S3_MULTIPART_PART_BYTES, _S3_MIN_PART_BYTES)
+
+    upload_id = None
+    parts: list[dict] = []
+    buf = _new_part_buffer()
+
+    def flush_part() -> None:
+        nonlocal buf
+        buf.seek(0)
+        resp = client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=len(parts) + 1,
+            Body=buf,
+        )
+        parts.append({"ETag": resp["ETag"], "PartNumber": len(parts) + 1})
+        buf.close()
+        buf = _new_part_buffer()
+
+    try:
+        for chunk in chunks:
+            buf.write(chunk)
+            if buf.tell() >= part_bytes:
+                if upload_id is None:
+                    upload_id = client.create_multipart_upload(
+                        Bucket=bucket, Key=key, ContentType=content_type
+                    )["UploadId"]
+                flush_part()
+
+        if upload_id is None:
+            # Whole object fit in one part — a plain PUT is cheaper than multipart.
+            buf.seek(0)
+            client.put_object(Bucket=bucket, Key=key, Body=buf, ContentType=content_type)
+            return
+
+        if buf.tell() > 0:
+            flush_part()
+        client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        if upload_id is not None:
+            try:
+                client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            except Exception as exc:
+                logger.warning("S3 abort_multipart_upload failed for %s: %s", key, exc)
+        raise
+    finally:
+        buf.close()
+
+
+# ── Local backend ────────────────────────────────────────────────────────────
+
+def _local_put_stream(key: str, chunks: Iterable[bytes]) -> None:
+    path = os.path.join(_local_root(), *key.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ── Content-addressed index ──────────────────────────────────────────────────
+
+# Insert the first reference or bump an existing one.  Valid on Postgres and
+# SQLite; the row lock taken by ON CONFLICT serialises against deletes.
+_ACQUIRE_SQL = """
+    INSERT INTO stored_images (content_hash, url, content_type, size_bytes, ref_count)
+    VALUES (:content_hash, :url, :content_type, :size_bytes, 1)
+    ON CONFLICT (content_hash) DO UPDATE SET ref_count = stored_images.ref_count + 1
+    RETURNING url, ref_count
+"""
+
+
+def _index_engine():
+    from app.core.database import engine
+    return engine
+
+
+def _spool_and_hash(chunks: Iterable[bytes]):
+    """Drain `chunks` into a bounded spool file, hashing as bytes arrive."""
+    digest = hashlib.sha256()
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_CHUNK_BYTES)
+    size = 0
+    try:
+        for chunk in chunks:
+            digest.update(chunk)
+            spool.write(chunk)
+            size += len(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest(), size
+
+
+def _url_for_key(key: str) -> str:
+    if _use_local():
+        return f"/uploads/{key}"
     return f"https://{_bucket()}.s3.amazonaws.com/{key}"
 
 
-def delete_image(url: str):
-    """Delete an image from S3 given its full URL. Silently ignores errors."""
-    if not url or not url.startswith("https://"):
+def _put_object(key: str, spool, content_type: str) -> None:
+    spool.seek(0)
+    chunks = _iter_file(spool, settings.UPLOAD_CHUNK_BYTES)
+    if _use_local():
+        _local_put_stream(key, chunks)
+    else:
+        _s3_put_stream(key, chunks, content_type)
+
+
+def _delete_object(url: str) -> None:
+    if url.startswith("/uploads/"):
+        root = os.path.realpath(_local_root())
+        path = os.path.realpath(os.path.join(root, url[len("/uploads/"):]))
+        if not path.startswith(root + os.sep):
+            return
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("Local delete failed for %s: %s", url, e)
+        return
+    if not url.startswith("https://"):
         return
+    ClientError = require_module("botocore.exceptions").ClientError
     try:
         bucket = _bucket()
         key = url.split(f"https://{bucket}.s3.amazonaws.com/")[-1]
         _s3_client().delete_object(Bucket=bucket, Key=key)
     except ClientError as e:
         logger.warning("S3 delete failed for %s: %s", url, e)
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def upload_image_stream(
+    chunks: Iterable[bytes],
+    prefix: str,
+    item_id: int,
+    original_filename: str,
+    content_type: str,
+) -> str:
+    """
+    Store `chunks` content-addressed and return the image URL.
+
+    The stream is hashed while it is spooled (bounded memory, spills to disk).
+    If an object with the same SHA-256 already exists its URL is reused and
+    its reference count bumped — nothing is transferred to storage.  Any
+    exception raised by the iterator (e.g. the 413 from `iter_upload_chunks`)
+    aborts before anything is stored or counted.
+    """
+    spool, content_hash, size = _spool_and_hash(chunks)
+    try:
+        ext = os.path.splitext(original_filename or "image.jpg")[1].lower() or ".jpg"
+        key = f"{prefix}/{content_hash}{ext}"
+        engine = _index_engine()
+        params = {
+            "content_hash": content_hash,
+            "url": _url_for_key(key),
+            "content_type": content_type,
+            "size_bytes": size,
+        }
+
+        with engine.connect() as conn:
+            existing = conn.execute(
+                text("SELECT url FROM stored_images WHERE content_hash = :h"),
+                {"h": content_hash},
+            ).first()
+
+        if existing is None:
+            # Safe even if a concurrent upload of the same bytes races us —
+            # both write identical content to the same key.
+            _put_object(key, spool, content_type)
+
+        with engine.begin() as conn:
+            url, ref_count = conn.execute(text(_ACQUIRE_SQL), params).one()
+            if existing is not None and ref_count == 1:
+                # The last reference was deleted between our lookup and the
+                # upsert, taking the object with it — store it again.
+                _put_object(key, spool, content_type)
+
+        if existing is not None:
+            logger.info("Image dedup hit for item=%s (refs=%d): %s", item_id, ref_count, url)
+        return url
+    finally:
+        spool.close()
+
+
+def upload_image(file_obj, prefix: str, item_id: int, original_filename: str, content_type: str) -> str:
+    """Upload a file-like object and return its public URL."""
+    chunks = _iter_file(file_obj, settings.UPLOAD_CHUNK_BYTES)
+    return upload_image_stream(chunks, prefix, item_id, original_filename, content_type)
+
+
+def read_image(url: str) -> bytes:
+    """Fetch a stored image's bytes (used by the derivative pipeline)."""
+    if url.startswith("/uploads/"):
+        with open(os.path.join(_local_root(), *url[len("/uploads/"):].split("/")), "rb") as f:
+            return f.read()
+    bucket = _bucket()
+    key = url.split(f"https://{bucket}.s3.amazonaws.com/")[-1]
+    return _s3_client().get_object(Bucket=bucket, Key=key)["Body"].read()
+
+
+def delete_image(url: str):
+    """
+    Release one reference to a stored image; remove the object at zero refs.
+
+    URLs not in the content-addressed index (uploads from before dedup) are
+    deleted directly, as before.  Silently ignores storage errors.
+    """
+    if not url:
+        return
+    with _index_engine().begin() as conn:
+        # UPDATE holds the row lock until commit, so a concurrent upload of the
+        # same bytes waits and then re-creates the row (and object) cleanly.
+        row = conn.execute(
+            text(
+                "UPDATE stored_images SET ref_count = ref_count - 1 "
+                "WHERE url = :url RETURNING ref_count"
+            ),
+            {"url": url},
+        ).first()
+        if row is not None and row.ref_count > 0:
+            return
+        _delete_object(url)
+        if row is not None:
+            conn.execute(text("DELETE FROM stored_images WHERE url = :url AND ref_count <= 0"), {"url": url})
@@ -1,21 +1,50 @@
-"""Byte limits for image uploads (enforced before S3)."""
+"""Byte limits for image uploads (enforced while streaming to storage)."""
+
+from typing import Iterator
 
-import io
 from fastapi import HTTPException, UploadFile
 
+from app.core.config import settings
+
 MANAGER_IMAGE_MAX_BYTES = 5 * 1024 * 1024
 CUSTOMER_IMAGE_MAX_BYTES = 3 * 1024 * 1024
 
 
-def buffer_upload_file(upload_file: UploadFile, max_bytes: int, upload_kind: str) -> io.BytesIO:
-    """Read upload into memory capped at max_bytes; raise 413 if larger."""
+def _too_large(max_bytes: int, upload_kind: str) -> HTTPException:
+    mb = max_bytes // (1024 * 1024)
+    return HTTPException(
+        status_code=413,
+        detail=f"Image too large. Maximum size is {mb} MB for {upload_kind} uploads.",
+    )
+
+
+def iter_upload_chunks(
+    upload_file: UploadFile,
+    max_bytes: int,
+    upload_kind: str,
+    chunk_size: int = 0,
+) -> Iterator[bytes]:
+    """
+    Yield the upload in `chunk_size` pieces, raising 413 as soon as the running
+    total passes `max_bytes`.
+
+    Only one chunk is held in memory at a time, so the storage backend can
+    stream straight through.  When the multipart parser already knows the size
+    we reject oversize files before reading a single byte.
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_BYTES
+    known_size = getattr(upload_file, "size", None)
+    if known_size is not None and known_size > max_bytes:
+        raise _too_large(max_bytes, upload_kind)
+
     f = upload_file.file
     f.seek(0)
-    data = f.read(max_bytes + 1)
-    if len(data) > max_bytes:
-        mb = max_bytes // (1024 * 1024)
-        raise HTTPException(
-            status_code=413,
-            detail=f"Image too large. Maximum size is {mb} MB for {upload_kind} uploads.",
-        )
-    return io.BytesIO(data)
+    total = 0
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large(max_bytes, upload_kind)
+        yield chunk
@@ -19,7 +19,10 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.api import menu, order, dashboard, settings as settings_api, images as images_api, analytics as analytics_api
 from app.core.config import settings
-from app.core.database import engine, Base, init_db
+from app.core.database import init_db
+from app.core.clients import close_clients
+from app.services.image_derivatives import shutdown_pool as shutdown_image_pool
+from app.services import ask_shari_cache, cache_warmup, dashboard_counters, idempotency
 from app.core.logging import setup_logging
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models import *
@@ -29,8 +32,8 @@ import os
 # Set up logging
 logger = setup_logging()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Tables are created by init_db() in the startup hook rather than at import
+# time, so `import app.main` never opens a database connection.
 
 app = FastAPI(
     title="Sushi POS API",
@@ -93,6 +96,19 @@ async def root():
         "status": "running"
     }
 
+
+# Ops diagnostics — like "/", these are not tenant-scoped and take no
+# credentials: they describe this worker process, not a restaurant's data.
+# Keep them off the public internet (reverse proxy / security group).
+
+@app.get("/api/v1/menu/menu-items/ask-shari/cache-stats", response_model=dict, tags=["Ops"])
+def ask_shari_cache_stats():
+    """
+    Ask Shari response cache counters for this worker: hits, misses,
+    evictions, and (in-memory backend) entries and bytes across all tenants.
+    """
+    return ask_shari_cache.cache_stats()
+
 @app.on_event("startup")
 async def startup_event():
     """
@@ -102,6 +118,12 @@ async def startup_event():
     logger.info("Starting Sushi POS API...")
     # Initialize the database
     init_db()
+    # Replay popular queries in the background and after every menu change
+    cache_warmup.install()
+    # Keep dashboard counters current on order writes, and reconcile them periodically
+    dashboard_counters.install()
+    # Sweep expired idempotency keys
+    idempotency.install()
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -110,4 +132,10 @@ async def shutdown_event():
     Performs any necessary cleanup tasks.
     """
     logger.info("Shutting down Sushi POS API...")
-    # Add any cleanup tasks here
+    # Release pooled S3 / OpenAI connections held by this worker
+    close_clients()
+    shutdown_image_pool()
+    analytics_api.shutdown_query_pool()
+    cache_warmup.shutdown()
+    dashboard_counters.shutdown()
+    idempotency.shutdown()
@@ -11,6 +11,11 @@ from .order import Order, OrderItem, OrderStatus, Table, TableStatus, Discount
 from .user import User
 from .settings import Settings
 from .embeddings import MenuItemEmbedding
+from .stored_image import StoredImage
+from .menu_version import MenuVersion
+from .query_frequency import QueryFrequency
+from .dashboard_counter import DashboardCounter
+from .idempotency_key import IdempotencyKey
 
 __all__ = [
     "Tenant",
@@ -30,4 +35,9 @@ __all__ = [
     "ImageReport",
     "ImageStatusEnum",
     "MenuItemEmbedding",
+    "StoredImage",
+    "MenuVersion",
+    "QueryFrequency",
+    "DashboardCounter",
+    "IdempotencyKey",
 ]
\ No newline at end of file
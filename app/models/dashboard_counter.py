@@ -0,0 +1,41 @@
+"""
+DashboardCounter model — the manager dashboard's numbers, one row per tenant.
+
+Maintained on every order write by app/services/dashboard_counters.py (in
+the same transaction as the write) and periodically recomputed from `orders`
+by its reconcile job, so the dashboard reads one row however long the
+restaurant's history is.
+"""
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric
+from app.core.database import Base
+
+
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), primary_key=True)
+
+    # all-time, every status (same definition the dashboard always used)
+    total_orders = Column(Integer, nullable=False, default=0)
+    total_revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+    # status histogram over all orders; "active" = pending + preparing + ready
+    pending = Column(Integer, nullable=False, default=0)
+    preparing = Column(Integer, nullable=False, default=0)
+    ready = Column(Integer, nullable=False, default=0)
+    delivered = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+
+    # the restaurant's local business day the *_today columns belong to;
+    # a write on a later day starts them over from zero
+    day = Column(Date, nullable=True)
+    orders_today = Column(Integer, nullable=False, default=0)
+    revenue_today = Column(Numeric(12, 2), nullable=False, default=0)
+    # orders completed today and the sum of their created → completed times
+    completed_today = Column(Integer, nullable=False, default=0)
+    ticket_seconds_today = Column(Integer, nullable=False, default=0)
+
+    # last full recount from `orders`
+    reconciled_at = Column(DateTime, nullable=True)
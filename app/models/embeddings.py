@@ -9,16 +9,34 @@ Tenant isolation: tenant_id is always present so every query can be scoped to a
 single restaurant without cross-tenant leakage.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, ForeignKey, JSON
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from app.core.database import Base
+from app.core.lazy_imports import optional_module
 
-try:
-    from pgvector.sqlalchemy import Vector as PGVector
-    _VECTOR_AVAILABLE = True
-except ImportError:  # pgvector not installed — fall back to JSON blob (no similarity search)
-    from sqlalchemy import JSON as PGVector
-    _VECTOR_AVAILABLE = False
+
+class _LazyVector(TypeDecorator):
+    """
+    pgvector `VECTOR(dim)` column type, resolved on first use by a dialect.
+
+    Importing pgvector.sqlalchemy drags numpy in with it, so the real type is
+    only loaded when SQLAlchemy first compiles DDL or binds a value — not when
+    the model module is imported.  If pgvector isn't installed we fall back to
+    a JSON blob (no similarity search), same as before.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def load_dialect_impl(self, dialect):
+        pgvector_sa = optional_module("pgvector.sqlalchemy", "vector similarity search")
+        if pgvector_sa is None:
+            return dialect.type_descriptor(JSON())
+        return dialect.type_descriptor(pgvector_sa.Vector(self.dim))
 
 
 class MenuItemEmbedding(Base):
@@ -48,7 +66,7 @@ class MenuItemEmbedding(Base):
     # Uses pgvector's Vector type when the extension is available; falls back
     # to a JSON column (which disables vector similarity search but keeps the
     # rest of the pipeline functional for hashing / keyword-only fallback).
-    embedding = Column(PGVector(1536) if _VECTOR_AVAILABLE else PGVector, nullable=True)
+    embedding = Column(_LazyVector(1536), nullable=True)
 
     # Which model + logical version produced this embedding.
     # Storing both lets you run A/B migrations: keep old embeddings live while
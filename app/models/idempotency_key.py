@@ -0,0 +1,34 @@
+"""
+IdempotencyKey model — the stored response of an order write, per client key.
+
+Written by app/services/idempotency.py in the same transaction as the order
+it describes, so a key is either absent or paired with a committed order and
+the response that created it.  A retried request with the same key gets that
+response back instead of a second ticket.
+"""
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "key", name="uq_idempotency_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+
+    # the client's Idempotency-Key header, unique per tenant
+    key = Column(String(255), nullable=False)
+
+    # sha256 of the endpoint and request body — a reused key must match it
+    request_hash = Column(String(64), nullable=False)
+
+    # what the first request returned (set before its commit), replayed to retries
+    response_body = Column(JSON, nullable=True)
+
+    # naive UTC; rows past expires_at are ignored and swept
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -10,7 +10,7 @@ It includes:
 """
 
 # all the database stuff we need
-from sqlalchemy import Boolean, Column, Integer, String, Text, Numeric, Float, ForeignKey, DateTime, Table, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, Integer, String, Text, Numeric, Float, ForeignKey, DateTime, Table, JSON, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -158,6 +158,7 @@ class MenuItem(Base):
     image_position_x = Column(Float, nullable=False, default=50.0)  # object-position x percentage (0-100)
     image_position_y = Column(Float, nullable=False, default=50.0)  # object-position y percentage (0-100)
     image_zoom = Column(Float, nullable=False, default=1.0)  # visual zoom multiplier (>=1)
+    image_variants = Column(JSON, nullable=True)  # resized WebP/JPEG derivative URLs (see services/image_derivatives)
     is_available = Column(Boolean, default=True)  # whether we can order this right now
     is_popular = Column(Boolean, default=False)  # whether this is a popular item
     display_order = Column(Integer, nullable=False, default=0)  # where to show this in the menu
@@ -189,6 +190,7 @@ class MenuItemImage(Base):
     id = Column(Integer, primary_key=True, index=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
     image_url = Column(String(255), nullable=False)
+    image_variants = Column(JSON, nullable=True)  # resized WebP/JPEG derivative URLs
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
     report_count = Column(Integer, default=0)
@@ -0,0 +1,23 @@
+"""
+MenuVersion model — shared per-tenant menu version counter.
+
+The Ask Shari cache bakes the tenant's menu version into every cache key, so
+bumping it invalidates all cached answers at once.  Keeping the counter in
+the database (rather than per process) means every API worker sees the same
+version, and a restart never rewinds it onto old cache keys.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class MenuVersion(Base):
+    __tablename__ = "menu_versions"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), primary_key=True)
+
+    # monotonically increasing; seeded from the clock so it never restarts at 1
+    version = Column(BigInteger, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
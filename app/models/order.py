@@ -106,6 +106,7 @@ class Order(Base):
     # when this order was created and last updated
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completion_time = Column(DateTime, nullable=True)  # when it was marked COMPLETED (UTC)
 
     # connect this order to its table, items, and discount
     table = relationship("Table", back_populates="orders")
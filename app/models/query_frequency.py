@@ -0,0 +1,33 @@
+"""
+QueryFrequency model — how often each normalized query is asked, per tenant.
+
+Feeds the cache warm-up job (app/services/cache_warmup.py): after a deploy or
+a menu change, the most frequent Ask Shari questions and search queries are
+replayed in the background so customers don't pay the cold-cache latency.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class QueryFrequency(Base):
+    __tablename__ = "query_frequencies"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "kind", "query", "filters", name="uq_query_frequency"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
+
+    # "ask_shari" or "search"
+    kind = Column(String(20), nullable=False)
+
+    # normalized query text (see ask_shari_cache.normalize_query)
+    query = Column(String(500), nullable=False)
+
+    # ask_shari_cache.filter_signature(filters) — the same string that scopes the cache key
+    filters = Column(String(255), nullable=False, default="")
+
+    hits = Column(Integer, nullable=False, default=0)
+    last_seen = Column(DateTime(timezone=True), server_default=func.now())
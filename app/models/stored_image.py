@@ -0,0 +1,36 @@
+"""
+StoredImage model — content-addressed index of every image blob in storage.
+
+Each distinct image (by SHA-256 of its bytes) is stored once under
+`<prefix>/<sha256><ext>`.  Rows that point at it (menu_items.image_url,
+menu_item_images.image_url, image_variants entries) share the same URL, and
+`ref_count` tracks how many of them there are so `delete_image` only removes
+the object when the last reference goes away.
+
+Not tenant-scoped on purpose: this is the blob layer underneath the business
+tables, and ownership is enforced on the rows that reference the URL.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class StoredImage(Base):
+    __tablename__ = "stored_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # SHA-256 hex digest of the stored bytes — the dedup key
+    content_hash = Column(String(64), nullable=False, unique=True)
+
+    # public URL handed out to callers (also used to find the row on delete)
+    url = Column(String(255), nullable=False, unique=True)
+
+    content_type = Column(String(50), nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+
+    # number of DB references to this blob; the object is deleted at zero
+    ref_count = Column(Integer, nullable=False, default=1)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
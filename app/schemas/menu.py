@@ -45,6 +45,7 @@ class MenuItemUpdate(MenuItemBase):
 class MenuItemResponse(MenuItemBase):
     """Schema for menu item responses."""
     id: int
+    image_variants: Optional[dict] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -133,6 +134,7 @@ class MenuItemImageResponse(BaseModel):
     menu_item_id: int
     menu_item_name: Optional[str] = None
     image_url: str
+    image_variants: Optional[dict] = None
     uploaded_at: datetime
     reviewed_at: Optional[datetime] = None
     report_count: int
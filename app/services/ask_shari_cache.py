@@ -1,20 +1,33 @@
 """
 Ask Shari response cache.
 
-Keyed by (tenant_id, menu_version, normalized_query). The cache returns the
-full JSON response that should be sent back to the client, so a hit is just
-one dict lookup — no LLM call, no retrieval.
+Keyed by (tenant_id, menu_version, filters, normalized_query). The cache
+returns the full JSON response that should be sent back to the client, so a
+hit is just one dict lookup — no LLM call, no retrieval.
+
+Semantic tier:
+  Exact keys miss on paraphrases ("spicy tuna roll" vs "spicy tuna rolls").
+  Every freshly computed response also records its query embedding in a small
+  per-process index scoped to (tenant_id, menu_version, filters).  On an exact
+  miss, `get_semantic` returns the stored response whose query embedding has
+  cosine similarity >= ASK_SHARI_SEMANTIC_THRESHOLD with the new one.  The
+  index only holds vectors and keys — responses stay in the backend below, so
+  TTL and invalidation apply to both tiers alike.
 
 Backend selection:
   * If ASK_SHARI_REDIS_URL is set AND the `redis` package is importable, Redis
-    is used.  Otherwise we fall back to an in-memory TTL cache guarded by a
-    lock so concurrent requests can't corrupt it.
+    is used.  Otherwise we fall back to an in-memory TTL + LRU cache bounded
+    by ASK_SHARI_CACHE_MAX_BYTES and guarded by a lock so concurrent requests
+    can't corrupt it.
 
 Invalidation strategy:
-  A per-tenant `menu_version` counter is part of the cache key.  Bumping the
+  A per-tenant `menu_version` counter, shared by all API workers (see the
+  version registry below), is part of the cache key.  Bumping the
   version (via `bump_menu_version`) instantly invalidates every cached entry
   for that tenant without having to walk the cache.  Menu CRUD endpoints call
-  `bump_menu_version` so stale items never surface after an edit.
+  `bump_menu_version` so stale items never surface after an edit.  The
+  in-memory backend also frees the superseded entries right away; Redis lets
+  them age out via TTL.
 """
 
 from __future__ import annotations
@@ -24,9 +37,11 @@ import logging
 import re
 import threading
 import time
+from collections import OrderedDict
 from typing import Any, Optional
 
 from app.core.config import settings
+from app.core.lazy_imports import optional_module
 
 logger = logging.getLogger(__name__)
 
@@ -42,63 +57,362 @@ def normalize_query(query: str) -> str:
 
 
 # ── Menu version registry (cheap invalidation token) ─────────────────────────
+#
+# The authoritative counter lives in a store shared by every API worker:
+#   * Redis (INCR) when ASK_SHARI_REDIS_URL is set — next to the cache keys;
+#   * otherwise the Postgres `menu_versions` table, with LISTEN/NOTIFY so the
+#     other workers hear about a bump immediately;
+#   * a process-local dict only as a last resort (tests, no database).
+# Each worker keeps a short local copy (ASK_SHARI_VERSION_CACHE_S) so the hot
+# path rarely touches the store.  New counters are seeded from the clock, so a
+# lost or recreated counter still lands above every version already used in
+# cache keys.
+
+def _seed_version() -> int:
+    return int(time.time())
+
+
+class _LocalVersionStore:
+    """Process-local counters — correct for a single worker only."""
+
+    def __init__(self) -> None:
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: int) -> int:
+        with self._lock:
+            return self._versions.setdefault(tenant_id, 1)
+
+    def bump(self, tenant_id: int) -> int:
+        with self._lock:
+            self._versions[tenant_id] = self._versions.get(tenant_id, 1) + 1
+            return self._versions[tenant_id]
+
+
+class _RedisVersionStore:
+    """Redis counters (`INCR` is atomic across workers and survives restarts)."""
+
+    def __init__(self, url: str) -> None:
+        import redis  # local import so the package is optional
+        self._client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    @staticmethod
+    def _key(tenant_id: int) -> str:
+        return f"ask_shari:menu_version:t{tenant_id}"
+
+    def get(self, tenant_id: int) -> int:
+        key = self._key(tenant_id)
+        raw = self._client.get(key)
+        if raw is None:
+            self._client.set(key, _seed_version(), nx=True)
+            raw = self._client.get(key)
+        return int(raw)
+
+    def bump(self, tenant_id: int) -> int:
+        key = self._key(tenant_id)
+        self._client.set(key, _seed_version(), nx=True)
+        return int(self._client.incr(key))
+
+
+class _PostgresVersionStore:
+    """`menu_versions` rows, with NOTIFY on bump and a LISTEN thread per worker."""
+
+    CHANNEL = "ask_shari_menu_version"
+
+    _UPSERT_SQL = """
+        INSERT INTO menu_versions (tenant_id, version) VALUES (:tenant_id, :seed)
+        ON CONFLICT (tenant_id) DO UPDATE SET version = menu_versions.version + :step
+        RETURNING version
+    """
+
+    def __init__(self, engine) -> None:
+        self._engine = engine
+        self._listener: Optional[threading.Thread] = None
+
+    def get(self, tenant_id: int) -> int:
+        from sqlalchemy import text
+        with self._engine.begin() as conn:
+            row = conn.execute(
+                text("SELECT version FROM menu_versions WHERE tenant_id = :t"), {"t": tenant_id}
+            ).first()
+            if row is not None:
+                return int(row.version)
+            # first use for this tenant: create the row (step 0 if we raced)
+            return int(conn.execute(
+                text(self._UPSERT_SQL), {"tenant_id": tenant_id, "seed": _seed_version(), "step": 0}
+            ).scalar())
+
+    def bump(self, tenant_id: int) -> int:
+        from sqlalchemy import text
+        with self._engine.begin() as conn:
+            version = int(conn.execute(
+                text(self._UPSERT_SQL), {"tenant_id": tenant_id, "seed": _seed_version(), "step": 1}
+            ).scalar())
+            # delivered to listeners when this transaction commits
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {
+                "channel": self.CHANNEL, "payload": f"{tenant_id}:{version}",
+            })
+        return version
+
+    def start_listener(self, on_version) -> None:
+        """Start the daemon thread that feeds NOTIFY payloads to `on_version(tenant_id, version)`."""
+        if self._listener is not None:
+            return
+        self._listener = threading.Thread(
+            target=self._listen, args=(on_version,), name="menu-version-listener", daemon=True
+        )
+        self._listener.start()
+
+    def _listen(self, on_version) -> None:
+        import select
+
+        # A dedicated driver connection, outside the pool — it is held forever.
+        cargs, cparams = self._engine.dialect.create_connect_args(self._engine.url)
+        while True:
+            try:
+                dbapi_conn = self._engine.dialect.connect(*cargs, **cparams)
+                try:
+                    dbapi_conn.autocommit = True
+                    with dbapi_conn.cursor() as cur:
+                        cur.execute(f"LISTEN {self.CHANNEL}")
+                    while True:
+                        if select.select([dbapi_conn], [], [], 30.0) == ([], [], []):
+                            continue
+                        dbapi_conn.poll()
+                        while dbapi_conn.notifies:
+                            tenant, _, version = dbapi_conn.notifies.pop(0).payload.partition(":")
+                            on_version(int(tenant), int(version))
+                finally:
+                    dbapi_conn.close()
+            except Exception as exc:
+                logger.warning("Menu version listener lost its connection (%s) — retrying in 5s", exc)
+                time.sleep(5.0)
+
 
 _version_lock = threading.Lock()
-_menu_versions: dict[int, int] = {}
+_version_store = None
+# tenant_id → (version, fetched_at) — short-lived copy of the shared store
+_menu_versions: dict[int, tuple[int, float]] = {}
+
+
+def _get_version_store():
+    """Lazy-construct the version store (same selection rules as the cache backend)."""
+    global _version_store
+    if _version_store is not None:
+        return _version_store
+    with _version_lock:
+        if _version_store is not None:
+            return _version_store
+        choice = settings.ASK_SHARI_VERSION_STORE.lower()
+        if choice in ("auto", "redis") and settings.ASK_SHARI_REDIS_URL:
+            try:
+                _version_store = _RedisVersionStore(settings.ASK_SHARI_REDIS_URL)
+                logger.info("Ask Shari menu version store: Redis")
+                return _version_store
+            except Exception as exc:
+                logger.warning("Failed to init Redis version store (%s)", exc)
+        if choice in ("auto", "postgres"):
+            from app.core.database import engine
+            if engine.dialect.name == "postgresql":
+                store = _PostgresVersionStore(engine)
+                store.start_listener(_observe_version)
+                _version_store = store
+                logger.info("Ask Shari menu version store: Postgres (LISTEN/NOTIFY)")
+                return _version_store
+        _version_store = _LocalVersionStore()
+        logger.info("Ask Shari menu version store: process-local")
+        return _version_store
+
+
+def _observe_version(tenant_id: int, version: int) -> int:
+    """
+    Record a version seen in the shared store; purge local entries it
+    supersedes.  Returns the version this worker keeps: never lower than its
+    own, since a bump whose store write failed left it ahead of the store.
+    """
+    with _version_lock:
+        previous = _menu_versions.get(tenant_id, (0, 0.0))[0]
+        kept = max(version, previous)
+        # refreshed either way, so a store that lags behind isn't re-read every call
+        _menu_versions[tenant_id] = (kept, time.time())
+    if version > previous and previous:
+        _get_backend().purge_superseded(tenant_id, version)
+    return kept
 
 
 def get_menu_version(tenant_id: int) -> int:
     """Return the current menu version for `tenant_id` (creating it lazily)."""
     with _version_lock:
-        return _menu_versions.setdefault(tenant_id, 1)
+        cached = _menu_versions.get(tenant_id)
+    if cached is not None and time.time() - cached[1] < settings.ASK_SHARI_VERSION_CACHE_S:
+        return cached[0]
+    try:
+        version = _get_version_store().get(tenant_id)
+    except Exception as exc:
+        logger.warning("Menu version store read failed (%s) — using last known version", exc)
+        return cached[0] if cached is not None else 1
+    return _observe_version(tenant_id, version)
 
 
 def bump_menu_version(tenant_id: int) -> int:
     """
     Invalidate every cached Ask Shari response for `tenant_id` by rotating the
     version token that is baked into the cache key.  O(1) — no scanning.
+    Other workers pick the new version up via NOTIFY, or within
+    ASK_SHARI_VERSION_CACHE_S at the latest.
     """
+    try:
+        new = _get_version_store().bump(tenant_id)
+    except Exception as exc:
+        # Still invalidate locally — the shared counter catches up on the next bump.
+        logger.warning("Menu version store bump failed (%s) — invalidating this worker only", exc)
+        with _version_lock:
+            new = _menu_versions.get(tenant_id, (1, 0.0))[0] + 1
     with _version_lock:
-        _menu_versions[tenant_id] = _menu_versions.get(tenant_id, 1) + 1
-        new = _menu_versions[tenant_id]
-    logger.info("Ask Shari cache invalidated for tenant=%d (version → %d)", tenant_id, new)
+        _menu_versions[tenant_id] = (new, time.time())
+    purged = _get_backend().purge_superseded(tenant_id, new)
+    logger.info(
+        "Ask Shari cache invalidated for tenant=%d (version → %d, %d entries purged)",
+        tenant_id, new, purged,
+    )
+    for listener in list(_bump_listeners):
+        try:
+            listener(tenant_id, new)
+        except Exception as exc:
+            logger.warning("Menu version bump listener failed: %s", exc)
     return new
 
 
+_bump_listeners: list = []
+
+
+def add_bump_listener(listener) -> None:
+    """Call `listener(tenant_id, new_version)` after every bump made by this worker."""
+    if listener not in _bump_listeners:
+        _bump_listeners.append(listener)
+
+
 # ── Cache backend ────────────────────────────────────────────────────────────
 
 class _BaseCache:
     def get(self, key: str) -> Optional[dict]: ...
     def set(self, key: str, value: dict, ttl_s: int) -> None: ...
 
+    def purge_superseded(self, tenant_id: int, current_version: int) -> int:
+        """Drop a tenant's entries from older menu versions.  Returns the count."""
+        return 0
+
+    def stats(self) -> dict:
+        return {}
+
+
+# ask_shari:v{version}:t{tenant}:... — see _make_key
+_KEY_SCOPE = re.compile(r"^ask_shari:v(\d+):t(\d+):")
+
 
 class _InMemoryCache(_BaseCache):
-    """Thread-safe TTL cache used when Redis is unavailable."""
+    """
+    Thread-safe TTL + LRU cache used when Redis is unavailable.
+
+    * Bounded by bytes (size of the JSON-encoded value plus the key), not
+      entry count — one 20-item response weighs far more than a miss.
+    * Recency-ordered: a hit moves the entry to the back; eviction pops the
+      least recently used entry from the front.
+    * Expired entries are removed on read and by a sweep that runs at most
+      once per `sweep_interval_s`, piggy-backed on normal get/set calls.
+    * `purge_superseded` drops a tenant's old-version entries as soon as the
+      version is bumped, instead of waiting for them to age out.
+    """
 
-    def __init__(self, max_entries: int = 1024) -> None:
-        self._store: dict[str, tuple[float, dict]] = {}
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, sweep_interval_s: float = 60.0) -> None:
+        # key → (expires_at, value, size_bytes)
+        self._store: OrderedDict[str, tuple[float, dict, int]] = OrderedDict()
+        # tenant_id → {key: version} — lets a purge skip other tenants' entries
+        self._by_tenant: dict[int, dict[str, int]] = {}
         self._lock = threading.Lock()
-        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._sweep_interval_s = sweep_interval_s
+        self._next_sweep = time.time() + sweep_interval_s
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "purged": 0, "rejected": 0}
 
     def get(self, key: str) -> Optional[dict]:
+        now = time.time()
         with self._lock:
+            self._maybe_sweep(now)
             entry = self._store.get(key)
             if entry is None:
+                self._stats["misses"] += 1
                 return None
-            expires_at, value = entry
-            if expires_at < time.time():
-                # Evict expired entry lazily.
-                self._store.pop(key, None)
+            if entry[0] < now:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
                 return None
-            return value
+            self._store.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
 
     def set(self, key: str, value: dict, ttl_s: int) -> None:
+        size = len(key) + len(json.dumps(value, default=str))
+        now = time.time()
         with self._lock:
-            # Simple LRU-ish bound: when full, drop the oldest item by insertion order.
-            if len(self._store) >= self._max_entries:
+            self._maybe_sweep(now)
+            if key in self._store:
+                self._remove(key)
+            if size > self._max_bytes:
+                self._stats["rejected"] += 1
+                return
+            while self._bytes + size > self._max_bytes:
                 oldest_key = next(iter(self._store))
-                self._store.pop(oldest_key, None)
-            self._store[key] = (time.time() + ttl_s, value)
+                self._remove(oldest_key)
+                self._stats["evictions"] += 1
+            self._store[key] = (now + ttl_s, value, size)
+            self._bytes += size
+            scope = _KEY_SCOPE.match(key)
+            if scope:
+                self._by_tenant.setdefault(int(scope.group(2)), {})[key] = int(scope.group(1))
+
+    def purge_superseded(self, tenant_id: int, current_version: int) -> int:
+        with self._lock:
+            stale = [k for k, v in self._by_tenant.get(tenant_id, {}).items() if v != current_version]
+            for key in stale:
+                self._remove(key)
+            self._stats["purged"] += len(stale)
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._store),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    # callers hold self._lock
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._store.pop(key)
+        self._bytes -= size
+        scope = _KEY_SCOPE.match(key)
+        if scope:
+            tenant_keys = self._by_tenant.get(int(scope.group(2)))
+            if tenant_keys is not None:
+                tenant_keys.pop(key, None)
+                if not tenant_keys:
+                    del self._by_tenant[int(scope.group(2))]
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._sweep_interval_s
+        expired = [k for k, (expires_at, _, _) in self._store.items() if expires_at < now]
+        for key in expired:
+            self._remove(key)
+        self._stats["expirations"] += len(expired)
 
 
 class _RedisCache(_BaseCache):
@@ -122,6 +436,21 @@ class _RedisCache(_BaseCache):
             logger.warning("Ask Shari Redis value corrupt for key=%s — discarding", key)
             return None
 
+    def stats(self) -> dict:
+        # Redis tracks its own keyspace hits/misses/evictions (INFO stats).
+        try:
+            info = self._client.info("stats")
+        except Exception as exc:
+            logger.warning("Ask Shari Redis INFO failed (%s)", exc)
+            return {"backend": "redis"}
+        return {
+            "backend": "redis",
+            "hits": info.get("keyspace_hits"),
+            "misses": info.get("keyspace_misses"),
+            "evictions": info.get("evicted_keys"),
+            "expirations": info.get("expired_keys"),
+        }
+
     def set(self, key: str, value: dict, ttl_s: int) -> None:
         try:
             self._client.setex(key, ttl_s, json.dumps(value))
@@ -148,21 +477,122 @@ def _get_backend() -> _BaseCache:
                 return _backend
             except Exception as exc:
                 logger.warning("Failed to init Redis cache (%s) — using in-memory fallback", exc)
-        _backend = _InMemoryCache()
+        _backend = _InMemoryCache(
+            max_bytes=settings.ASK_SHARI_CACHE_MAX_BYTES,
+            sweep_interval_s=settings.ASK_SHARI_CACHE_SWEEP_INTERVAL_S,
+        )
         logger.info("Ask Shari cache backend: in-memory")
         return _backend
 
 
+# ── Semantic index (near-duplicate tier) ─────────────────────────────────────
+
+class _SemanticIndex:
+    """
+    Per-scope list of (unit query vector, cache key, expires_at).
+
+    Scope = (tenant_id, menu_version, filter signature).  Each scope keeps at
+    most `max_entries` vectors (oldest dropped first); scopes of superseded
+    menu versions are dropped when the tenant's next entry is added.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._scopes: dict[tuple[int, int, str], list[tuple[list[float], str, float]]] = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def add(self, scope: tuple[int, int, str], vector: list[float], key: str, ttl_s: int) -> None:
+        unit = _unit(vector)
+        if unit is None:
+            return
+        tenant_id, version, _ = scope
+        with self._lock:
+            for stale in [s for s in self._scopes if s[0] == tenant_id and s[1] != version]:
+                del self._scopes[stale]
+            entries = self._scopes.setdefault(scope, [])
+            entries[:] = [e for e in entries if e[1] != key]
+            entries.append((unit, key, time.time() + ttl_s))
+            if len(entries) > self._max_entries:
+                del entries[: len(entries) - self._max_entries]
+
+    def nearest(self, scope: tuple[int, int, str], vector: list[float]) -> Optional[tuple[float, str]]:
+        """Best (similarity, key) among live entries in `scope`, or None."""
+        unit = _unit(vector)
+        if unit is None:
+            return None
+        now = time.time()
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if not entries:
+                return None
+            entries[:] = [e for e in entries if e[2] >= now]
+            candidates = list(entries)
+        if not candidates:
+            return None
+
+        np = optional_module("numpy", "vectorised semantic cache lookup")
+        if np is not None:
+            sims = np.asarray([e[0] for e in candidates]) @ np.asarray(unit)
+            best = int(sims.argmax())
+            return float(sims[best]), candidates[best][1]
+        best_sim, best_key = max(
+            (sum(a * b for a, b in zip(e[0], unit)), e[1]) for e in candidates
+        )
+        return best_sim, best_key
+
+
+def _unit(vector: list[float]) -> Optional[list[float]]:
+    norm = sum(x * x for x in vector) ** 0.5
+    if not norm:
+        return None
+    return [x / norm for x in vector]
+
+
+_semantic_lock = threading.Lock()
+_semantic: Optional[_SemanticIndex] = None
+
+
+def _get_semantic_index() -> _SemanticIndex:
+    global _semantic
+    if _semantic is not None:
+        return _semantic
+    with _semantic_lock:
+        if _semantic is None:
+            _semantic = _SemanticIndex(settings.ASK_SHARI_SEMANTIC_MAX_ENTRIES)
+        return _semantic
+
+
+def semantic_enabled() -> bool:
+    return settings.ASK_SHARI_SEMANTIC_THRESHOLD > 0
+
+
 # ── Public API ───────────────────────────────────────────────────────────────
 
-def _make_key(tenant_id: int, query: str) -> str:
+def filter_signature(filters: Optional[dict]) -> str:
+    """
+    Stable string for the non-empty filters — "" when there are none.
+
+    Compact, key-sorted JSON, so equal filters always give the same string.
+    It scopes cache keys and the semantic index here, and is stored as
+    `query_frequencies.filters` by cache_warmup (which replays it with
+    json.loads) — changing the format orphans those rows' counts.
+    """
+    present = {k: v for k, v in (filters or {}).items() if v is not None}
+    return json.dumps(present, sort_keys=True, separators=(",", ":")) if present else ""
+
+
+def _make_key(tenant_id: int, query: str, filters: Optional[dict] = None) -> str:
     version = get_menu_version(tenant_id)
-    return f"ask_shari:v{version}:t{tenant_id}:{normalize_query(query)}"
+    signature = filter_signature(filters)
+    scope = f"ask_shari:v{version}:t{tenant_id}"
+    if signature:
+        scope += f":f{signature}"
+    return f"{scope}:{normalize_query(query)}"
 
 
-def get_cached(tenant_id: int, query: str) -> Optional[dict]:
+def get_cached(tenant_id: int, query: str, filters: Optional[dict] = None) -> Optional[dict]:
     """Return a cached response dict or None."""
-    key = _make_key(tenant_id, query)
+    key = _make_key(tenant_id, query, filters)
     value = _get_backend().get(key)
     if value is not None:
         logger.info("Ask Shari cache hit tenant=%d query=%r", tenant_id, query)
@@ -171,16 +601,62 @@ def get_cached(tenant_id: int, query: str) -> Optional[dict]:
     return value
 
 
-def set_cached(tenant_id: int, query: str, value: dict, ttl_s: Optional[int] = None) -> None:
-    """Store `value` under the (tenant_id, query) key with the configured TTL."""
-    key = _make_key(tenant_id, query)
-    _get_backend().set(key, value, ttl_s or settings.ASK_SHARI_CACHE_TTL_S)
+def set_cached(
+    tenant_id: int,
+    query: str,
+    value: dict,
+    ttl_s: Optional[int] = None,
+    filters: Optional[dict] = None,
+    query_vector: Optional[list[float]] = None,
+) -> None:
+    """
+    Store `value` under the (tenant_id, filters, query) key with the configured TTL.
+
+    Pass `query_vector` to also make the entry reachable from the semantic tier.
+    """
+    key = _make_key(tenant_id, query, filters)
+    ttl_s = ttl_s or settings.ASK_SHARI_CACHE_TTL_S
+    _get_backend().set(key, value, ttl_s)
+    if query_vector is not None and semantic_enabled():
+        scope = (tenant_id, get_menu_version(tenant_id), filter_signature(filters))
+        _get_semantic_index().add(scope, query_vector, key, ttl_s)
+
+
+def get_semantic(
+    tenant_id: int,
+    query_vector: list[float],
+    filters: Optional[dict] = None,
+) -> Optional[dict]:
+    """
+    Return the cached response of the most similar earlier query, if its
+    similarity clears ASK_SHARI_SEMANTIC_THRESHOLD; otherwise None.
+    """
+    if not semantic_enabled():
+        return None
+    scope = (tenant_id, get_menu_version(tenant_id), filter_signature(filters))
+    match = _get_semantic_index().nearest(scope, query_vector)
+    if match is None or match[0] < settings.ASK_SHARI_SEMANTIC_THRESHOLD:
+        return None
+    similarity, key = match
+    value = _get_backend().get(key)
+    if value is not None:
+        logger.info("Ask Shari semantic cache hit tenant=%d similarity=%.3f key=%s", tenant_id, similarity, key)
+    return value
+
+
+def cache_stats() -> dict:
+    """Hit / miss / eviction counters (and size, for the in-memory backend)."""
+    return _get_backend().stats()
 
 
 def reset_for_tests() -> None:
-    """Test helper: clear the cache backend and menu version registry."""
-    global _backend
+    """Test helper: clear the cache backend, semantic index and menu version registry."""
+    global _backend, _semantic, _version_store
     with _backend_lock:
         _backend = None
+    with _semantic_lock:
+        _semantic = None
     with _version_lock:
         _menu_versions.clear()
+        _version_store = _LocalVersionStore()
+    _bump_listeners.clear()
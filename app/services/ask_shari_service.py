@@ -9,6 +9,12 @@ Design philosophy:
   * If anything goes wrong (no API key, timeout, bad JSON, hallucinated names
     inside **...**), we fall back to a template narrative built from the
     top-ranked retrieval results so the UI stays fast and correct.
+  * A streaming variant (`ask_shari_stream`) sends retrieval results first,
+    then narrative text as the model writes it, holding back each **name**
+    until it has been validated.
+  * Two cache tiers sit in front: the exact normalized query, then — after
+    one embedding call, which retrieval reuses on a miss — the nearest
+    earlier query within the same tenant, menu version and filters.
 """
 
 from __future__ import annotations
@@ -17,12 +23,13 @@ import json
 import logging
 import re
 import time
-from typing import Optional
+from typing import Iterator, Optional
 
 from app.core.config import settings
+from app.core.clients import get_openai_client
 from app.models.menu import MenuItem
 from app.services import ask_shari_cache
-from app.services.embedding_service import hybrid_search
+from app.services.embedding_service import embed_query, hybrid_search
 
 logger = logging.getLogger(__name__)
 
@@ -134,17 +141,11 @@ def _call_llm(query: str, llm_items: list[dict]) -> Optional[dict]:
     if not settings.OPENAI_API_KEY:
         logger.info("Ask Shari LLM disabled (OPENAI_API_KEY missing)")
         return None
-    try:
-        from openai import OpenAI
-    except ImportError:
-        logger.warning("openai package not installed — Ask Shari LLM disabled")
+    # Shared pooled client — a per-call view carries the tighter timeout.
+    client = get_openai_client(timeout=settings.ASK_SHARI_TIMEOUT_S)
+    if client is None:
         return None
 
-    client = OpenAI(
-        api_key=settings.OPENAI_API_KEY,
-        timeout=settings.ASK_SHARI_TIMEOUT_S,
-    )
-
     started = time.monotonic()
     try:
         response = client.chat.completions.create(
@@ -249,7 +250,247 @@ def _validate_narrative(narrative: str, allowed_by_lower: dict[str, dict]) -> bo
     return True
 
 
-# ── Public entry point ───────────────────────────────────────────────────────
+# ── Streaming narrative ──────────────────────────────────────────────────────
+
+# The streaming call can't use JSON mode (narrative tokens would arrive
+# wrapped in JSON syntax), so it asks for plain prose plus a marker line.
+_FOLLOW_UP_MARKER = "FOLLOW_UP:"
+
+_STREAM_SYSTEM_PROMPT = (
+    _SYSTEM_PROMPT.split("6. ")[0]
+    + f"6. Output the paragraph as plain text, then a new line starting with "
+    f"'{_FOLLOW_UP_MARKER}' followed by the follow-up sentence — nothing else."
+)
+
+
+class _LLMStreamError(Exception):
+    """The streaming completion failed or ran past ASK_SHARI_TIMEOUT_S."""
+
+
+def _stream_llm(query: str, llm_items: list[dict]) -> Iterator[str]:
+    """
+    Yield narrative text deltas from a streaming chat completion.
+
+    Yields nothing when the LLM is disabled; raises `_LLMStreamError` when the
+    call fails or the whole stream exceeds ASK_SHARI_TIMEOUT_S.
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.info("Ask Shari LLM disabled (OPENAI_API_KEY missing)")
+        return
+    client = get_openai_client(timeout=settings.ASK_SHARI_TIMEOUT_S)
+    if client is None:
+        return
+
+    started = time.monotonic()
+    try:
+        stream = client.chat.completions.create(
+            model=settings.ASK_SHARI_MODEL,
+            messages=[
+                {"role": "system", "content": _STREAM_SYSTEM_PROMPT},
+                {"role": "user", "content": _build_user_prompt(query, llm_items).replace(_SCHEMA_HINT, "")},
+            ],
+            temperature=0.0,
+            max_tokens=settings.ASK_SHARI_MAX_TOKENS,
+            stream=True,
+        )
+        with stream:
+            for chunk in stream:
+                if time.monotonic() - started > settings.ASK_SHARI_TIMEOUT_S:
+                    raise _LLMStreamError("stream exceeded ASK_SHARI_TIMEOUT_S")
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+    except _LLMStreamError:
+        raise
+    except Exception as exc:
+        elapsed_ms = (time.monotonic() - started) * 1000
+        logger.warning("Ask Shari LLM stream failed after %.0fms: %s", elapsed_ms, exc)
+        raise _LLMStreamError(str(exc)) from exc
+
+    logger.info(
+        "Ask Shari LLM stream ok — latency=%.0fms model=%s",
+        (time.monotonic() - started) * 1000,
+        settings.ASK_SHARI_MODEL,
+    )
+
+
+class _NarrativeStream:
+    """
+    Incremental version of `_validate_narrative` + `_build_featured`.
+
+    `feed` takes raw LLM deltas and returns the events that are safe to send:
+    text is held back while a `**...**` span is still open, so every name the
+    client sees has already been checked against the allowed items.  An
+    unknown name sets `rejected` and nothing after it is released.
+    """
+
+    def __init__(self, allowed_by_lower: dict[str, dict]):
+        self.allowed_by_lower = allowed_by_lower
+        self.raw = ""
+        self.sent = 0           # chars of the narrative already released
+        self.rejected = False
+        self._seen_ids: set[int] = set()
+        self.featured: list[dict] = []
+
+    @property
+    def narrative(self) -> str:
+        return self.raw.split(_FOLLOW_UP_MARKER, 1)[0]
+
+    @property
+    def follow_up(self) -> str:
+        parts = self.raw.split(_FOLLOW_UP_MARKER, 1)
+        return parts[1].strip() if len(parts) == 2 else ""
+
+    def feed(self, delta: str) -> list[tuple[str, dict]]:
+        self.raw += delta
+        return self._release(final=False)
+
+    def finish(self) -> list[tuple[str, dict]]:
+        return self._release(final=True)
+
+    @property
+    def valid(self) -> bool:
+        return not self.rejected and _validate_narrative(self.narrative.strip(), self.allowed_by_lower)
+
+    def _release(self, final: bool) -> list[tuple[str, dict]]:
+        if self.rejected:
+            return []
+        narrative = self.narrative
+        end = len(narrative)
+        if not final and _FOLLOW_UP_MARKER not in self.raw:
+            # the tail might be the start of the marker — keep it back
+            for n in range(min(len(_FOLLOW_UP_MARKER) - 1, end), 0, -1):
+                if narrative.endswith(_FOLLOW_UP_MARKER[:n]):
+                    end -= n
+                    break
+            # an unclosed bold span (or a lone trailing "*") isn't checkable yet
+            if narrative[:end].count("**") % 2:
+                end = narrative[:end].rindex("**")
+            elif narrative[:end].endswith("*"):
+                end -= 1
+        if end <= self.sent:
+            return []
+
+        events: list[tuple[str, dict]] = []
+        for match in _BOLD_TOKEN_RE.finditer(narrative[:end]):
+            if match.end() <= self.sent:
+                continue
+            token = match.group(1).strip()
+            item = self.allowed_by_lower.get(token.lower())
+            if item is None:
+                logger.info("Ask Shari dropping streamed narrative with unknown item: %r", token)
+                self.rejected = True
+                end = match.start()
+                break
+            if item["id"] not in self._seen_ids:
+                self._seen_ids.add(item["id"])
+                entry = {"id": item["id"], "name": item["name"], "item": item}
+                self.featured.append(entry)
+                events.append(("featured", entry))
+
+        text = narrative[self.sent:end]
+        self.sent = max(self.sent, end)
+        if text:
+            events.insert(0, ("delta", {"text": text}))
+        return events
+
+
+# ── Pipeline pieces shared by the blocking and streaming entry points ────────
+
+def _filters(category_id, meal_period, min_price, max_price) -> dict:
+    return {
+        "category_id": category_id,
+        "meal_period": meal_period,
+        "min_price": min_price,
+        "max_price": max_price,
+    }
+
+
+def _lookup_and_retrieve(db, tenant_id: int, query: str, filters: dict) -> tuple[Optional[dict], Optional[dict]]:
+    """
+    Cache tiers, then retrieval.  Returns (cached_response, None) on a hit,
+    else (None, ctx) with everything the LLM step needs — all plain data, so
+    the streaming path can keep going after the DB session is closed.
+    """
+    # ── Cache lookup: exact query, then near-duplicate by embedding ─────────
+    cached = ask_shari_cache.get_cached(tenant_id, query, filters)
+    if cached is not None:
+        return {**cached, "cache_hit": True}, None
+
+    query_vector = None
+    if ask_shari_cache.semantic_enabled():
+        query_vector = embed_query(query)
+        if query_vector is not None:
+            cached = ask_shari_cache.get_semantic(tenant_id, query_vector, filters)
+            if cached is not None:
+                # Promote to the exact tier so a repeat skips the embedding call.
+                ask_shari_cache.set_cached(tenant_id, query, cached, filters=filters)
+                return {**cached, "cache_hit": True}, None
+
+    # ── Retrieval (always runs — source of truth) ───────────────────────────
+    retrieval = hybrid_search(
+        db,
+        tenant_id,
+        query,
+        **filters,
+        top_k=settings.ASK_SHARI_TOP_K,
+        query_vector=query_vector,
+    )
+
+    entries = retrieval["results"]
+    public_items = [_public_item(e) for e in entries]
+    llm_slice_entries = entries[: settings.ASK_SHARI_LLM_ITEMS]
+    return None, {
+        "query_vector": query_vector,
+        "scoring_method": retrieval["scoring_method"],
+        "public_items": public_items,
+        "llm_input": [_item_for_llm(e) for e in llm_slice_entries],
+        "allowed_by_lower": {
+            item["name"].lower(): item for item in public_items[: settings.ASK_SHARI_LLM_ITEMS]
+        },
+    }
+
+
+def _store(tenant_id: int, query: str, filters: dict, ctx: dict, response: dict) -> dict:
+    ask_shari_cache.set_cached(tenant_id, query, response, filters=filters, query_vector=ctx["query_vector"])
+    return response
+
+
+def _empty_response(tenant_id: int, query: str, filters: dict, ctx: dict) -> dict:
+    """Zero-result case — the LLM is skipped entirely."""
+    return _store(tenant_id, query, filters, ctx, {
+        "narrative": "",
+        "featured": [],
+        "follow_up": "I couldn't find anything matching that — try describing it differently?",
+        "results": [],
+        "more_count": 0,
+        "scoring_method": ctx["scoring_method"],
+        "llm_used": False,
+        "cache_hit": False,
+    })
+
+
+def _final_response(
+    tenant_id: int, query: str, filters: dict, ctx: dict,
+    narrative: str, follow_up: str, llm_used: bool,
+) -> dict:
+    public_items = ctx["public_items"]
+    featured = _build_featured(narrative, ctx["allowed_by_lower"])
+    return _store(tenant_id, query, filters, ctx, {
+        "narrative": narrative,
+        "featured": featured,
+        "follow_up": follow_up,
+        "results": public_items,
+        "more_count": max(0, len(public_items) - len(featured)),
+        "scoring_method": ctx["scoring_method"],
+        "llm_used": llm_used,
+        "cache_hit": False,
+    })
+
+
+# ── Public entry points ──────────────────────────────────────────────────────
 
 def ask_shari(
     db,
@@ -276,49 +517,15 @@ def ask_shari(
         "cache_hit": bool,
       }
     """
-    # ── Cache lookup ────────────────────────────────────────────────────────
-    cached = ask_shari_cache.get_cached(tenant_id, query)
+    filters = _filters(category_id, meal_period, min_price, max_price)
+    cached, ctx = _lookup_and_retrieve(db, tenant_id, query, filters)
     if cached is not None:
-        return {**cached, "cache_hit": True}
-
-    # ── Retrieval (always runs — source of truth) ───────────────────────────
-    retrieval = hybrid_search(
-        db,
-        tenant_id,
-        query,
-        category_id=category_id,
-        meal_period=meal_period,
-        min_price=min_price,
-        max_price=max_price,
-        top_k=settings.ASK_SHARI_TOP_K,
-    )
-
-    entries = retrieval["results"]
-    public_items = [_public_item(e) for e in entries]
-
-    # Zero-result case — skip the LLM entirely.
-    if not entries:
-        response = {
-            "narrative": "",
-            "featured": [],
-            "follow_up": "I couldn't find anything matching that — try describing it differently?",
-            "results": [],
-            "more_count": 0,
-            "scoring_method": retrieval["scoring_method"],
-            "llm_used": False,
-            "cache_hit": False,
-        }
-        ask_shari_cache.set_cached(tenant_id, query, response)
-        return response
+        return cached
+    if not ctx["public_items"]:
+        return _empty_response(tenant_id, query, filters, ctx)
 
     # ── LLM call on the top slice ───────────────────────────────────────────
-    llm_slice_entries = entries[: settings.ASK_SHARI_LLM_ITEMS]
-    llm_input = [_item_for_llm(e) for e in llm_slice_entries]
-    allowed_by_lower = {
-        item["name"].lower(): item for item in public_items[: settings.ASK_SHARI_LLM_ITEMS]
-    }
-
-    llm_raw = _call_llm(query, llm_input)
+    llm_raw = _call_llm(query, ctx["llm_input"])
 
     narrative = ""
     follow_up = "Would you like a few more suggestions?"
@@ -328,7 +535,7 @@ def ask_shari(
         candidate_narrative = str(llm_raw.get("narrative") or "").strip()
         candidate_follow_up = str(llm_raw.get("follow_up") or "").strip()
 
-        if candidate_narrative and _validate_narrative(candidate_narrative, allowed_by_lower):
+        if candidate_narrative and _validate_narrative(candidate_narrative, ctx["allowed_by_lower"]):
             narrative = candidate_narrative
             llm_used = True
             if candidate_follow_up:
@@ -337,21 +544,89 @@ def ask_shari(
     # Fallback to a template narrative when the LLM was skipped, failed, or
     # produced a hallucinated response.
     if not narrative:
-        narrative = _build_fallback_narrative(public_items)
+        narrative = _build_fallback_narrative(ctx["public_items"])
 
-    featured = _build_featured(narrative, allowed_by_lower)
-    more_count = max(0, len(public_items) - len(featured))
+    return _final_response(tenant_id, query, filters, ctx, narrative, follow_up, llm_used)
 
-    response = {
-        "narrative": narrative,
-        "featured": featured,
-        "follow_up": follow_up,
-        "results": public_items,
-        "more_count": more_count,
-        "scoring_method": retrieval["scoring_method"],
-        "llm_used": llm_used,
-        "cache_hit": False,
-    }
 
-    ask_shari_cache.set_cached(tenant_id, query, response)
-    return response
+def ask_shari_stream(
+    db,
+    tenant_id: int,
+    query: str,
+    *,
+    category_id: Optional[int] = None,
+    meal_period: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Streaming Ask Shari.  Cache lookup and retrieval run *now*, while the DB
+    session is open; the returned iterator yields (event, data) pairs:
+
+      results   {"results", "scoring_method"}   — first, straight after retrieval
+      delta     {"text"}                        — narrative text, in order
+      featured  {id, name, item}                — each validated pick, as it appears
+      replace   {"narrative"}                   — LLM output discarded mid-stream;
+                                                  the client swaps in this text and
+                                                  clears featured (re-sent after)
+      done      full response (as `ask_shari`)  — last; also written to the cache
+
+    Item names are only released once validated, so a hallucinated name never
+    reaches the client.
+    """
+    filters = _filters(category_id, meal_period, min_price, max_price)
+    cached, ctx = _lookup_and_retrieve(db, tenant_id, query, filters)
+    return _stream_events(tenant_id, query, filters, cached, ctx)
+
+
+def _stream_events(
+    tenant_id: int, query: str, filters: dict, cached: Optional[dict], ctx: Optional[dict],
+) -> Iterator[tuple[str, dict]]:
+    if cached is not None:
+        yield "results", {"results": cached["results"], "scoring_method": cached["scoring_method"]}
+        yield "done", cached
+        return
+
+    yield "results", {"results": ctx["public_items"], "scoring_method": ctx["scoring_method"]}
+    if not ctx["public_items"]:
+        yield "done", _empty_response(tenant_id, query, filters, ctx)
+        return
+
+    streamer = _NarrativeStream(ctx["allowed_by_lower"])
+    streamed_text = False
+    failed = False
+    deltas = _stream_llm(query, ctx["llm_input"])
+    try:
+        for delta in deltas:
+            events = streamer.feed(delta)
+            for event in events:
+                streamed_text = streamed_text or event[0] == "delta"
+                yield event
+            if streamer.rejected:
+                break
+    except _LLMStreamError:
+        failed = True
+    finally:
+        deltas.close()
+
+    if not failed:
+        for event in streamer.finish():
+            streamed_text = streamed_text or event[0] == "delta"
+            yield event
+
+    if not failed and streamer.valid:
+        narrative = streamer.narrative.strip()
+        follow_up = streamer.follow_up or "Would you like a few more suggestions?"
+        llm_used = True
+    else:
+        narrative = _build_fallback_narrative(ctx["public_items"])
+        follow_up = "Would you like a few more suggestions?"
+        llm_used = False
+        if streamed_text:
+            yield "replace", {"narrative": narrative}
+        else:
+            yield "delta", {"text": narrative}
+        for entry in _build_featured(narrative, ctx["allowed_by_lower"]):
+            yield "featured", entry
+
+    yield "done", _final_response(tenant_id, query, filters, ctx, narrative, follow_up, llm_used)
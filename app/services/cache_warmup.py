@@ -0,0 +1,238 @@
+"""
+Cache warm-up — replay the most popular queries before customers ask them.
+
+Two halves:
+
+  1. Frequency log.  Ask Shari and search endpoints call `record_query` with
+     the tenant, the kind of query and its filters.  Counts are buffered in
+     memory and flushed to the `query_frequencies` table every
+     WARMUP_FLUSH_INTERVAL_S on a background thread, so the request path
+     never waits on the write.
+
+  2. Warm-up job.  After this worker bumps a tenant's menu version (and once
+     at startup for every tenant with logged queries), the top
+     WARMUP_TOP_N queries are replayed in the background:
+       * "ask_shari" — runs the full pipeline, filling the response cache;
+       * "search"    — embeds the query, filling the query-embedding cache.
+     Each run stops at WARMUP_BUDGET_S.  Bumps are debounced by
+     WARMUP_DELAY_S so a burst of menu edits triggers one warm-up, not one
+     per edit.
+
+Only the worker that made the bump warms up (the others just observe the new
+version), which is enough with the Redis cache.  With the in-memory backend
+the other workers warm on their own startup and fill the rest on demand.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services import ask_shari_cache
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("ask_shari", "search")
+
+_UPSERT_SQL = """
+    INSERT INTO query_frequencies (tenant_id, kind, query, filters, hits, last_seen)
+    VALUES (:tenant_id, :kind, :query, :filters, :hits, CURRENT_TIMESTAMP)
+    ON CONFLICT (tenant_id, kind, query, filters)
+    DO UPDATE SET hits = query_frequencies.hits + excluded.hits, last_seen = CURRENT_TIMESTAMP
+"""
+
+
+def _engine():
+    from app.core.database import engine
+    return engine
+
+
+# ── Background executor ──────────────────────────────────────────────────────
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """One worker thread: flushes and warm-ups run one at a time, off the request path."""
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-warmup")
+        return _executor
+
+
+# ── Frequency log ────────────────────────────────────────────────────────────
+
+_log_lock = threading.Lock()
+_pending: Counter = Counter()   # (tenant_id, kind, query, filters) → hits
+_next_flush = 0.0
+
+
+def record_query(tenant_id: int, kind: str, query: str, filters: Optional[dict] = None) -> None:
+    """Count one occurrence of `query`.  Cheap: an in-memory increment."""
+    global _next_flush
+    normalized = ask_shari_cache.normalize_query(query)
+    if not normalized:
+        return
+    key = (tenant_id, kind, normalized[:500], ask_shari_cache.filter_signature(filters))
+    now = time.time()
+    with _log_lock:
+        _pending[key] += 1
+        due = now >= _next_flush
+        if due:
+            _next_flush = now + settings.WARMUP_FLUSH_INTERVAL_S
+    if due:
+        _get_executor().submit(flush)
+
+
+def flush() -> None:
+    """Write buffered counts to `query_frequencies` (one upsert per distinct query)."""
+    with _log_lock:
+        batch = dict(_pending)
+        _pending.clear()
+    if not batch:
+        return
+    try:
+        with _engine().begin() as conn:
+            conn.execute(text(_UPSERT_SQL), [
+                {"tenant_id": t, "kind": k, "query": q, "filters": f, "hits": n}
+                for (t, k, q, f), n in batch.items()
+            ])
+    except Exception as exc:
+        logger.warning("Query frequency flush failed (%d queries dropped): %s", len(batch), exc)
+
+
+def top_queries(tenant_id: int, limit: int) -> list[tuple[str, str, dict]]:
+    """Most frequent (kind, query, filters) for `tenant_id`, most popular first."""
+    with _engine().connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT kind, query, filters FROM query_frequencies "
+                "WHERE tenant_id = :tenant_id ORDER BY hits DESC, last_seen DESC LIMIT :limit"
+            ),
+            {"tenant_id": tenant_id, "limit": limit},
+        ).fetchall()
+    return [(r.kind, r.query, json.loads(r.filters) if r.filters else {}) for r in rows]
+
+
+# ── Warm-up ──────────────────────────────────────────────────────────────────
+
+_timers_lock = threading.Lock()
+_timers: dict[int, threading.Timer] = {}
+
+
+def warm_tenant(tenant_id: int) -> dict:
+    """
+    Replay the tenant's top queries until WARMUP_BUDGET_S runs out.
+
+    Returns {"replayed", "skipped", "seconds"}.  Safe to run repeatedly —
+    answers already in the cache are plain cache hits.
+    """
+    from app.core.database import SessionLocal
+    from app.services.ask_shari_service import ask_shari
+    from app.services.embedding_service import embed_query
+
+    flush()
+    started = time.monotonic()
+    queries = top_queries(tenant_id, settings.WARMUP_TOP_N)
+    replayed = 0
+    db = SessionLocal()
+    try:
+        for kind, query, filters in queries:
+            if time.monotonic() - started >= settings.WARMUP_BUDGET_S:
+                break
+            try:
+                if kind == "ask_shari":
+                    ask_shari(db, tenant_id, query, **filters)
+                elif kind == "search":
+                    embed_query(query)
+                replayed += 1
+            except Exception as exc:
+                db.rollback()
+                logger.warning("Warm-up query failed tenant=%d %s %r: %s", tenant_id, kind, query, exc)
+    finally:
+        db.close()
+
+    result = {
+        "replayed": replayed,
+        "skipped": len(queries) - replayed,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+    logger.info("Cache warm-up tenant=%d %s", tenant_id, result)
+    return result
+
+
+def schedule_warmup(tenant_id: int, delay_s: Optional[float] = None) -> None:
+    """(Re)start the debounce timer for `tenant_id`; the warm-up runs when it fires."""
+    if settings.WARMUP_TOP_N <= 0:
+        return
+    delay_s = settings.WARMUP_DELAY_S if delay_s is None else delay_s
+
+    def fire() -> None:
+        with _timers_lock:
+            _timers.pop(tenant_id, None)
+        _get_executor().submit(warm_tenant, tenant_id)
+
+    timer = threading.Timer(delay_s, fire)
+    timer.daemon = True
+    with _timers_lock:
+        previous = _timers.pop(tenant_id, None)
+        if previous is not None:
+            previous.cancel()
+        _timers[tenant_id] = timer
+    timer.start()
+
+
+def _on_menu_version_bump(tenant_id: int, version: int) -> None:
+    schedule_warmup(tenant_id)
+
+
+def install() -> None:
+    """
+    Wire warm-up into the app (called from the startup hook): warm after
+    every menu version bump, and once now for every tenant with history.
+    """
+    ask_shari_cache.add_bump_listener(_on_menu_version_bump)
+    if settings.WARMUP_TOP_N <= 0:
+        return
+    try:
+        with _engine().connect() as conn:
+            tenant_ids = [r[0] for r in conn.execute(text("SELECT DISTINCT tenant_id FROM query_frequencies"))]
+    except Exception as exc:
+        logger.warning("Startup warm-up skipped: %s", exc)
+        return
+    for tenant_id in tenant_ids:
+        schedule_warmup(tenant_id, delay_s=0)
+
+
+def shutdown() -> None:
+    """Cancel pending warm-ups and write out buffered query counts."""
+    global _executor
+    with _timers_lock:
+        for timer in _timers.values():
+            timer.cancel()
+        _timers.clear()
+    flush()
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def reset_for_tests() -> None:
+    global _next_flush
+    with _log_lock:
+        _pending.clear()
+        _next_flush = 0.0
+    shutdown()
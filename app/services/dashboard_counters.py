@@ -0,0 +1,390 @@
+"""
+Live dashboard counters — one `dashboard_counters` row per tenant, kept
+current by every order write.
+
+The dashboard used to COUNT and SUM every order the tenant ever had on each
+refresh.  Instead:
+
+  1. Write path.  A `before_flush` listener on the app's sessions looks at
+     the Orders being inserted, changed or deleted, works out how each one
+     moves the counters (old contribution out, new contribution in), and
+     applies the difference with one `UPDATE … SET col = col + :delta` per
+     tenant on the flush's own connection.  The counters therefore commit or
+     roll back together with the order write, and concurrent writers
+     serialize on the counter row instead of racing on read-modify-write.
+     The listener also stamps `completion_time` when an order becomes
+     COMPLETED (and clears it if it is moved back).
+
+  2. Reconcile.  `reconcile()` locks each tenant's row, recomputes it from
+     `orders` and overwrites it.  It runs at startup and every
+     DASHBOARD_RECONCILE_INTERVAL_S on a background thread (and from
+     scripts/reconcile_dashboard_counters.py), correcting drift from writes
+     that bypass the ORM session — seed scripts, manual SQL.
+
+"Today" is the restaurant's local day (Settings.timezone).  The *_today
+columns carry the day they belong to; the first write of a new day starts
+them from zero, and readers treat a row from an earlier day as zero today.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.models.dashboard_counter import DashboardCounter
+from app.models.order import Order, OrderStatus
+from app.models.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLUMNS = {status: status.value.lower() for status in OrderStatus}
+ACTIVE_STATUSES = (OrderStatus.PENDING, OrderStatus.PREPARING, OrderStatus.READY)
+
+# running totals: a write adds its delta
+_TOTAL_COLUMNS = ("total_orders", "total_revenue", *STATUS_COLUMNS.values())
+# per-day totals: a write on a new day replaces them with its delta
+_TODAY_COLUMNS = ("orders_today", "revenue_today", "completed_today", "ticket_seconds_today")
+COUNTER_COLUMNS = _TOTAL_COLUMNS + _TODAY_COLUMNS
+
+_counters = DashboardCounter.__table__
+_orders = Order.__table__
+
+
+def _engine():
+    from app.core.database import engine
+    return engine
+
+
+# ── Tenant-local day ─────────────────────────────────────────────────────────
+
+_TZ_TTL_S = 300.0
+_tz_lock = threading.Lock()
+_tz_cache: dict[int, tuple[ZoneInfo, float]] = {}
+
+
+def tenant_timezone(conn, tenant_id: int) -> ZoneInfo:
+    """The tenant's Settings.timezone (UTC if unset or unknown), cached for a few minutes."""
+    now = time.monotonic()
+    with _tz_lock:
+        cached = _tz_cache.get(tenant_id)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    name = conn.execute(select(Settings.timezone).where(Settings.tenant_id == tenant_id)).scalar()
+    try:
+        tz = ZoneInfo(name) if name else ZoneInfo("UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Unknown timezone %r for tenant=%d; dashboard uses UTC", name, tenant_id)
+        tz = ZoneInfo("UTC")
+    with _tz_lock:
+        _tz_cache[tenant_id] = (tz, now + _TZ_TTL_S)
+    return tz
+
+
+def _local_date(moment: datetime, tz: ZoneInfo) -> date:
+    # order timestamps are naive UTC (datetime.utcnow)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(tz).date()
+
+
+def _day_start_utc(day: date, tz: ZoneInfo) -> datetime:
+    """Local midnight starting `day`, as the naive UTC timestamp orders are stored in."""
+    midnight = datetime(day.year, day.month, day.day, tzinfo=tz)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# ── Contributions ────────────────────────────────────────────────────────────
+
+class OrderState(NamedTuple):
+    tenant_id: int
+    status: OrderStatus
+    total: Decimal
+    created_at: datetime
+    completion_time: Optional[datetime]
+
+
+def contribution(state: OrderState, today: date, tz: ZoneInfo) -> dict:
+    """What one order in `state` adds to its tenant's counters on `today`."""
+    delta = dict.fromkeys(COUNTER_COLUMNS, 0)
+    delta["total_orders"] = 1
+    delta["total_revenue"] = state.total
+    delta[STATUS_COLUMNS[state.status]] = 1
+    if _local_date(state.created_at, tz) == today:
+        delta["orders_today"] = 1
+        delta["revenue_today"] = state.total
+    if (
+        state.status == OrderStatus.COMPLETED
+        and state.completion_time is not None
+        and _local_date(state.completion_time, tz) == today
+    ):
+        delta["completed_today"] = 1
+        delta["ticket_seconds_today"] = max(int((state.completion_time - state.created_at).total_seconds()), 0)
+    return delta
+
+
+def _state(tenant_id, status, total, created_at, completion_time, now: datetime) -> OrderState:
+    return OrderState(
+        tenant_id=tenant_id,
+        status=OrderStatus(status) if status is not None else OrderStatus.PENDING,
+        total=Decimal(str(total)) if total is not None else Decimal("0"),
+        created_at=created_at or now,
+        completion_time=completion_time,
+    )
+
+
+def _current_state(order: Order, now: datetime) -> OrderState:
+    return _state(order.tenant_id, order.status, order.total_amount, order.created_at, order.completion_time, now)
+
+
+_STATE_ATTRS = ("tenant_id", "status", "total_amount", "created_at", "completion_time")
+
+
+def _loaded_state(session, order: Order, now: datetime) -> OrderState:
+    """The order as it is in the database, before this flush's changes."""
+    attrs = inspect(order).attrs
+    histories = [attrs[name].history for name in _STATE_ATTRS]
+    if any(h.added and not h.deleted for h in histories):
+        # set while expired (e.g. after a commit), so the old value was never
+        # loaded — read it back
+        o = _orders.c
+        row = session.connection().execute(
+            select(*(o[name] for name in _STATE_ATTRS)).where(o.id == order.id)
+        ).one()
+        return _state(*row, now)
+    old = [h.deleted[0] if h.deleted else getattr(order, name) for name, h in zip(_STATE_ATTRS, histories)]
+    return _state(*old, now)
+
+
+def _stamp_completion(order: Order, was_completed: bool, now: datetime) -> None:
+    completed = order.status is not None and OrderStatus(order.status) == OrderStatus.COMPLETED
+    if completed and order.completion_time is None:
+        order.completion_time = now
+    elif not completed and was_completed and order.completion_time is not None:
+        order.completion_time = None
+
+
+# ── Write path ───────────────────────────────────────────────────────────────
+
+def _upsert_delta(conn, tenant_id: int, today: date, delta: dict) -> None:
+    values = {"day": today}
+    for col in _TOTAL_COLUMNS:
+        values[col] = _counters.c[col] + delta[col]
+    for col in _TODAY_COLUMNS:
+        values[col] = case((_counters.c.day == today, _counters.c[col]), else_=0) + delta[col]
+    stmt = update(_counters).where(_counters.c.tenant_id == tenant_id).values(values)
+    if conn.execute(stmt).rowcount:
+        return
+    # first write for this tenant: seed the row from `orders`, then apply
+    _insert_computed(conn, tenant_id)
+    conn.execute(stmt)
+
+
+def _insert_computed(conn, tenant_id: int) -> None:
+    values = compute(conn, tenant_id)
+    try:
+        with conn.begin_nested():
+            conn.execute(_counters.insert().values(tenant_id=tenant_id, reconciled_at=datetime.utcnow(), **values))
+    except IntegrityError:
+        pass  # a concurrent writer seeded it first
+
+
+def apply_changes(conn, changes: Iterable[tuple[Optional[OrderState], Optional[OrderState]]]) -> None:
+    """
+    Apply (before, after) order states to the counters on `conn`.  `before`
+    is None for a new order, `after` None for a deleted one.
+    """
+    deltas: dict[int, dict] = {}
+    days: dict[int, tuple[date, ZoneInfo]] = {}
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            if state.tenant_id not in days:
+                tz = tenant_timezone(conn, state.tenant_id)
+                days[state.tenant_id] = (datetime.now(tz).date(), tz)
+            today, tz = days[state.tenant_id]
+            delta = deltas.setdefault(state.tenant_id, dict.fromkeys(COUNTER_COLUMNS, 0))
+            for col, value in contribution(state, today, tz).items():
+                delta[col] += sign * value
+    for tenant_id, delta in deltas.items():
+        if any(delta.values()):
+            _upsert_delta(conn, tenant_id, days[tenant_id][0], delta)
+
+
+def _before_flush(session, flush_context, instances) -> None:
+    now = datetime.utcnow()
+    changes = []
+    for order in session.new:
+        if isinstance(order, Order):
+            _stamp_completion(order, False, now)
+            changes.append((None, _current_state(order, now)))
+    for order in session.dirty:
+        if isinstance(order, Order) and session.is_modified(order):
+            before = _loaded_state(session, order, now)
+            _stamp_completion(order, before.status == OrderStatus.COMPLETED, now)
+            after = _current_state(order, now)
+            if before != after:
+                changes.append((before, after))
+    for order in session.deleted:
+        if isinstance(order, Order):
+            changes.append((_loaded_state(session, order, now), None))
+    if changes:
+        apply_changes(session.connection(), changes)
+
+
+# ── Read / reconcile ─────────────────────────────────────────────────────────
+
+def compute(conn, tenant_id: int) -> dict:
+    """Counter values recomputed from `orders` — a full scan of the tenant's history."""
+    tz = tenant_timezone(conn, tenant_id)
+    today = datetime.now(tz).date()
+    day_start = _day_start_utc(today, tz)
+    o = _orders.c
+    is_today = o.created_at >= day_start
+    row = conn.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(o.total_amount), 0),
+            *[func.coalesce(func.sum(case((o.status == status, 1), else_=0)), 0) for status in STATUS_COLUMNS],
+            func.coalesce(func.sum(case((is_today, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_today, o.total_amount), else_=0)), 0),
+        ).where(o.tenant_id == tenant_id)
+    ).one()
+    values = dict(zip((*_TOTAL_COLUMNS, "orders_today", "revenue_today"), row))
+    values["total_revenue"] = Decimal(str(values["total_revenue"]))
+    values["revenue_today"] = Decimal(str(values["revenue_today"]))
+
+    # only today's completions are read, so this stays small
+    tickets = conn.execute(
+        select(o.created_at, o.completion_time).where(
+            o.tenant_id == tenant_id,
+            o.status == OrderStatus.COMPLETED,
+            o.completion_time >= day_start,
+        )
+    ).all()
+    values["completed_today"] = len(tickets)
+    values["ticket_seconds_today"] = sum(
+        max(int((done - created).total_seconds()), 0) for created, done in tickets
+    )
+    values["day"] = today
+    return values
+
+
+def read(db, tenant_id: int) -> dict:
+    """
+    The tenant's counters as a dict (COUNTER_COLUMNS), from its single row;
+    *_today values are zero if nothing was written yet today.  Falls back to
+    `compute` (without storing it) before the row has been seeded.
+    """
+    conn = db.connection()
+    row = conn.execute(select(_counters).where(_counters.c.tenant_id == tenant_id)).first()
+    if row is None:
+        return compute(conn, tenant_id)
+    values = {col: row._mapping[col] for col in COUNTER_COLUMNS}
+    if row.day != datetime.now(tenant_timezone(conn, tenant_id)).date():
+        values.update(dict.fromkeys(_TODAY_COLUMNS, 0))
+    return values
+
+
+def reconcile_tenant(conn, tenant_id: int) -> bool:
+    """Recompute and store one tenant's row under a row lock.  Returns True if it had drifted."""
+    locked = select(_counters).where(_counters.c.tenant_id == tenant_id).with_for_update()
+    row = conn.execute(locked).first()
+    if row is None:
+        _insert_computed(conn, tenant_id)
+        row = conn.execute(locked).first()
+    values = compute(conn, tenant_id)
+    stored = {col: row._mapping[col] for col in COUNTER_COLUMNS}
+    if row.day != values["day"]:
+        stored.update(dict.fromkeys(_TODAY_COLUMNS, 0))
+    drifted = any(stored[col] != values[col] for col in COUNTER_COLUMNS)
+    conn.execute(
+        update(_counters).where(_counters.c.tenant_id == tenant_id)
+        .values(reconciled_at=datetime.utcnow(), **values)
+    )
+    if drifted:
+        logger.info("Dashboard counters for tenant=%d corrected by reconcile", tenant_id)
+    return drifted
+
+
+def reconcile(tenant_ids: Optional[Iterable[int]] = None, engine=None) -> int:
+    """Reconcile the given tenants (default: all), each in its own transaction.  Returns how many drifted."""
+    from app.models.tenant import Tenant
+    engine = engine or _engine()
+    if tenant_ids is None:
+        with engine.connect() as conn:
+            tenant_ids = [r[0] for r in conn.execute(select(Tenant.id))]
+    drifted = 0
+    for tenant_id in tenant_ids:
+        with engine.begin() as conn:
+            drifted += reconcile_tenant(conn, tenant_id)
+    return drifted
+
+
+# ── Wiring ───────────────────────────────────────────────────────────────────
+
+_state_lock = threading.Lock()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+_listening: list = []
+
+
+def _reconcile_loop(interval_s: float) -> None:
+    while True:
+        try:
+            reconcile()
+        except Exception as exc:
+            logger.warning("Dashboard counter reconcile failed: %s", exc)
+        if _stop.wait(interval_s):
+            return
+
+
+def install(session_factory=None) -> None:
+    """
+    Maintain counters on every flush of `session_factory` (default: the app's
+    SessionLocal) and start the periodic reconcile (called from the startup hook).
+    """
+    global _thread
+    if session_factory is None:
+        from app.core.database import SessionLocal
+        session_factory = SessionLocal
+    with _state_lock:
+        if not event.contains(session_factory, "before_flush", _before_flush):
+            event.listen(session_factory, "before_flush", _before_flush)
+            _listening.append(session_factory)
+        interval = settings.DASHBOARD_RECONCILE_INTERVAL_S
+        if interval > 0 and _thread is None:
+            _stop.clear()
+            _thread = threading.Thread(
+                target=_reconcile_loop, args=(interval,), name="dashboard-reconcile", daemon=True
+            )
+            _thread.start()
+
+
+def shutdown() -> None:
+    """Stop the reconcile thread and detach the flush listener."""
+    global _thread
+    with _state_lock:
+        thread, _thread = _thread, None
+        _stop.set()
+        for session_factory in _listening:
+            if event.contains(session_factory, "before_flush", _before_flush):
+                event.remove(session_factory, "before_flush", _before_flush)
+        _listening.clear()
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def reset_for_tests() -> None:
+    shutdown()
+    with _tz_lock:
+        _tz_cache.clear()
@@ -8,6 +8,8 @@ Responsibilities:
   4. upsert_menu_item_embeddings — hash-gated upsert for one tenant
   5. reindex_tenant_menu_embeddings — full rebuild (delete + re-embed)
   6. hybrid_search — combine semantic + keyword scores for a query
+  7. EmbeddingRateBudget — request/token budget shared across processes
+  8. embed_query — per-process LRU of query embeddings (search + Ask Shari)
 
 All operations that touch the database accept a `tenant_id` argument and
 filter by it unconditionally — there is no path that leaks cross-tenant data.
@@ -15,12 +17,17 @@ filter by it unconditionally — there is no path that leaks cross-tenant data.
 
 import hashlib
 import logging
+import multiprocessing
+import re
+import threading
 import time
+from collections import OrderedDict
 from typing import Optional
 
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.config import settings
+from app.core.clients import get_openai_client
 from app.models.embeddings import MenuItemEmbedding
 from app.models.menu import MenuItem
 
@@ -70,15 +77,60 @@ def _content_hash(text: str) -> str:
 # ── OpenAI embedding call ─────────────────────────────────────────────────────
 
 def _get_openai_client():
-    """Return an OpenAI client, or None if the package/key is unavailable."""
-    if not settings.OPENAI_API_KEY:
-        return None
-    try:
-        from openai import OpenAI
-        return OpenAI(api_key=settings.OPENAI_API_KEY)
-    except ImportError:
-        logger.warning("openai package not installed — semantic search disabled")
-        return None
+    """Return the shared OpenAI client, or None if the package/key is unavailable."""
+    return get_openai_client()
+
+
+# ── Rate budget ───────────────────────────────────────────────────────────────
+
+def estimate_tokens(texts: list[str]) -> int:
+    """Rough token count (~4 chars per token) — good enough for budgeting and cost estimates."""
+    return sum(max(1, len(t) // 4) for t in texts)
+
+
+class EmbeddingRateBudget:
+    """
+    Requests-per-minute and tokens-per-minute budget for the embedding API.
+
+    Shared across worker processes: the state is a pair of "next free slot"
+    timestamps in shared memory, guarded by a multiprocessing lock.  Pass the
+    instance to pool workers via the pool initializer (it can only be pickled
+    while spawning) and install it there with `set_rate_budget`.
+
+    Each `acquire` reserves the next slot that satisfies both limits and
+    sleeps until it arrives, so N workers together never exceed the budget.
+    A limit of 0 disables that dimension.
+    """
+
+    def __init__(self, requests_per_min: float, tokens_per_min: float):
+        ctx = multiprocessing.get_context("spawn")
+        self.requests_per_min = requests_per_min
+        self.tokens_per_min = tokens_per_min
+        self._lock = ctx.Lock()
+        self._next_free = ctx.Array("d", 2, lock=False)  # [request slot, token slot]
+
+    def acquire(self, tokens: int) -> float:
+        """Block until `tokens` may be sent.  Returns the seconds waited."""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_free[0], self._next_free[1])
+            if self.requests_per_min:
+                self._next_free[0] = start + 60.0 / self.requests_per_min
+            if self.tokens_per_min:
+                self._next_free[1] = start + tokens * 60.0 / self.tokens_per_min
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_rate_budget: Optional[EmbeddingRateBudget] = None
+
+
+def set_rate_budget(budget: Optional[EmbeddingRateBudget]) -> None:
+    """Install (or clear, with None) the budget every `embed_texts` call draws from."""
+    global _rate_budget
+    _rate_budget = budget
 
 
 def embed_texts(texts: list[str]) -> Optional[list[list[float]]]:
@@ -95,6 +147,8 @@ def embed_texts(texts: list[str]) -> Optional[list[list[float]]]:
         return None
 
     for attempt in range(3):
+        if _rate_budget is not None:
+            _rate_budget.acquire(estimate_tokens(texts))
         try:
             response = client.embeddings.create(
                 model=settings.EMBEDDING_MODEL,
@@ -114,6 +168,39 @@ def embed_texts(texts: list[str]) -> Optional[list[list[float]]]:
     return None
 
 
+# ── Query embedding cache ─────────────────────────────────────────────────────
+
+_QUERY_WS = re.compile(r"\s+")
+_query_vectors: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+_query_vectors_lock = threading.Lock()
+
+
+def embed_query(query: str) -> Optional[list[float]]:
+    """
+    Embed a single search query, memoised per process.
+
+    Queries are lowercased and whitespace-collapsed first, so "Spicy  Tuna"
+    and "spicy tuna" share one API call.  Vectors don't depend on the menu, so
+    entries stay valid across menu edits; the key includes the model name.
+    """
+    text = _QUERY_WS.sub(" ", query.strip().lower())
+    key = (settings.EMBEDDING_MODEL, text)
+    with _query_vectors_lock:
+        vector = _query_vectors.get(key)
+        if vector is not None:
+            _query_vectors.move_to_end(key)
+            return vector
+
+    vectors = embed_texts([text])
+    if vectors is None:
+        return None
+    with _query_vectors_lock:
+        _query_vectors[key] = vectors[0]
+        while len(_query_vectors) > settings.QUERY_EMBEDDING_CACHE_SIZE:
+            _query_vectors.popitem(last=False)
+    return vectors[0]
+
+
 # ── Keyword scoring ───────────────────────────────────────────────────────────
 
 def compute_keyword_score(item: MenuItem, query: str) -> float:
@@ -335,6 +422,7 @@ def hybrid_search(
     max_price: Optional[float] = None,
     top_k: int = 20,
     debug: bool = False,
+    query_vector: Optional[list[float]] = None,
 ) -> dict:
     """
     Return ranked menu items for `query` using hybrid semantic + keyword scoring.
@@ -347,6 +435,9 @@ def hybrid_search(
       5. Combine: hybrid = SEMANTIC_WEIGHT * sem + KEYWORD_WEIGHT * kw.
       6. Sort by hybrid score and return top_k.
 
+    Pass `query_vector` when the caller already embedded `query` (Ask Shari
+    does, for its semantic cache) to skip the second embedding call.
+
     Falls back gracefully to keyword-only search if:
       - OPENAI_API_KEY is not set
       - The embeddings table has no rows for this tenant
@@ -373,9 +464,8 @@ def hybrid_search(
     active_model = None
     active_version = None
 
-    query_vectors = embed_texts([query])
-    if query_vectors is not None:
-        query_vec = query_vectors[0]
+    query_vec = query_vector if query_vector is not None else embed_query(query)
+    if query_vec is not None:
         vec_str = "[" + ",".join(f"{x:.8f}" for x in query_vec) + "]"
 
         try:
@@ -0,0 +1,176 @@
+"""
+Idempotency keys for order writes — a retried POST gets the first response.
+
+Tablets on flaky Wi-Fi resend `POST /orders/` and `POST /orders/{id}/items`
+when a response is lost.  With an `Idempotency-Key` header the endpoint
+calls `claim` before any other write, which inserts the key into
+`idempotency_keys` inside the request's own transaction; `complete` stores
+the response on that row just before the commit.  So:
+
+  * a retry after the commit finds the row and gets the stored body back —
+    one indexed SELECT, no pricing, no second ticket for the kitchen;
+  * a duplicate that arrives while the first is still running blocks on the
+    unique (tenant_id, key) index until that transaction ends.  If it
+    committed, the insert fails and the stored body is returned; if it rolled
+    back, the duplicate simply goes ahead as the first attempt;
+  * a failed request (unknown menu item, completed order) rolls its claim back
+    with everything else, so the same key can be retried once it's fixed.
+
+Reusing a key for a different request (other endpoint or body) is a client
+bug and gets a 422.  Keys are replayed for IDEMPOTENCY_TTL_S; expired rows
+are ignored, replaced on reuse, and deleted every
+IDEMPOTENCY_PURGE_INTERVAL_S on a background thread.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.error_handling import ErrorCodes, IdempotencyKeyError
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# Response header set when the body is a replay of an earlier request's.
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_keys = IdempotencyKey.__table__
+
+
+def _engine():
+    from app.core.database import engine
+    return engine
+
+
+def fingerprint(scope: str, payload: BaseModel) -> str:
+    """Hash of the endpoint (`scope`, e.g. "POST /orders/5/items") and the request body."""
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{scope}\n{body}".encode()).hexdigest()
+
+
+def _lookup(db, tenant_id: int, key: str) -> Optional[IdempotencyKey]:
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.tenant_id == tenant_id, IdempotencyKey.key == key
+    ).first()
+
+
+def _stored_body(record: IdempotencyKey, request_hash: str) -> dict:
+    if record.request_hash != request_hash:
+        raise IdempotencyKeyError(
+            422, ErrorCodes.IDEMPOTENCY_KEY_REUSED,
+            "Idempotency-Key was already used for a different request",
+        )
+    return record.response_body
+
+
+def claim(db, tenant_id: int, key: str, request_hash: str) -> tuple[Optional[IdempotencyKey], Optional[dict]]:
+    """
+    Claim `key` for this request; must be the first write of the transaction.
+
+    Returns (record, None) when the caller should go ahead — pass the record
+    to `complete` before committing.  Returns (None, body) when a request with
+    this key already committed: the caller returns `body` and does nothing
+    else (the session has been rolled back if it had to wait for it).
+
+    Raises IdempotencyKeyError: 422 if the key belongs to a different request,
+    409 if it can't be claimed or replayed (its holder vanished mid-retry).
+    """
+    now = datetime.utcnow()
+    existing = _lookup(db, tenant_id, key)
+    if existing is not None:
+        if existing.expires_at > now:
+            return None, _stored_body(existing, request_hash)
+        # expired: this request starts the key's next lifetime
+        db.execute(delete(_keys).where(_keys.c.id == existing.id, _keys.c.expires_at <= now))
+        db.expunge(existing)
+
+    record = IdempotencyKey(
+        tenant_id=tenant_id,
+        key=key,
+        request_hash=request_hash,
+        created_at=now,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_S),
+    )
+    db.add(record)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key committed first (this flush
+        # waited on its row lock); answer with what it returned.
+        db.rollback()
+        existing = _lookup(db, tenant_id, key)
+        if existing is None or existing.response_body is None:
+            raise IdempotencyKeyError(
+                409, ErrorCodes.IDEMPOTENCY_KEY_IN_USE,
+                "A request with this Idempotency-Key is still being processed; retry shortly",
+            )
+        return None, _stored_body(existing, request_hash)
+    return record, None
+
+
+def complete(record: IdempotencyKey, response: BaseModel) -> dict:
+    """Store `response` on the claimed key (committed with the caller's write) and return its body."""
+    body = response.model_dump(mode="json")
+    record.response_body = body
+    return body
+
+
+def purge_expired(engine=None) -> int:
+    """Delete keys past their TTL; returns how many."""
+    with (engine or _engine()).begin() as conn:
+        result = conn.execute(
+            delete(_keys).where(_keys.c.expires_at <= datetime.utcnow())
+        )
+    return result.rowcount or 0
+
+
+# ── Background sweep ─────────────────────────────────────────────────────────
+
+_state_lock = threading.Lock()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _purge_loop(interval_s: float) -> None:
+    while not _stop.wait(interval_s):
+        try:
+            purged = purge_expired()
+            if purged:
+                logger.info("Purged %d expired idempotency keys", purged)
+        except Exception as exc:
+            logger.warning("Idempotency key purge failed: %s", exc)
+
+
+def install() -> None:
+    """Start the periodic sweep of expired keys (called from the startup hook)."""
+    global _thread
+    with _state_lock:
+        interval = settings.IDEMPOTENCY_PURGE_INTERVAL_S
+        if interval > 0 and _thread is None:
+            _stop.clear()
+            _thread = threading.Thread(target=_purge_loop, args=(interval,), name="idempotency-purge", daemon=True)
+            _thread.start()
+
+
+def shutdown() -> None:
+    """Stop the sweep thread."""
+    global _thread
+    with _state_lock:
+        thread, _thread = _thread, None
+        _stop.set()
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def reset_for_tests() -> None:
+    shutdown()
@@ -0,0 +1,273 @@
+"""
+Image derivative pipeline — thumbnails, cards and responsive full-size copies.
+
+Originals are stored exactly as uploaded (up to 5 MB).  After an upload we
+render a small set of size buckets in WebP and JPEG so customer tablets can
+fetch a ~20 KB card instead of the original photo:
+
+  thumb  160 x 160  square crop
+  card   480 x 360  4:3 crop
+  full   1200 wide  no crop, aspect preserved (never upscaled)
+
+Crops honour the manager's framing: `image_position_x/y` behave like CSS
+`object-position` on an `object-fit: cover` box, and `image_zoom` scales in
+around the box centre — the same maths the frontend's `getMenuImageStyle`
+applies.  The framing is therefore baked into thumb/card; clients using them
+should not apply the position/zoom style again.
+
+Rendering is CPU-bound, so it runs in a small process pool (spawned lazily,
+IMAGE_PROCESS_WORKERS wide) and is kicked off from a BackgroundTask — the
+upload request never waits for it.  Pillow is optional: without it the
+pipeline logs once and leaves `image_variants` empty, and clients keep using
+`image_url`.
+
+The resulting URLs are recorded on the row's `image_variants` JSON column:
+  {"card": {"width": 480, "height": 360, "webp": "...", "jpeg": "..."}, ...}
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.core.lazy_imports import optional_module
+
+logger = logging.getLogger(__name__)
+
+# (name, width, height) — height None means "keep aspect, no crop".
+SIZE_BUCKETS: tuple[tuple[str, int, Optional[int]], ...] = (
+    ("thumb", 160, 160),
+    ("card", 480, 360),
+    ("full", 1200, None),
+)
+
+# (key in image_variants, Pillow format, content type, file extension)
+OUTPUT_FORMATS: tuple[tuple[str, str, str, str], ...] = (
+    ("webp", "WEBP", "image/webp", ".webp"),
+    ("jpeg", "JPEG", "image/jpeg", ".jpg"),
+)
+
+_QUALITY = 80
+
+
+# ── Pure rendering (runs inside the worker process) ──────────────────────────
+
+def crop_box(
+    src_w: int,
+    src_h: int,
+    target_w: int,
+    target_h: int,
+    position_x: float = 50.0,
+    position_y: float = 50.0,
+    zoom: float = 1.0,
+) -> tuple[int, int, int, int]:
+    """
+    Source-pixel box matching `object-fit: cover` + `object-position` + `scale(zoom)`.
+
+    1. Take the largest region of the target aspect that fits in the source.
+    2. Slide it by position_x/y percent of the leftover space (CSS semantics).
+    3. Shrink it by 1/zoom around its own centre.
+    """
+    target_aspect = target_w / target_h
+    if src_w / src_h > target_aspect:
+        cover_h = float(src_h)
+        cover_w = cover_h * target_aspect
+    else:
+        cover_w = float(src_w)
+        cover_h = cover_w / target_aspect
+
+    left = (src_w - cover_w) * (position_x / 100.0)
+    top = (src_h - cover_h) * (position_y / 100.0)
+
+    zoom = max(zoom or 1.0, 1.0)
+    zoomed_w = cover_w / zoom
+    zoomed_h = cover_h / zoom
+    left += (cover_w - zoomed_w) / 2
+    top += (cover_h - zoomed_h) / 2
+
+    return (
+        int(round(left)),
+        int(round(top)),
+        int(round(left + zoomed_w)),
+        int(round(top + zoomed_h)),
+    )
+
+
+def render_derivatives(
+    source: bytes,
+    position_x: float = 50.0,
+    position_y: float = 50.0,
+    zoom: float = 1.0,
+) -> dict[str, dict]:
+    """
+    Render every size bucket in every output format.
+
+    Returns {bucket: {"width", "height", "webp": bytes, "jpeg": bytes}}.
+    Module-level and argument-only so it can be pickled into a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(source)) as opened:
+        opened.seek(0)  # first frame of animated GIF/WebP
+        img = ImageOps.exif_transpose(opened)
+        img.load()
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+
+    out: dict[str, dict] = {}
+    for name, width, height in SIZE_BUCKETS:
+        if height is None:
+            if img.width > width:
+                scaled_h = max(1, round(img.height * width / img.width))
+                resized = img.resize((width, scaled_h), Image.LANCZOS)
+            else:
+                resized = img.copy()
+        else:
+            box = crop_box(img.width, img.height, width, height, position_x, position_y, zoom)
+            resized = img.resize((width, height), Image.LANCZOS, box=box)
+
+        entry: dict = {"width": resized.width, "height": resized.height}
+        for key, pil_format, _, _ in OUTPUT_FORMATS:
+            frame = resized
+            if pil_format == "JPEG" and frame.mode == "RGBA":
+                # JPEG has no alpha — flatten onto white like a browser would.
+                background = Image.new("RGB", frame.size, (255, 255, 255))
+                background.paste(frame, mask=frame.split()[-1])
+                frame = background
+            buf = io.BytesIO()
+            frame.save(buf, format=pil_format, quality=_QUALITY, optimize=True)
+            entry[key] = buf.getvalue()
+        out[name] = entry
+    return out
+
+
+# ── Process pool ─────────────────────────────────────────────────────────────
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazy-construct the worker pool (spawned, so no threads/sockets are forked)."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker pool (called on app shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ── Orchestration (runs in a BackgroundTask thread) ──────────────────────────
+
+def _render_and_store(source: bytes, prefix: str, owner_id: int, position_x: float, position_y: float, zoom: float) -> Optional[dict]:
+    from app.core.s3 import upload_image_stream
+
+    if optional_module("PIL.Image", "image derivatives") is None:
+        return None
+
+    rendered = _get_pool().submit(render_derivatives, source, position_x, position_y, zoom).result(
+        timeout=settings.IMAGE_PROCESS_TIMEOUT_S
+    )
+
+    variants: dict[str, dict] = {}
+    for name, entry in rendered.items():
+        stored = {"width": entry["width"], "height": entry["height"]}
+        for key, _, content_type, ext in OUTPUT_FORMATS:
+            stored[key] = upload_image_stream(
+                [entry[key]], f"{prefix}/derived", owner_id, f"{name}{ext}", content_type
+            )
+        variants[name] = stored
+    return variants
+
+
+def delete_derivatives(variants: Optional[dict]) -> None:
+    """Remove every stored derivative listed in an `image_variants` dict."""
+    from app.core.s3 import delete_image
+
+    for entry in (variants or {}).values():
+        for key, _, _, _ in OUTPUT_FORMATS:
+            if entry.get(key):
+                delete_image(entry[key])
+
+
+def process_menu_item_image(db, tenant_id: int, item_id: int, image_url: str) -> None:
+    """
+    Background task: render derivatives for a menu item's official photo.
+
+    Skips quietly if the photo was replaced/removed before we got to it, so a
+    slow render never overwrites a newer image's variants.
+    """
+    from app.core.s3 import read_image
+    from app.models.menu import MenuItem
+
+    try:
+        item = db.query(MenuItem).filter(MenuItem.id == item_id, MenuItem.tenant_id == tenant_id).first()
+        if item is None or item.image_url != image_url:
+            return
+        variants = _render_and_store(
+            read_image(image_url),
+            "menu-images",
+            item_id,
+            item.image_position_x if item.image_position_x is not None else 50.0,
+            item.image_position_y if item.image_position_y is not None else 50.0,
+            item.image_zoom or 1.0,
+        )
+        if variants is None:
+            return
+
+        db.refresh(item)
+        if item.image_url != image_url:
+            delete_derivatives(variants)
+            return
+        old_variants = item.image_variants
+        item.image_variants = variants
+        db.commit()
+        delete_derivatives(old_variants)
+        logger.info("Rendered image derivatives for menu item id=%d", item_id)
+    except Exception as exc:
+        db.rollback()
+        logger.warning("Image derivative pipeline failed for menu item id=%d: %s", item_id, exc)
+
+
+def process_user_image(db, image_id: int) -> None:
+    """Background task: render centre-cropped derivatives for a customer photo."""
+    from app.core.s3 import read_image
+    from app.models.menu import MenuItemImage
+
+    try:
+        image = db.query(MenuItemImage).filter(MenuItemImage.id == image_id).first()
+        if image is None:
+            return
+        variants = _render_and_store(read_image(image.image_url), "user-images", image.menu_item_id, 50.0, 50.0, 1.0)
+        if variants is None:
+            return
+        # the image may have been rejected/deleted while we were rendering
+        image = db.query(MenuItemImage).filter(MenuItemImage.id == image_id).populate_existing().first()
+        if image is None:
+            delete_derivatives(variants)
+            return
+        image.image_variants = variants
+        db.commit()
+        logger.info("Rendered image derivatives for user image id=%d", image_id)
+    except Exception as exc:
+        db.rollback()
+        logger.warning("Image derivative pipeline failed for user image id=%d: %s", image_id, exc)
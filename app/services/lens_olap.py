@@ -0,0 +1,386 @@
+"""
+Columnar Lens snapshot — the Lens queries answered from a local DuckDB file.
+
+Every Lens chart is an aggregation over orders / order_items, and on the
+transactional database each one is a row-store scan competing with
+order-taking.  With LENS_OLAP_ENABLED, the same SQL runs instead against a
+DuckDB copy of the five tables the Lens reads (orders, order_items,
+menu_items, categories, tables — only the columns it uses), where a
+multi-month aggregation is a few column scans in the API process.
+
+Refresh (scripts/refresh_lens_olap.py, from cron):
+  * full     — rebuild every table from the source database;
+  * default  — incremental: upsert orders changed since the last refresh
+               (updated_at), replace the lines of those orders and of any
+               order with a changed line, drop orders deleted at the source,
+               and reload the small dimension tables wholesale.
+Line deletions that don't touch their order (possible on AYCE orders, whose
+total doesn't change) are only picked up by a full rebuild, so run one
+nightly.
+
+Each refresh works on a copy and atomically renames it over LENS_OLAP_PATH.
+API workers keep the file attached read-only and re-attach when it is
+replaced, so readers never see a half-written snapshot and never block the
+refresh.
+
+Queries are the unchanged Postgres SQL from app/api/analytics.py: DuckDB
+accepts it as-is apart from TO_CHAR, which the snapshot defines as a macro
+for the formats the Lens uses, and approximate mode's TABLESAMPLE clause,
+which is respelled.  `execute` returns None — and the caller
+falls back to Postgres — when the snapshot is disabled, missing, older than
+LENS_OLAP_MAX_AGE_S, or fails a query.
+
+duckdb and pyarrow are optional and loaded lazily.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import String, cast, func, or_, select
+
+from app.core.config import settings
+from app.core.lazy_imports import optional_module, require_module
+from app.core.query_templates import compile_template
+
+logger = logging.getLogger(__name__)
+
+# Mirrored tables: name → [(column, DuckDB type)]; the first column is the key.
+_TABLES: dict[str, list[tuple[str, str]]] = {
+    "orders": [
+        ("id", "INTEGER"),
+        ("tenant_id", "INTEGER"),
+        ("table_id", "INTEGER"),
+        ("status", "VARCHAR"),
+        ("total_amount", "DECIMAL(10, 2)"),
+        ("ayce_order", "BOOLEAN"),
+        ("created_at", "TIMESTAMP"),
+        ("updated_at", "TIMESTAMP"),
+    ],
+    "order_items": [
+        ("id", "INTEGER"),
+        ("order_id", "INTEGER"),
+        ("menu_item_id", "INTEGER"),
+        ("quantity", "INTEGER"),
+        ("unit_price", "DECIMAL(10, 2)"),
+    ],
+    "menu_items": [
+        ("id", "INTEGER"),
+        ("tenant_id", "INTEGER"),
+        ("category_id", "INTEGER"),
+        ("name", "VARCHAR"),
+    ],
+    "categories": [
+        ("id", "INTEGER"),
+        ("tenant_id", "INTEGER"),
+        ("name", "VARCHAR"),
+    ],
+    "tables": [
+        ("id", "INTEGER"),
+        ("tenant_id", "INTEGER"),
+        ("number", "INTEGER"),
+    ],
+}
+
+# Small tables reloaded wholesale on every refresh.
+_DIMENSIONS = ("menu_items", "categories", "tables")
+
+# Postgres TO_CHAR for the formats the Lens SQL uses.
+_TO_CHAR_MACRO = """
+    CREATE OR REPLACE MACRO to_char(ts, fmt) AS CASE fmt
+        WHEN 'YYYY-MM-DD' THEN strftime(ts, '%Y-%m-%d')
+        WHEN 'Dy'         THEN strftime(ts, '%a')
+        WHEN 'HH24'       THEN strftime(ts, '%H')
+    END
+"""
+
+# Re-read rows changed this long before the previous refresh started, to
+# cover transactions that were still open when it ran.
+_OVERLAP = timedelta(minutes=5)
+
+_STATE_TABLE = "_lens_sync"
+
+
+def available() -> bool:
+    return optional_module("duckdb", "Lens columnar snapshot") is not None
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+def _source_table(name: str):
+    from app.models import Category, MenuItem, Order, OrderItem, Table
+    model = {
+        "orders": Order, "order_items": OrderItem, "menu_items": MenuItem,
+        "categories": Category, "tables": Table,
+    }[name]
+    return model.__table__
+
+
+def _source_select(name: str):
+    t = _source_table(name)
+    # The status enum comes back as a Python enum; the snapshot stores labels.
+    cols = [
+        cast(t.c[column], String).label(column) if column == "status" else t.c[column]
+        for column, _ in _TABLES[name]
+    ]
+    return select(*cols), t
+
+
+def _arrow_schema(pa, name: str):
+    types = {
+        "INTEGER": pa.int64(),
+        "VARCHAR": pa.string(),
+        "DECIMAL(10, 2)": pa.decimal128(10, 2),
+        "BOOLEAN": pa.bool_(),
+        "TIMESTAMP": pa.timestamp("us"),
+    }
+    return pa.schema([(column, types[duck_type]) for column, duck_type in _TABLES[name]])
+
+
+def _create_schema(con) -> None:
+    for name, columns in _TABLES.items():
+        body = ", ".join(f"{column} {duck_type}" for column, duck_type in columns)
+        con.execute(f"CREATE TABLE IF NOT EXISTS {name} ({body}, PRIMARY KEY ({columns[0][0]}))")
+    con.execute(f"CREATE TABLE IF NOT EXISTS {_STATE_TABLE} (key VARCHAR PRIMARY KEY, value VARCHAR)")
+    con.execute(_TO_CHAR_MACRO)
+
+
+def _naive_utc(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _copy_rows(con, pa, src, name: str, stmt, batch_rows: int, key_sink: Optional[set] = None,
+               key_column: Optional[str] = None) -> int:
+    """Stream `stmt` from the source into the snapshot table, upserting by key."""
+    schema = _arrow_schema(pa, name)
+    columns = [column for column, _ in _TABLES[name]]
+    key_index = columns.index(key_column) if key_column else None
+    copied = 0
+    result = src.execution_options(stream_results=True, yield_per=batch_rows).execute(stmt)
+    for rows in result.partitions():
+        arrays = [
+            [_naive_utc(r[i]) for r in rows] for i in range(len(columns))
+        ]
+        batch = pa.Table.from_arrays([pa.array(a, type=f.type) for a, f in zip(arrays, schema)], schema=schema)
+        con.register("_batch", batch)
+        con.execute(f"INSERT OR REPLACE INTO {name} SELECT * FROM _batch")
+        con.unregister("_batch")
+        if key_sink is not None:
+            key_sink.update(arrays[key_index])
+        copied += len(rows)
+    return copied
+
+
+def _get_state(con, key: str) -> Optional[str]:
+    row = con.execute(f"SELECT value FROM {_STATE_TABLE} WHERE key = ?", [key]).fetchone()
+    return row[0] if row else None
+
+
+def refresh(source, path: Optional[str] = None, full: bool = False, batch_rows: Optional[int] = None) -> dict:
+    """
+    Bring the snapshot at `path` up to date from `source` (an Engine) and
+    return per-table row counts copied.  Builds from scratch when `full` or
+    when no snapshot exists yet.
+    """
+    duckdb = require_module("duckdb")
+    pa = require_module("pyarrow")
+    path = path or settings.LENS_OLAP_PATH
+    batch_rows = batch_rows or settings.EXPORT_BATCH_ROWS
+    tmp = f"{path}.tmp"
+    for stale in (tmp, f"{tmp}.wal"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    started = datetime.utcnow()
+    incremental = not full and os.path.exists(path)
+    if incremental:
+        shutil.copyfile(path, tmp)
+
+    con = duckdb.connect(tmp)
+    counts: dict[str, int] = {}
+    try:
+        _create_schema(con)
+        last = _get_state(con, "refresh_started_at") if incremental else None
+        since = datetime.fromisoformat(last) - _OVERLAP if last else None
+
+        with source.connect() as src:
+            for name in _DIMENSIONS:
+                con.execute(f"DELETE FROM {name}")
+                stmt, _ = _source_select(name)
+                counts[name] = _copy_rows(con, pa, src, name, stmt, batch_rows)
+
+            stmt, orders = _source_select("orders")
+            changed = func.coalesce(orders.c.updated_at, orders.c.created_at)
+            if since is not None:
+                stmt = stmt.where(changed > since)
+            touched: set = set()
+            counts["orders"] = _copy_rows(con, pa, src, "orders", stmt, batch_rows, touched, "id")
+
+            stmt, items = _source_select("order_items")
+            if since is not None:
+                # Lines of every changed order, plus lines changed on their own.
+                stmt = stmt.where(or_(
+                    items.c.order_id.in_(select(orders.c.id).where(changed > since)),
+                    func.coalesce(items.c.updated_at, items.c.created_at) > since.replace(tzinfo=timezone.utc),
+                ))
+                item_orders = src.execute(
+                    select(items.c.order_id.distinct()).where(
+                        func.coalesce(items.c.updated_at, items.c.created_at) > since.replace(tzinfo=timezone.utc)
+                    )
+                ).scalars().all()
+                touched.update(item_orders)
+                if touched:
+                    con.register("_touched", pa.table({"order_id": pa.array(sorted(touched), pa.int64())}))
+                    con.execute("DELETE FROM order_items WHERE order_id IN (SELECT order_id FROM _touched)")
+                    con.unregister("_touched")
+            counts["order_items"] = _copy_rows(con, pa, src, "order_items", stmt, batch_rows)
+
+            if incremental:
+                live = src.execute(select(orders.c.id)).scalars().all()
+                con.register("_live", pa.table({"id": pa.array(live, pa.int64())}))
+                counts["orders_deleted"] = con.execute(
+                    "SELECT COUNT(*) FROM orders WHERE id NOT IN (SELECT id FROM _live)"
+                ).fetchone()[0]
+                con.execute("DELETE FROM order_items WHERE order_id NOT IN (SELECT id FROM _live)")
+                con.execute("DELETE FROM orders WHERE id NOT IN (SELECT id FROM _live)")
+                con.unregister("_live")
+
+        con.execute(
+            f"INSERT OR REPLACE INTO {_STATE_TABLE} VALUES ('refresh_started_at', ?), ('refreshed_at', ?)",
+            [started.isoformat(), datetime.utcnow().isoformat()],
+        )
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+
+    os.replace(tmp, path)
+    logger.info("Lens snapshot %s refreshed (%s): %s", path, "incremental" if incremental else "full", counts)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+class _Snapshot:
+    def __init__(self, con, file_id: tuple, refreshed_at: datetime):
+        self.con = con
+        self.file_id = file_id
+        self.refreshed_at = refreshed_at
+
+
+_lock = threading.Lock()
+_snapshot: Optional[_Snapshot] = None
+
+
+def _file_id(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def _open_snapshot() -> Optional[_Snapshot]:
+    """The read-only connection for the current snapshot file, reopened after a refresh."""
+    global _snapshot
+    duckdb = optional_module("duckdb", "Lens columnar snapshot")
+    if duckdb is None:
+        return None
+    path = settings.LENS_OLAP_PATH
+    file_id = _file_id(path)
+    if file_id is None:
+        return None
+    current = _snapshot
+    if current is not None and current.file_id == file_id:
+        return current
+    with _lock:
+        if _snapshot is None or _snapshot.file_id != file_id:
+            # DuckDB caches databases by path within a process, so connect()
+            # would hand back the replaced file; attaching to a fresh
+            # in-memory instance opens the new one.
+            quoted = path.replace("'", "''")
+            con = duckdb.connect(":memory:")
+            con.execute(f"ATTACH '{quoted}' AS snap (READ_ONLY)")
+            con.execute("USE snap")
+            refreshed_at = datetime.fromisoformat(_get_state(con, "refreshed_at"))
+            # Queries already running keep their cursor on the old file.
+            _snapshot = _Snapshot(con, file_id, refreshed_at)
+        return _snapshot
+
+
+def reset() -> None:
+    """Forget the open snapshot (tests / after changing LENS_OLAP_PATH)."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+_TABLESAMPLE_RE = re.compile(r"TABLESAMPLE BERNOULLI \(([\d.]+)\) REPEATABLE \((\d+)\)")
+
+
+@lru_cache(maxsize=1024)
+def _duckdb_sql(sql: str) -> str:
+    """Postgres spellings DuckDB doesn't accept: TABLESAMPLE … REPEATABLE."""
+    return _TABLESAMPLE_RE.sub(r"TABLESAMPLE \1% (bernoulli, \2)", sql)
+
+
+class _Result:
+    """The slice of SQLAlchemy's Result the Lens uses: fetchone / fetchall with named rows."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._row = namedtuple("Row", [d[0] for d in cursor.description], rename=True)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return self._row(*row) if row is not None else None
+
+    def fetchall(self):
+        return [self._row(*row) for row in self._cursor.fetchall()]
+
+
+def execute(sql: str, params: dict) -> Optional[_Result]:
+    """
+    Run one Lens query (`:name` binds) on the snapshot.  None means "ask
+    Postgres": disabled, no snapshot, too old, or the query failed here.
+    """
+    if not settings.LENS_OLAP_ENABLED:
+        return None
+    try:
+        snapshot = _open_snapshot()
+    except Exception:
+        logger.exception("Could not open Lens snapshot %s", settings.LENS_OLAP_PATH)
+        return None
+    if snapshot is None:
+        return None
+    age = (datetime.utcnow() - snapshot.refreshed_at).total_seconds()
+    if age > settings.LENS_OLAP_MAX_AGE_S:
+        logger.warning("Lens snapshot is %.0f min old — querying Postgres", age / 60)
+        return None
+
+    template = compile_template(sql)
+    started = time.perf_counter()
+    try:
+        cursor = snapshot.con.cursor()
+        cursor.execute("USE snap")  # each cursor is a new connection on the default catalog
+        cursor.execute(_duckdb_sql(template.positional_sql), [params[name] for name in template.param_names])
+    except Exception:
+        logger.exception("Lens snapshot query failed — querying Postgres")
+        return None
+    logger.debug("Lens snapshot query in %.1fms", (time.perf_counter() - started) * 1000)
+    return _Result(cursor)
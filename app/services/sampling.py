@@ -0,0 +1,63 @@
+"""
+Estimates and error bounds for Lens queries run over a sample of orders.
+
+Approximate Lens queries read `orders TABLESAMPLE BERNOULLI (pct)`: every
+order is kept independently with probability p = pct / 100, together with
+all of its lines.  From a sample of n orders:
+
+  * counts and sums are scaled up by 1 / p (unbiased);
+  * averages are used as-is;
+  * 95% margins, as a fraction of the estimate, are
+        count    1.96 · sqrt((1 − p) / n)
+        sum      1.96 · sqrt((1 − p) / n · (1 + cv²))
+        average  1.96 · cv / sqrt(n)
+    where cv is the coefficient of variation of order totals in the sample.
+
+The sum margin is the Bernoulli-sampling variance (1 − p) / p² · Σy² written
+in terms of n and cv.  For order-level breakdowns that is the exact
+estimator; for item-level rows the window's cv stands in for the row's own,
+so treat those margins as indicative.
+
+Row-level sampling is deliberate: TABLESAMPLE SYSTEM picks whole pages, and
+orders are written in time order, so a page sample is clustered by time and
+these margins would understate its error.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+Z_95 = 1.96
+
+
+def order_value_cv(n: int, total: float, total_sq: float) -> float:
+    """Coefficient of variation of order totals from a sample's n, Σy and Σy²."""
+    if n < 2 or total <= 0:
+        return 0.0
+    mean = total / n
+    variance = max((total_sq - n * mean * mean) / (n - 1), 0.0)
+    return math.sqrt(variance) / mean
+
+
+def scale(value: float, fraction: float) -> float:
+    """Whole-window estimate of a count or sum seen in the sample."""
+    return value / fraction
+
+
+def count_error(n: int, fraction: float) -> Optional[float]:
+    if n <= 0:
+        return None
+    return Z_95 * math.sqrt((1 - fraction) / n)
+
+
+def sum_error(n: int, fraction: float, cv: float) -> Optional[float]:
+    if n <= 0:
+        return None
+    return Z_95 * math.sqrt((1 - fraction) / n * (1 + cv * cv))
+
+
+def mean_error(n: int, cv: float) -> Optional[float]:
+    if n <= 0:
+        return None
+    return Z_95 * cv / math.sqrt(n)
@@ -0,0 +1,198 @@
+"""
+Vectorized anomaly detection for Lens signals.
+
+`/analytics/signals` scores each metric once, against the mean/stdev of one
+window, in Python loops.  This module scores every metric on every day against
+several baselines in one NumPy pass over a (tenant, metric, day) cube:
+
+  rolling_<w>d   mean/stdev of the w days *before* the day
+  robust_<w>d    median/MAD of the same trailing window — one earlier spike
+                 can't inflate the spread and hide the next one
+  seasonal_<k>w  median/MAD of the same weekday over the previous k weeks, so
+                 the usual Friday rush isn't flagged every Friday
+
+MAD is scaled by 1.4826 (i.e. z = 0.6745·(x − median)/MAD) so robust and
+seasonal scores read on the same scale as a classic z-score.
+
+Days without orders are missing observations (NaN), not zeros — the same view
+the legacy endpoint has, since `_grouped_summary` only returns days with
+orders.  A baseline needs MIN_POINTS observations and a non-zero spread;
+otherwise its score is NaN and never flagged.
+
+Tenants are independent along axis 0, so a batch job stacks many tenants into
+one cube (scripts/detect_signals.py) and pays the Python overhead once.
+NumPy is loaded lazily; callers check `numpy_available()` and fall back to the
+stdlib implementation without it.
+"""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, Sequence
+
+from app.core.lazy_imports import optional_module, require_module
+
+METRICS: tuple[str, ...] = ("total_revenue", "order_count", "avg_order_value")
+DEFAULT_WINDOWS: tuple[int, ...] = (7, 14, 28)
+DEFAULT_SEASONAL_WEEKS = 4
+# Fewer observations than this and a baseline is meaningless (legacy rule).
+MIN_POINTS = 3
+
+_MAD_TO_STD = 1.4826
+
+
+def numpy_available() -> bool:
+    return optional_module("numpy", "vectorized analytics signals") is not None
+
+
+@dataclass
+class Signal:
+    tenant_id: int
+    metric: str
+    date: date
+    value: float
+    baseline: float
+    z_score: float
+    method: str                 # strongest baseline, e.g. "seasonal_4w"
+    confirmed_by: list[str] = field(default_factory=list)  # every baseline past the threshold
+
+
+# ── Cube construction ────────────────────────────────────────────────────────
+
+def build_cube(daily_by_tenant: Sequence[Iterable], start: date, days: int):
+    """
+    Stack per-tenant daily rows into a (tenants, len(METRICS), days) array.
+
+    Rows are `SummaryGroup`-like (group_key "YYYY-MM-DD" plus the three metric
+    attributes); day 0 is `start`.  Days with no row stay NaN.
+    """
+    np = require_module("numpy")
+    cube = np.full((len(daily_by_tenant), len(METRICS), days), np.nan)
+    for t, daily in enumerate(daily_by_tenant):
+        for row in daily:
+            d = (date.fromisoformat(str(row.group_key)[:10]) - start).days
+            if 0 <= d < days:
+                cube[t, :, d] = [float(getattr(row, m)) for m in METRICS]
+    return cube
+
+
+# ── Baselines ────────────────────────────────────────────────────────────────
+
+def _trailing(np, cube, window: int):
+    """(…, D, window) view: slot d holds days d-window … d-1, NaN before day 0."""
+    pad = np.full(cube.shape[:-1] + (window,), np.nan)
+    padded = np.concatenate([pad, cube], axis=-1)
+    return np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)[..., :-1, :]
+
+
+def _same_weekday(np, cube, weeks: int):
+    """(…, D, weeks) array: slot d holds days d-7, d-14, … d-7·weeks."""
+    days = cube.shape[-1]
+    lag = 7 * weeks
+    pad = np.full(cube.shape[:-1] + (lag,), np.nan)
+    padded = np.concatenate([pad, cube], axis=-1)
+    return np.stack(
+        [padded[..., lag - 7 * k: lag - 7 * k + days] for k in range(1, weeks + 1)],
+        axis=-1,
+    )
+
+
+def _nanmedian(np, history, n):
+    """Median over the last axis ignoring NaN — sort-based, ~10x np.nanmedian here."""
+    ordered = np.sort(history, axis=-1)  # NaN sorts last
+    lo = np.take_along_axis(ordered, np.clip((n - 1) // 2, 0, None)[..., None], axis=-1)[..., 0]
+    hi = np.take_along_axis(ordered, np.clip(n // 2, 0, None)[..., None], axis=-1)[..., 0]
+    return np.where(n > 0, (lo + hi) / 2, np.nan)
+
+
+def _mean_z(np, values, history):
+    n = np.sum(~np.isnan(history), axis=-1)
+    centre = np.nanmean(history, axis=-1)
+    spread = np.nanstd(history, axis=-1, ddof=1)
+    ok = (n >= MIN_POINTS) & (spread > 0)
+    return centre, np.where(ok, (values - centre) / np.where(ok, spread, 1.0), np.nan)
+
+
+def _robust_z(np, values, history):
+    n = np.sum(~np.isnan(history), axis=-1)
+    centre = _nanmedian(np, history, n)
+    spread = _nanmedian(np, np.abs(history - centre[..., None]), n) * _MAD_TO_STD
+    ok = (n >= MIN_POINTS) & (spread > 0)
+    return centre, np.where(ok, (values - centre) / np.where(ok, spread, 1.0), np.nan)
+
+
+def score_cube(
+    cube,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    seasonal_weeks: int = DEFAULT_SEASONAL_WEEKS,
+) -> dict:
+    """
+    Score every cell of `cube` against every baseline.
+
+    Returns {baseline name: (baseline centre, z)}, both shaped like `cube`;
+    NaN wherever the baseline had too little data or no spread.
+    """
+    np = require_module("numpy")
+    scores: dict = {}
+    # All-NaN slices (closed days, the first days of the range) are expected;
+    # they come out NaN and are masked later, so silence NumPy's warnings.
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for w in windows:
+            history = _trailing(np, cube, w)
+            scores[f"rolling_{w}d"] = _mean_z(np, cube, history)
+            scores[f"robust_{w}d"] = _robust_z(np, cube, history)
+        if seasonal_weeks:
+            scores[f"seasonal_{seasonal_weeks}w"] = _robust_z(np, cube, _same_weekday(np, cube, seasonal_weeks))
+    return scores
+
+
+# ── Flagging ─────────────────────────────────────────────────────────────────
+
+def detect(
+    cube,
+    tenant_ids: Sequence[int],
+    start: date,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    seasonal_weeks: int = DEFAULT_SEASONAL_WEEKS,
+    threshold: float = 2.0,
+    report_from: int = 0,
+) -> dict[int, list[Signal]]:
+    """
+    Flag every (tenant, metric, day) where any baseline's |z| > threshold.
+
+    Days before `report_from` only serve as history.  Each flagged cell is
+    reported once, with the strongest baseline as `method` and every baseline
+    that agreed in `confirmed_by`.  Lists are sorted strongest first.
+    """
+    np = require_module("numpy")
+    scores = score_cube(cube, windows, seasonal_weeks)
+    names = list(scores)
+    centres = np.stack([scores[n][0] for n in names])
+    z = np.stack([scores[n][1] for n in names])           # (baselines, T, M, D)
+    abs_z = np.nan_to_num(np.abs(z), nan=0.0)
+
+    flagged = abs_z > threshold
+    any_flag = flagged.any(axis=0)
+    any_flag[..., :report_from] = False
+    strongest = abs_z.argmax(axis=0)
+
+    out: dict[int, list[Signal]] = {tid: [] for tid in tenant_ids}
+    # Only flagged cells reach Python — usually a handful per tenant.
+    for t, m, d in zip(*np.nonzero(any_flag)):
+        b = strongest[t, m, d]
+        out[tenant_ids[t]].append(Signal(
+            tenant_id=tenant_ids[t],
+            metric=METRICS[m],
+            date=start + timedelta(days=int(d)),
+            value=float(cube[t, m, d]),
+            baseline=float(centres[b, t, m, d]),
+            z_score=float(z[b, t, m, d]),
+            method=names[b],
+            confirmed_by=[names[i] for i in np.flatnonzero(flagged[:, t, m, d])],
+        ))
+    for signals in out.values():
+        signals.sort(key=lambda s: abs(s.z_score), reverse=True)
+    return out
@@ -6,6 +6,9 @@ export interface DashboardStats {
   total_revenue: number;
   average_order_time: number;
   active_orders: number;
+  orders_today?: number;
+  revenue_today?: number;
+  status_counts?: Record<string, number>;
 }
 
 export interface RecentOrder {
@@ -317,25 +320,41 @@ api.interceptors.request.use(
   }
 );
 
+// Order writes carry an Idempotency-Key.  A request that fails without a
+// response (lost on flaky Wi-Fi) is retried with the same key, so the server
+// replays the first response instead of creating a second ticket.
+const newIdempotencyKey = (): string =>
+  typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()  // secure contexts only — plain-http LAN testing falls back below
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+
+const postOrderWrite = async <T>(url: string, data: unknown, retries = 2): Promise<T> => {
+  const headers = { 'Idempotency-Key': newIdempotencyKey() };
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const response = await api.post<T>(url, data, { headers });
+      return response.data;
+    } catch (error) {
+      if (attempt >= retries || !axios.isAxiosError(error) || error.response) throw error;
+    }
+  }
+};
+
 // Orders API
 export const ordersApi = {
   getAll: (): Promise<Order[]> => api.get('/orders/').then(res => res.data),
   getById: (id: number): Promise<Order> => api.get(`/orders/${id}/`).then(res => res.data),
-  create: (data: OrderCreate): Promise<Order> => 
-    api.post('/orders/', data).then(res => res.data),
+  create: (data: OrderCreate): Promise<Order> => postOrderWrite<Order>('/orders/', data),
   update: (id: number, data: Partial<Order>): Promise<Order> => 
     api.put(`/orders/${id}/`, data).then(res => res.data),
   delete: (id: number): Promise<void> => api.delete(`/orders/${id}/`).then(res => res.data),
-  createOrder: async (order: OrderCreate): Promise<Order> => {
-    const response = await api.post('/orders', order);
-    return response.data;
-  },
+  createOrder: (order: OrderCreate): Promise<Order> => postOrderWrite<Order>('/orders', order),
   getTotal: async (orderId: number): Promise<OrderTotal> => {
     const response = await api.get(`/orders/${orderId}/total`);
     return response.data;
   },
   addItem: (orderId: number, data: { menu_item_id: number; quantity: number; notes?: string }): Promise<Order> =>
-    api.post(`/orders/${orderId}/items/`, { items: [data] }).then(res => res.data),
+    postOrderWrite<Order>(`/orders/${orderId}/items/`, { items: [data] }),
   deleteItem: (orderId: number, itemId: number): Promise<void> => 
     api.delete(`/orders/${orderId}/items/${itemId}/`).then(res => res.data),
 };
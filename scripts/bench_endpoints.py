@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+"""
+Benchmark suite: every Lens (app/api/analytics.py) and dashboard
+(app/api/dashboard.py) endpoint, across date-range sizes.
+
+Each case calls the endpoint function the way FastAPI would — same
+analytics engine, same session factory — and records, best/median of
+--repeat runs:
+
+  ms        wall time, including response-model validation (and draining the
+            body for streamed exports);
+  queries   SQL statements the endpoint sent to the analytics engine, from a
+            before_cursor_execute hook — worker-thread sub-queries included,
+            queries answered from the DuckDB snapshot not.
+
+Ranges are the last N days ending --end (default: the tenant's latest
+order).  Endpoints without a date range (signals, dashboard) run once per
+suite.  Point it at a database loaded by scripts/generate_synthetic_data.py.
+
+Save a run with --save and compare a later one against it with --baseline:
+rows more than --threshold percent slower, or issuing more queries, are
+flagged with "!" — that is how an index, a rollup or a regression shows up.
+
+Usage:
+  python scripts/bench_endpoints.py --tenant 2 --ranges 7,30,90,365 --save before.json
+  python scripts/bench_endpoints.py --tenant 2 --baseline before.json
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from fastapi.params import Depends as DependsParam
+from pydantic.fields import FieldInfo
+from sqlalchemy import event, func, select
+from starlette.responses import StreamingResponse
+
+from app.api import analytics, dashboard
+from app.api.analytics import AnalyticsFilter
+from app.models import Order
+
+
+def call_endpoint(endpoint: Callable, **kwargs):
+    """
+    Call a FastAPI endpoint function directly: parameters not in `kwargs`
+    take their Query() default.  Dependencies (db, tenant_id, filters) must be
+    passed explicitly.
+    """
+    for name, param in inspect.signature(endpoint).parameters.items():
+        if name in kwargs:
+            continue
+        if isinstance(param.default, DependsParam):
+            raise TypeError(f"{endpoint.__name__}: dependency '{name}' must be passed")
+        if isinstance(param.default, FieldInfo):
+            kwargs[name] = param.default.default
+    return endpoint(**kwargs)
+
+
+def _drain(response) -> None:
+    """Consume a StreamingResponse body, as the server would."""
+    if not isinstance(response, StreamingResponse):
+        return
+
+    async def consume():
+        async for _ in response.body_iterator:
+            pass
+
+    asyncio.run(consume())
+
+
+class QueryCounter:
+    """Counts statements executed on an engine, from any thread."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@dataclass
+class Case:
+    name: str
+    endpoint: Callable
+    kwargs: Callable[[date, date], dict]   # (start, end) → endpoint arguments
+    ranged: bool = True
+
+
+def _window(**extra) -> Callable[[date, date], dict]:
+    approximate = extra.pop("approximate", False)
+    filters = {k: extra.pop(k) for k in list(extra) if k in AnalyticsFilter.model_fields}
+    return lambda start, end: {
+        "f": AnalyticsFilter(start_date=start, end_date=end, approximate=approximate, **filters), **extra,
+    }
+
+
+CASES = [
+    Case("summary", analytics.get_analytics_summary, _window()),
+    *[
+        Case(f"summary?group_by={g}", analytics.get_analytics_summary, _window(group_by=g))
+        for g in ("day", "week", "day_of_week", "hour", "category", "item", "order_type")
+    ],
+    Case("summary?approximate", analytics.get_analytics_summary, _window(group_by="day", approximate=True)),
+    *[
+        Case(f"drill?dimension={d}", analytics.get_analytics_drill, _window(dimension=d))
+        for d in ("category", "item", "day", "day_of_week", "hour", "order_type", "table")
+    ],
+    Case("drill?meal_period=dinner", analytics.get_analytics_drill, _window(dimension="item", meal_period="dinner")),
+    Case("decompose", analytics.get_analytics_decompose, _window()),
+    Case("compare", analytics.get_analytics_compare, lambda start, end: {
+        "a_start_date": start, "a_end_date": end,
+        "b_start_date": start - (end - start) - timedelta(days=1), "b_end_date": start - timedelta(days=1),
+    }),
+    Case("orders?hour=19", analytics.get_orders_for_hour, lambda start, end: {
+        "start_date": start, "end_date": end, "hour": 19,
+    }),
+    Case("export?format=csv", analytics.export_analytics_data, _window(table="orders", fmt="csv")),
+    Case("export?table=order_items", analytics.export_analytics_data, _window(table="order_items", fmt="csv")),
+    Case("signals", analytics.get_analytics_signals, lambda start, end: {}, ranged=False),
+    Case("signals/multi", analytics.get_analytics_signals_multi, lambda start, end: {}, ranged=False),
+    Case("dashboard/stats", dashboard.get_dashboard_stats, lambda start, end: {}, ranged=False),
+    Case("dashboard/recent-orders", dashboard.get_recent_orders, lambda start, end: {}, ranged=False),
+]
+
+
+@dataclass
+class Result:
+    case: str
+    days: Optional[int]
+    best_ms: float
+    median_ms: float
+    queries: int
+
+
+def run_case(case: Case, session_factory, engine, tenant_id: int, start: date, end: date, repeat: int) -> Result:
+    timings, queries = [], 0
+    for _ in range(repeat):
+        with session_factory() as db, QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            _drain(call_endpoint(case.endpoint, db=db, tenant_id=tenant_id, **case.kwargs(start, end)))
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = counter.count
+    days = (end - start).days + 1 if case.ranged else None
+    return Result(case.name, days, round(min(timings), 2), round(statistics.median(timings), 2), queries)
+
+
+def run_suite(session_factory, engine, tenant_id: int, end: date, ranges: list[int], repeat: int,
+              only: Optional[str] = None) -> list[Result]:
+    results = []
+    for case in CASES:
+        if only and only not in case.name:
+            continue
+        for days in (ranges if case.ranged else [None]):
+            start = end - timedelta(days=(days or 1) - 1)
+            results.append(run_case(case, session_factory, engine, tenant_id, start, end, repeat))
+    return results
+
+
+def compare(results: list[Result], baseline: list[dict], threshold_pct: float) -> list[tuple[Result, Optional[dict], bool]]:
+    """Pair each result with its baseline row; flag slower-than-threshold or more queries."""
+    previous = {(b["case"], b["days"]): b for b in baseline}
+    rows = []
+    for r in results:
+        b = previous.get((r.case, r.days))
+        flagged = b is not None and (
+            r.best_ms > b["best_ms"] * (1 + threshold_pct / 100) or r.queries > b["queries"]
+        )
+        rows.append((r, b, flagged))
+    return rows
+
+
+def _print(rows: list[tuple[Result, Optional[dict], bool]]) -> None:
+    print(f"\n{'case':<28} {'days':>5} {'best':>10} {'median':>10} {'queries':>8}   vs baseline")
+    for r, b, flagged in rows:
+        days = "-" if r.days is None else str(r.days)
+        line = f"{r.case:<28} {days:>5} {r.best_ms:8.1f}ms {r.median_ms:8.1f}ms {r.queries:>8}"
+        if b is not None:
+            change = (r.best_ms / b["best_ms"] - 1) * 100 if b["best_ms"] else 0.0
+            line += f"   {change:+6.1f}%  q {b['queries']}→{r.queries}{'  !' if flagged else ''}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Lens and dashboard endpoints")
+    parser.add_argument("--tenant", type=int, default=None, help="Tenant id (default: DEFAULT_TENANT_ID)")
+    parser.add_argument("--ranges", default="7,30,90,365", help="Comma-separated window sizes in days")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day of every window")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", default=None, help="Run cases whose name contains this")
+    parser.add_argument("--save", default=None, help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare against a JSON file from --save")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Percent slowdown flagged vs baseline")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.core.database import AnalyticsSessionLocal, analytics_engine
+
+    tenant_id = args.tenant or settings.DEFAULT_TENANT_ID
+    with AnalyticsSessionLocal() as db:
+        n_orders, latest = db.execute(
+            select(func.count(Order.id), func.max(Order.created_at)).where(Order.tenant_id == tenant_id)
+        ).one()
+    if not n_orders:
+        sys.exit(f"Tenant {tenant_id} has no orders — load some with scripts/generate_synthetic_data.py")
+    end = args.end or latest.date()
+    ranges = [int(r) for r in args.ranges.split(",") if r.strip()]
+
+    print(f"Tenant {tenant_id}: {n_orders:,} orders, windows ending {end}, {analytics_engine.dialect.name}, "
+          f"best of {args.repeat}")
+    results = run_suite(AnalyticsSessionLocal, analytics_engine, tenant_id, end, ranges, args.repeat, args.only)
+
+    baseline = []
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+    rows = compare(results, baseline, args.threshold)
+    _print(rows)
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump({
+                "meta": {
+                    "tenant_id": tenant_id, "orders": n_orders, "end": end.isoformat(),
+                    "dialect": analytics_engine.dialect.name, "repeat": args.repeat,
+                    "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+                    "lens_olap": settings.LENS_OLAP_ENABLED,
+                },
+                "results": [asdict(r) for r in results],
+            }, fh, indent=2)
+        print(f"\nSaved {len(results)} results to {args.save}")
+    if any(flagged for _, _, flagged in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Benchmark: Lens summary/decompose — totals + breakdown in two scans vs one
+GROUPING SETS scan.
+
+Needs a Postgres DATABASE_URL.  The synthetic orders live in a TEMP table
+named `orders`, which shadows the real table for this connection only — no
+real data is read or written, and everything vanishes on disconnect.
+
+For each orders-only group_by it reports, best of --repeat runs:
+  two-pass     _summary_totals + _grouped_summary (the old path)
+  single-pass  _summary_and_groups (GROUPING SETS ((key), ()))
+plus the shared buffers each path touched, from EXPLAIN (ANALYZE, BUFFERS).
+
+Usage:
+  python scripts/bench_lens_summary.py --rows 2000000 --days 180
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.api.analytics import (
+    AnalyticsFilter,
+    _ORDER_LEVEL_GROUPS,
+    _grouped_summary,
+    _order_level_group_sql,
+    _summary_and_groups,
+    _summary_totals,
+    build_conditions,
+)
+from app.core.database import engine
+
+_TOTALS_SQL = """
+    SELECT COUNT(*), COALESCE(SUM(o.total_amount), 0), COALESCE(AVG(o.total_amount), 0)
+    FROM orders o WHERE {where}
+"""
+
+
+def load_synthetic(conn, rows: int, days: int, tenants: int) -> None:
+    conn.execute(text("""
+        CREATE TEMP TABLE orders (
+            id           bigint PRIMARY KEY,
+            tenant_id    int NOT NULL,
+            table_id     int NOT NULL,
+            status       text NOT NULL,
+            total_amount numeric(10, 2) NOT NULL,
+            ayce_order   boolean NOT NULL,
+            created_at   timestamp NOT NULL
+        )
+    """))
+    conn.execute(text("""
+        INSERT INTO orders
+        SELECT g,
+               1 + (g % :tenants),
+               1 + (g % 20),
+               CASE WHEN g % 50 = 0 THEN 'CANCELLED' ELSE 'COMPLETED' END,
+               round((10 + random() * 90)::numeric, 2),
+               g % 3 = 0,
+               now() - (random() * :days) * interval '1 day'
+        FROM generate_series(1, :rows) AS g
+    """), {"rows": rows, "days": days, "tenants": tenants})
+    conn.execute(text("CREATE INDEX ON orders (created_at, status)"))
+    conn.execute(text("ANALYZE orders"))
+
+
+def _buffers(conn, sql: str, params: dict) -> int:
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+    top = plan[0]["Plan"]
+    return int(top.get("Shared Hit Blocks", 0)) + int(top.get("Shared Read Blocks", 0)) + \
+        int(top.get("Local Hit Blocks", 0)) + int(top.get("Local Read Blocks", 0))
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass Lens summaries")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--window-days", type=int, default=90, help="Date range queried")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark needs a Postgres DATABASE_URL (GROUPING SETS)")
+
+    with engine.connect() as conn:
+        print(f"Loading {args.rows:,} synthetic orders into a TEMP table…")
+        load_synthetic(conn, args.rows, args.days, args.tenants)
+        db = Session(bind=conn)
+        fc = build_conditions(
+            AnalyticsFilter(start_date=date.today() - timedelta(days=args.window_days), end_date=date.today()),
+            tenant_id=1,
+        )
+
+        print(f"\n{'group_by':<12} {'two-pass':>10} {'single':>10} {'speedup':>8}   buffers two/single")
+        for group_by in _ORDER_LEVEL_GROUPS:
+            two = _best(lambda: (_summary_totals(db, fc), _grouped_summary(db, group_by, fc)), args.repeat)
+            one = _best(lambda: _summary_and_groups(db, group_by, fc), args.repeat)
+            buf_two = _buffers(conn, _TOTALS_SQL.format(where=fc.order_clause), fc.params) + \
+                _buffers(conn, _order_level_group_sql(group_by, fc.shape), fc.params)
+            buf_one = _buffers(conn, _order_level_group_sql(group_by, fc.shape, with_totals=True), fc.params)
+            print(f"{group_by:<12} {two * 1000:8.1f}ms {one * 1000:8.1f}ms {two / one:7.2f}x   {buf_two}/{buf_one}")
+        db.close()
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@ from app.core.database import ensure_schema_columns  # noqa: E402
 
 def main() -> None:
     ensure_schema_columns()
-    print("Schema columns verified (menu_items.ayce_surcharge, orders leftover_charge_*)")
+    print("Schema columns verified (menu_items.ayce_surcharge, orders leftover_charge_*, image_variants)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""
+Generate a realistic synthetic restaurant dataset for performance work.
+
+Creates --tenants new tenants, each with settings, a sushi menu (categories,
+items with lunch/dinner availability and AYCE surcharges) and tables, then
+--orders orders per tenant spread over the --days days ending yesterday:
+
+  * volume     weekday lift (Fri/Sat busiest, Mon quietest), slow growth
+               over the period and day-to-day noise;
+  * time       lunch 11:00–15:59 and dinner 16:00–21:59 (the Lens meal-period
+               split), dinner about two-thirds of orders, peaking at 12:00
+               and 19:00;
+  * AYCE       ~20% of lunch and ~45% of dinner orders; priced per head
+               (party size 1–6) plus item surcharges, with more lines per
+               order than regular tickets;
+  * status     98% COMPLETED with a created → completed ticket time, 2%
+               CANCELLED.
+
+The output is fully determined by --seed.  Timestamps are the restaurant's
+wall clock, which is how Lens reads `created_at` hours.  Orders and lines
+are bulk-inserted with explicit ids in --batch-orders batches, so millions of
+orders load in minutes on Postgres.  Existing data is never touched.
+
+After loading, the new tenants' dashboard counters are reconciled (the bulk
+insert bypasses the ORM flush hook).  Refresh the Lens snapshot afterwards if
+LENS_OLAP_ENABLED is set.
+
+Usage examples:
+
+  python scripts/generate_synthetic_data.py --tenants 1 --orders 2000000 --days 730
+  python scripts/generate_synthetic_data.py --tenants 20 --orders 100000 --seed 7
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterator, Optional
+
+# Make sure the app package is importable when running from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Category, MealPeriodEnum, MenuItem, Order, OrderItem, OrderStatus, Settings, Table, Tenant
+from app.services import dashboard_counters
+
+# category → (name, price, ayce surcharge, meal period); earlier items sell more
+MENU = {
+    "Nigiri": [
+        ("Salmon Nigiri", "6.50", "0", "BOTH"), ("Tuna Nigiri", "7.00", "0", "BOTH"),
+        ("Yellowtail Nigiri", "7.00", "0", "BOTH"), ("Eel Nigiri", "7.50", "1.00", "BOTH"),
+        ("Scallop Nigiri", "8.00", "1.50", "DINNER"), ("Uni Nigiri", "12.00", "4.00", "DINNER"),
+        ("Otoro Nigiri", "14.00", "5.00", "DINNER"),
+    ],
+    "Sashimi": [
+        ("Salmon Sashimi", "14.00", "0", "BOTH"), ("Tuna Sashimi", "15.00", "0", "BOTH"),
+        ("Chef's Sashimi Platter", "32.00", "8.00", "DINNER"),
+    ],
+    "Classic Rolls": [
+        ("California Roll", "8.00", "0", "BOTH"), ("Spicy Tuna Roll", "9.00", "0", "BOTH"),
+        ("Salmon Avocado Roll", "9.00", "0", "BOTH"), ("Cucumber Roll", "6.00", "0", "BOTH"),
+        ("Philadelphia Roll", "9.50", "0", "BOTH"), ("Shrimp Tempura Roll", "11.00", "0", "BOTH"),
+    ],
+    "Specialty Rolls": [
+        ("Dragon Roll", "16.00", "2.00", "BOTH"), ("Rainbow Roll", "15.00", "2.00", "BOTH"),
+        ("Volcano Roll", "17.00", "3.00", "DINNER"), ("Lobster Roll", "22.00", "6.00", "DINNER"),
+    ],
+    "Appetizers": [
+        ("Edamame", "5.00", "0", "BOTH"), ("Miso Soup", "3.50", "0", "BOTH"),
+        ("Gyoza", "7.00", "0", "BOTH"), ("Seaweed Salad", "6.00", "0", "BOTH"),
+        ("Agedashi Tofu", "7.50", "0", "BOTH"),
+    ],
+    "Lunch Specials": [
+        ("Bento Box", "15.00", "0", "LUNCH"), ("Sushi Lunch Set", "17.00", "0", "LUNCH"),
+        ("Poke Bowl", "14.00", "0", "LUNCH"),
+    ],
+    "Drinks": [
+        ("Green Tea", "3.00", "0", "BOTH"), ("Ramune", "4.00", "0", "BOTH"),
+        ("Sake Flight", "18.00", "18.00", "DINNER"),
+    ],
+    "Desserts": [
+        ("Mochi Ice Cream", "6.00", "0", "BOTH"), ("Green Tea Cheesecake", "8.00", "1.00", "DINNER"),
+    ],
+}
+
+# relative order volume by hour of day; < 16 is lunch, ≥ 16 dinner
+HOUR_WEIGHTS = {
+    11: 6, 12: 13, 13: 9, 14: 3, 15: 2,
+    16: 3, 17: 10, 18: 18, 19: 21, 20: 14, 21: 6,
+}
+LUNCH_END_HOUR = 16
+WEEKDAY_LIFT = (0.75, 0.85, 0.9, 1.0, 1.35, 1.5, 1.15)  # Monday … Sunday
+AYCE_SHARE = {"lunch": 0.20, "dinner": 0.45}
+AYCE_PRICE = {"lunch": Decimal("24.99"), "dinner": Decimal("32.99")}
+PARTY_SIZES = (1, 2, 3, 4, 5, 6)
+PARTY_WEIGHTS = (12, 38, 18, 20, 7, 5)
+CANCEL_RATE = 0.02
+# median minutes from order to COMPLETED (lognormal)
+TICKET_MINUTES = {"lunch": 28.0, "dinner": 42.0}
+ANNUAL_GROWTH = 0.15
+
+
+@dataclass
+class SyntheticSpec:
+    tenants: int = 1
+    orders: int = 100_000           # per tenant
+    days: int = 365
+    tables: int = 20                # per tenant
+    end: date = field(default_factory=lambda: date.today() - timedelta(days=1))
+    seed: int = 42
+
+    @property
+    def start(self) -> date:
+        return self.end - timedelta(days=self.days - 1)
+
+
+@dataclass
+class _MenuEntry:
+    id: int
+    price: Decimal
+    surcharge: Decimal
+    meal_period: str
+    weight: float
+
+
+def meal_period(hour: int) -> str:
+    return "lunch" if hour < LUNCH_END_HOUR else "dinner"
+
+
+def daily_volumes(rng: random.Random, spec: SyntheticSpec) -> list[int]:
+    """Orders per day for one tenant, summing to spec.orders."""
+    weights = []
+    for d in range(spec.days):
+        day = spec.start + timedelta(days=d)
+        growth = (1 + ANNUAL_GROWTH) ** (d / 365)
+        weights.append(WEEKDAY_LIFT[day.weekday()] * growth * max(rng.gauss(1.0, 0.12), 0.2))
+    scale = spec.orders / sum(weights)
+    volumes = [int(w * scale) for w in weights]
+    # hand out the rounding remainder to the busiest days
+    for d in sorted(range(spec.days), key=lambda i: weights[i], reverse=True)[:spec.orders - sum(volumes)]:
+        volumes[d] += 1
+    return volumes
+
+
+def _menu_for(menu: list[_MenuEntry], period: str) -> tuple[list[_MenuEntry], list[float]]:
+    available = [m for m in menu if m.meal_period in ("BOTH", period.upper())]
+    return available, [m.weight for m in available]
+
+
+def generate_orders(
+    rng: random.Random,
+    spec: SyntheticSpec,
+    tenant_id: int,
+    table_ids: list[int],
+    menu: list[_MenuEntry],
+    next_order_id: int,
+    next_item_id: int,
+) -> Iterator[tuple[dict, list[dict]]]:
+    """Yield (order row, line rows) for one tenant, in time order."""
+    hours = list(HOUR_WEIGHTS)
+    hour_weights = list(HOUR_WEIGHTS.values())
+    by_period = {p: _menu_for(menu, p) for p in ("lunch", "dinner")}
+    order_id, item_id = next_order_id, next_item_id
+
+    for d, count in enumerate(daily_volumes(rng, spec)):
+        day = spec.start + timedelta(days=d)
+        stamps = sorted(
+            datetime(day.year, day.month, day.day, hour, rng.randrange(60), rng.randrange(60))
+            for hour in rng.choices(hours, hour_weights, k=count)
+        )
+        for created_at in stamps:
+            period = meal_period(created_at.hour)
+            items, weights = by_period[period]
+            party = rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0]
+            ayce = rng.random() < AYCE_SHARE[period]
+            n_lines = rng.randint(3, 5) + party * 2 if ayce else rng.randint(1, 2) + party // 2 + rng.randint(0, 2)
+
+            lines, subtotal, surcharges = [], Decimal("0"), Decimal("0")
+            for entry in rng.choices(items, weights, k=n_lines):
+                quantity = rng.choices((1, 2, 3), (70, 24, 6))[0]
+                lines.append({
+                    "id": item_id, "order_id": order_id, "menu_item_id": entry.id,
+                    "quantity": quantity, "unit_price": entry.price,
+                })
+                item_id += 1
+                subtotal += entry.price * quantity
+                surcharges += entry.surcharge * quantity
+
+            ayce_price = AYCE_PRICE[period] if ayce else Decimal("0.00")
+            total = ayce_price * party + surcharges if ayce else subtotal
+            cancelled = rng.random() < CANCEL_RATE
+            ticket = timedelta(minutes=rng.lognormvariate(math.log(TICKET_MINUTES[period]), 0.35))
+            yield {
+                "id": order_id,
+                "tenant_id": tenant_id,
+                "table_id": rng.choice(table_ids),
+                "status": OrderStatus.CANCELLED if cancelled else OrderStatus.COMPLETED,
+                "total_amount": total.quantize(Decimal("0.01")),
+                "ayce_order": ayce,
+                "ayce_price": ayce_price,
+                "party_size": party,
+                "leftover_charge_amount": Decimal("0.00"),
+                "price": Decimal("0.00"),
+                "created_at": created_at,
+                "updated_at": created_at + ticket,
+                "completion_time": None if cancelled else created_at + ticket,
+            }, lines
+            order_id += 1
+
+
+def create_tenant(db: Session, rng: random.Random, spec: SyntheticSpec, index: int, first_table_number: int):
+    """Insert one tenant's reference data; returns (tenant_id, table_ids, menu)."""
+    tenant = Tenant(name=f"Synthetic Sushi {spec.seed}-{index + 1}")
+    db.add(tenant)
+    db.flush()
+    db.add(Settings(
+        tenant_id=tenant.id, restaurant_name=tenant.name,
+        ayce_lunch_price=AYCE_PRICE["lunch"], ayce_dinner_price=AYCE_PRICE["dinner"],
+    ))
+
+    menu_rows = []
+    for position, (category_name, entries) in enumerate(MENU.items()):
+        category = Category(tenant_id=tenant.id, name=category_name, display_order=position)
+        db.add(category)
+        db.flush()
+        for rank, (name, price, surcharge, period) in enumerate(entries):
+            item = MenuItem(
+                tenant_id=tenant.id, category_id=category.id, name=name, price=Decimal(price),
+                ayce_surcharge=Decimal(surcharge), meal_period=MealPeriodEnum(period), display_order=rank,
+            )
+            db.add(item)
+            # Zipf-ish popularity within a category, varied per category
+            menu_rows.append((item, period, rng.uniform(0.5, 1.5) / (rank + 1)))
+
+    tables = [
+        Table(tenant_id=tenant.id, number=first_table_number + i, capacity=rng.choice((2, 4, 4, 6)))
+        for i in range(spec.tables)
+    ]
+    db.add_all(tables)
+    db.flush()
+    menu = [_MenuEntry(item.id, item.price, item.ayce_surcharge, period, weight) for item, period, weight in menu_rows]
+    return tenant.id, [t.id for t in tables], menu
+
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _sync_sequences(conn) -> None:
+    """Move Postgres id sequences past the explicitly-inserted ids."""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in ("orders", "order_items"):
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+        ))
+
+
+def generate(
+    engine,
+    spec: SyntheticSpec,
+    batch_orders: int = 5000,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Load the dataset described by `spec` into `engine`.  Returns
+    {"tenant_ids": [...], "orders": n, "order_items": n}.
+    """
+    rng = random.Random(spec.seed)
+    orders_table, items_table = Order.__table__, OrderItem.__table__
+    tenant_ids, n_orders, n_items = [], 0, 0
+
+    with Session(bind=engine) as db:
+        first_table_number = (db.execute(select(func.max(Table.number))).scalar() or 0) + 1
+        tenants = []
+        for index in range(spec.tenants):
+            tenants.append(create_tenant(db, rng, spec, index, first_table_number + index * spec.tables))
+        db.commit()
+
+    for tenant_id, table_ids, menu in tenants:
+        with engine.begin() as conn:
+            order_id, item_id = _next_id(conn, Order), _next_id(conn, OrderItem)
+            batch, lines = [], []
+            for order, order_lines in generate_orders(rng, spec, tenant_id, table_ids, menu, order_id, item_id):
+                batch.append(order)
+                lines.extend(order_lines)
+                if len(batch) >= batch_orders:
+                    conn.execute(orders_table.insert(), batch)
+                    conn.execute(items_table.insert(), lines)
+                    n_orders, n_items = n_orders + len(batch), n_items + len(lines)
+                    batch, lines = [], []
+                    if progress:
+                        progress(n_orders, spec.orders * spec.tenants)
+            if batch:
+                conn.execute(orders_table.insert(), batch)
+                conn.execute(items_table.insert(), lines)
+                n_orders, n_items = n_orders + len(batch), n_items + len(lines)
+            _sync_sequences(conn)
+        tenant_ids.append(tenant_id)
+
+    if engine.dialect.name == "postgresql":
+        # fresh planner statistics, so benchmarks see the plans production would
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE orders, order_items"))
+    dashboard_counters.reconcile(tenant_ids, engine=engine)
+    return {"tenant_ids": tenant_ids, "orders": n_orders, "order_items": n_items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Sushi POS dataset")
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--orders", type=int, default=100_000, help="Orders per tenant")
+    parser.add_argument("--days", type=int, default=365, help="Days of history, ending yesterday")
+    parser.add_argument("--tables", type=int, default=20, help="Tables per tenant")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-orders", type=int, default=5000)
+    args = parser.parse_args()
+
+    from app.core.database import engine
+    spec = SyntheticSpec(tenants=args.tenants, orders=args.orders, days=args.days, tables=args.tables, seed=args.seed)
+    started = time.monotonic()
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r  {done:,}/{total:,} orders", end="", flush=True)
+
+    print(f"Generating {spec.tenants} tenant(s) × {spec.orders:,} orders, {spec.start} → {spec.end} (seed {spec.seed})")
+    result = generate(engine, spec, batch_orders=args.batch_orders, progress=progress)
+    print(
+        f"\nLoaded {result['orders']:,} orders / {result['order_items']:,} lines for tenant(s) "
+        f"{', '.join(map(str, result['tenant_ids']))} in {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
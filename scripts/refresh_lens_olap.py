@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Refresh the Lens columnar snapshot (DuckDB) from the database.
+
+Usage examples:
+
+  # Incremental — orders/lines changed since the last run (every few minutes):
+  python scripts/refresh_lens_olap.py
+
+  # Full rebuild — nightly, also catches line deletions on unchanged orders:
+  python scripts/refresh_lens_olap.py --full
+
+Example crontab:
+
+  */5 * * * *  cd /app && python scripts/refresh_lens_olap.py
+  30 3 * * *   cd /app && python scripts/refresh_lens_olap.py --full
+
+Reads through the analytics engine (the read replica when
+ANALYTICS_DATABASE_URL is set) and writes LENS_OLAP_PATH atomically, so API
+workers serving from the previous snapshot are never interrupted.  Set
+LENS_OLAP_ENABLED=true for the API to use it.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Make sure the app package is importable when running from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.core.config import settings
+from app.core.database import analytics_engine
+from app.services import lens_olap
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the Lens DuckDB snapshot")
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of incrementally")
+    parser.add_argument("--path", default=settings.LENS_OLAP_PATH, help="Snapshot file (default: LENS_OLAP_PATH)")
+    parser.add_argument("--batch-rows", type=int, default=settings.EXPORT_BATCH_ROWS)
+    args = parser.parse_args()
+
+    if not lens_olap.available():
+        sys.exit("duckdb is required for the Lens snapshot (pip install duckdb)")
+
+    started = time.monotonic()
+    counts = lens_olap.refresh(analytics_engine, args.path, full=args.full, batch_rows=args.batch_rows)
+    elapsed = time.monotonic() - started
+    summary = ", ".join(f"{name}={n:,}" for name, n in counts.items())
+    print(f"{'Rebuilt' if args.full else 'Refreshed'} {args.path} in {elapsed:.1f}s ({summary})")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,12 @@ Usage examples:
   # Show current index status per tenant:
   python scripts/reindex_embeddings.py --status
 
+  # Orchestrator mode — 4 tenant workers sharing one API budget, resumable:
+  python scripts/reindex_embeddings.py --workers 4 --rpm 3000 --tpm 1000000
+
+  # Cost estimate for the whole fleet without calling the API:
+  python scripts/reindex_embeddings.py --workers 4 --dry-run
+
 Runbook — rotating the embedding model/version
   1. Update EMBEDDING_MODEL and/or EMBEDDING_VERSION in .env (or env vars).
   2. Run: python scripts/reindex_embeddings.py --full-rebuild
@@ -31,11 +37,27 @@ Runbook — recovering from partial failure
   1. Run with --status to identify tenants with missing or failed embeddings.
   2. Run normally (no --full-rebuild) to retry just the missing items.
   3. Run with --full-rebuild only if you want to discard and regenerate all embeddings.
+
+Orchestrator mode (--workers N, N > 1)
+  Tenants are processed concurrently in a pool of N processes, each tenant in
+  its own DB session.  All workers draw from one embedding-API budget
+  (--rpm requests/min, --tpm tokens/min) so adding workers never trips the
+  provider's rate limit.  Progress and throughput are printed as tenants
+  finish.  Tenants that finish without failures are recorded in a checkpoint file (--checkpoint);
+  after a crash, re-run the same command and only unfinished tenants are
+  processed.  The checkpoint is deleted once every tenant has finished
+  without failures, so the next routine run starts over and picks up menu
+  edits made since.  It is keyed by model+version+mode, so a different run
+  never resumes from a stale file; pass --fresh to ignore it.
 """
 
 import argparse
+import json
+import multiprocessing
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Make sure the app package is importable when running from the repo root
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -75,8 +97,8 @@ def print_status(db) -> None:
     print()
 
 
-def dry_run(db, tenant_id: int) -> None:
-    """Show which items would be embedded (content changed or missing)."""
+def pending_embeds(db, tenant_id: int) -> tuple[int, list[tuple[int, str, str, str]]]:
+    """Items whose content changed or is missing: (active total, [(id, name, reason, text)])."""
     from app.services.embedding_service import build_menu_item_embedding_text, _content_hash
     from sqlalchemy.orm import joinedload
 
@@ -106,14 +128,184 @@ def dry_run(db, tenant_id: int) -> None:
         )
         needs_embed = not existing or existing.content_hash != chash
         if needs_embed:
-            would_embed.append((item.id, item.name, "new" if not existing else "changed"))
+            would_embed.append((item.id, item.name, "new" if not existing else "changed", text))
+    return len(items), would_embed
+
 
+def dry_run(db, tenant_id: int) -> None:
+    """Show which items would be embedded (content changed or missing)."""
+    total, would_embed = pending_embeds(db, tenant_id)
     if would_embed:
         print(f"\n[DRY RUN] Would embed {len(would_embed)} items for tenant {tenant_id}:")
-        for item_id, name, reason in would_embed:
+        for item_id, name, reason, _ in would_embed:
             print(f"  [{reason:>7}] id={item_id} {name!r}")
     else:
-        print(f"\n[DRY RUN] All {len(items)} items are up-to-date for tenant {tenant_id}.")
+        print(f"\n[DRY RUN] All {total} items are up-to-date for tenant {tenant_id}.")
+
+
+# ── Orchestrator mode ─────────────────────────────────────────────────────────
+
+class Checkpoint:
+    """Finished-tenant record, rewritten atomically after every tenant."""
+
+    def __init__(self, path: str, run_key: dict, fresh: bool):
+        self.path = path
+        self.run_key = run_key
+        self.done: dict[str, dict] = {}
+        if not fresh and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("run") == run_key:
+                self.done = saved.get("done", {})
+
+    def is_done(self, tenant_id: int) -> bool:
+        return str(tenant_id) in self.done
+
+    def record(self, tenant_id: int, result: dict) -> None:
+        self.done[str(tenant_id)] = result
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"run": self.run_key, "done": self.done}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Remove the file once the run is complete, so the next run starts over."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _init_worker(budget) -> None:
+    from app.services.embedding_service import set_rate_budget
+    set_rate_budget(budget)
+
+
+def _process_tenant(tenant_id: int, full_rebuild: bool, estimate_only: bool) -> dict:
+    """Worker entry point: one tenant, one session."""
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        if estimate_only:
+            from app.services.embedding_service import estimate_tokens
+            total, would_embed = pending_embeds(db, tenant_id)
+            if full_rebuild:
+                from app.services.embedding_service import build_menu_item_embedding_text
+                texts = [build_menu_item_embedding_text(i) for i in (
+                    db.query(MenuItem)
+                    .filter(MenuItem.tenant_id == tenant_id, MenuItem.is_available == True)
+                    .all()
+                )]
+            else:
+                texts = [text for _, _, _, text in would_embed]
+            result = {"total": total, "pending": len(texts), "tokens": estimate_tokens(texts)}
+        else:
+            from app.services.embedding_service import (
+                upsert_menu_item_embeddings,
+                reindex_tenant_menu_embeddings,
+            )
+            if full_rebuild:
+                result = reindex_tenant_menu_embeddings(db, tenant_id)
+            else:
+                result = upsert_menu_item_embeddings(db, tenant_id)
+    finally:
+        db.close()
+    result["seconds"] = round(time.monotonic() - started, 2)
+    return result
+
+
+def orchestrate(tenant_ids: list[int], args) -> None:
+    from app.services.embedding_service import EmbeddingRateBudget
+
+    run_key = {
+        "model": settings.EMBEDDING_MODEL,
+        "version": settings.EMBEDDING_VERSION,
+        "full_rebuild": args.full_rebuild,
+    }
+    checkpoint = None
+    if not args.dry_run:
+        checkpoint = Checkpoint(args.checkpoint, run_key, args.fresh)
+        resumed = [tid for tid in tenant_ids if checkpoint.is_done(tid)]
+        if resumed:
+            print(f"Resuming from {args.checkpoint}: {len(resumed)} tenant(s) already done")
+        tenant_ids = [tid for tid in tenant_ids if not checkpoint.is_done(tid)]
+    if not tenant_ids:
+        # a complete run deletes its checkpoint, so this only follows a crash
+        # between the last tenant and the cleanup
+        checkpoint.clear()
+        print("Nothing to do.")
+        return
+
+    budget = EmbeddingRateBudget(args.rpm, args.tpm)
+    started = time.monotonic()
+    totals = {"total": 0, "skipped": 0, "upserted": 0, "failed": 0, "pending": 0, "tokens": 0}
+    errors = 0
+
+    with ProcessPoolExecutor(
+        max_workers=min(args.workers, len(tenant_ids)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(budget,),
+    ) as pool:
+        futures = {
+            pool.submit(_process_tenant, tid, args.full_rebuild, args.dry_run): tid
+            for tid in tenant_ids
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            tid = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                # not checkpointed — the next run retries this tenant
+                errors += 1
+                print(f"  [{done}/{len(tenant_ids)}] tenant {tid}: ERROR {exc}")
+                continue
+
+            for key in totals:
+                totals[key] += result.get(key, 0)
+            elapsed = time.monotonic() - started
+            if args.dry_run:
+                print(
+                    f"  [{done}/{len(tenant_ids)}] tenant {tid}: "
+                    f"{result['pending']}/{result['total']} items to embed, ~{result['tokens']} tokens"
+                )
+                continue
+
+            # tenants with failures stay unrecorded so a re-run retries them
+            if result["failed"] == 0:
+                checkpoint.record(tid, result)
+            eta = elapsed / done * (len(tenant_ids) - done)
+            print(
+                f"  [{done}/{len(tenant_ids)}] tenant {tid}: "
+                f"total={result['total']} skipped={result['skipped']} "
+                f"upserted={result['upserted']} failed={result['failed']} "
+                f"({result['seconds']:.1f}s)  "
+                f"throughput={totals['upserted'] / elapsed:.1f} items/s  eta={eta:.0f}s"
+            )
+
+    elapsed = time.monotonic() - started
+    if args.dry_run:
+        cost = totals["tokens"] / 1_000_000 * args.price_per_1m
+        # one request per 100-item batch, as in upsert_menu_item_embeddings
+        min_seconds = max(
+            totals["tokens"] * 60.0 / args.tpm if args.tpm else 0.0,
+            -(-totals["pending"] // 100) * 60.0 / args.rpm if args.rpm else 0.0,
+        )
+        print(
+            f"\n[DRY RUN] {totals['pending']} items, ~{totals['tokens']} tokens "
+            f"≈ ${cost:.4f} at ${args.price_per_1m}/1M tokens; "
+            f"≥{min_seconds:.0f}s at the configured rate budget"
+        )
+        return
+
+    print(
+        f"\nDone in {elapsed:.1f}s — total={totals['total']} skipped={totals['skipped']} "
+        f"upserted={totals['upserted']} failed={totals['failed']}"
+    )
+    if totals["failed"] > 0:
+        print(f"WARNING: {totals['failed']} items failed — check logs for details")
+    if errors or totals["failed"]:
+        print(f"Re-run the same command to retry unfinished tenants (progress kept in {args.checkpoint})")
+    else:
+        checkpoint.clear()
 
 
 def main() -> None:
@@ -122,6 +314,12 @@ def main() -> None:
     parser.add_argument("--full-rebuild", action="store_true", help="Delete all embeddings for tenant/model/version and re-embed from scratch")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be embedded without calling the API")
     parser.add_argument("--status", action="store_true", help="Print per-tenant index coverage stats and exit")
+    parser.add_argument("--workers", type=int, default=1, help="Tenant worker processes; >1 enables orchestrator mode")
+    parser.add_argument("--rpm", type=float, default=3000, help="Embedding API requests/min shared by all workers (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Embedding API tokens/min shared by all workers (0 = unlimited)")
+    parser.add_argument("--checkpoint", default=".reindex_checkpoint.json", help="Orchestrator resume file")
+    parser.add_argument("--fresh", action="store_true", help="Ignore an existing checkpoint and process every tenant")
+    parser.add_argument("--price-per-1m", type=float, default=0.02, help="USD per 1M embedding tokens, for the --dry-run estimate")
     args = parser.parse_args()
 
     db = SessionLocal()
@@ -139,6 +337,10 @@ def main() -> None:
         print(f"Embedding version: {settings.EMBEDDING_VERSION}")
         print(f"Tenants to process: {tenant_ids}")
 
+        if args.workers > 1:
+            orchestrate(tenant_ids, args)
+            return
+
         for tid in tenant_ids:
             print(f"\n── Tenant {tid} ──────────────────────────────────")
 
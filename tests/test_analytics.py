@@ -0,0 +1,221 @@
+"""
+Tests for the Lens analytics API helpers.
+
+Coverage:
+  - _run_parallel: concurrent calls on separate sessions, ordered results,
+    error propagation, serial fallback with ANALYTICS_QUERY_WORKERS=1
+  - get_analytics_compare: cohorts A and B queried concurrently and merged
+  - _summary_and_groups: one GROUPING SETS statement for orders-only
+    breakdowns, split into totals + groups; joined breakdowns fall back
+  - get_orders_for_hour: one json_agg statement on Postgres mapped to
+    HourOrder; eager-loaded ORM fallback issues a fixed number of queries
+"""
+
+import threading
+import time
+import unittest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+class _EngineCase(unittest.TestCase):
+
+    def setUp(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from app.api import analytics
+        self.engine = create_engine("sqlite://")
+        self.db = Session(bind=self.engine)
+        analytics.shutdown_query_pool()
+
+    def tearDown(self):
+        from app.api import analytics
+        analytics.shutdown_query_pool()
+        self.db.close()
+        self.engine.dispose()
+
+
+class TestRunParallel(_EngineCase):
+
+    def test_calls_overlap_on_separate_sessions(self):
+        from app.api.analytics import _run_parallel
+        barrier = threading.Barrier(2, timeout=5)
+        sessions = []
+
+        def query(session, value):
+            sessions.append(session)
+            barrier.wait()  # only returns if both calls are in flight at once
+            time.sleep(0.05)
+            return value
+
+        self.assertEqual(_run_parallel(self.db, (query, "a"), (query, "b")), ["a", "b"])
+        self.assertEqual(len({id(s) for s in sessions}), 2)
+        self.assertNotIn(self.db, sessions)
+        self.assertTrue(all(s.get_bind() is self.engine for s in sessions))
+
+    def test_error_propagates(self):
+        from app.api.analytics import _run_parallel
+
+        def boom(session):
+            raise RuntimeError("query failed")
+
+        with self.assertRaises(RuntimeError):
+            _run_parallel(self.db, (boom,), (lambda session: 1,))
+
+    def test_single_worker_runs_serially_on_request_session(self):
+        from app.api import analytics
+        seen = []
+        with patch.object(analytics.settings, "ANALYTICS_QUERY_WORKERS", 1):
+            analytics._run_parallel(self.db, (lambda s: seen.append(s),), (lambda s: seen.append(s),))
+        self.assertEqual(seen, [self.db, self.db])
+
+
+class TestCompare(_EngineCase):
+
+    def test_cohorts_run_concurrently_and_merge(self):
+        from app.api import analytics
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_drill(session, dimension, metric, fc):
+            barrier.wait()
+            value = 100.0 if fc.params["start_dt"].date() == date(2026, 2, 1) else 80.0
+            row = analytics.DrillRow(label="Nigiri", value=value, order_count=1, metadata={})
+            return [row], value
+
+        with patch.object(analytics, "_drill_query", side_effect=fake_drill):
+            resp = analytics.get_analytics_compare(
+                metric="revenue", dimension="category",
+                a_start_date=date(2026, 2, 1), a_end_date=date(2026, 2, 28), a_meal_period=None, a_order_type=None,
+                b_start_date=date(2026, 1, 1), b_end_date=date(2026, 1, 31), b_meal_period=None, b_order_type=None,
+                category_id=None, item_id=None, db=self.db, tenant_id=1,
+            )
+
+        row = resp.rows[0]
+        self.assertEqual((row.a_value, row.b_value, row.delta), (100.0, 80.0, 20.0))
+        self.assertAlmostEqual(row.pct_change, 0.25)
+
+
+def _fc(**filters):
+    from app.api.analytics import AnalyticsFilter, build_conditions
+    return build_conditions(AnalyticsFilter(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31), **filters), 1)
+
+
+def _row(key, orders, revenue, is_total=False):
+    return SimpleNamespace(
+        group_key=key, order_count=orders, total_revenue=revenue,
+        avg_order_value=revenue / orders if orders else 0, is_total=is_total,
+    )
+
+
+class TestSinglePassSummary(unittest.TestCase):
+
+    def test_eligibility(self):
+        from app.api.analytics import _single_pass
+        self.assertTrue(_single_pass("day", _fc()))
+        self.assertTrue(_single_pass("hour", _fc(category_id=3)))  # hour ignores item filters
+        self.assertFalse(_single_pass("day", _fc(category_id=3)))
+        self.assertFalse(_single_pass("item", _fc()))
+
+    def test_sql_adds_empty_grouping_set(self):
+        from app.api.analytics import _order_level_group_sql
+        sql = _order_level_group_sql("day_of_week", _fc().shape, with_totals=True)
+        self.assertIn(
+            "GROUP BY GROUPING SETS ((EXTRACT(DOW FROM o.created_at), TO_CHAR(o.created_at, 'Dy')), ())", sql
+        )
+        self.assertIn("ORDER BY is_total, EXTRACT(DOW FROM o.created_at)", sql)
+        self.assertNotIn("GROUPING", _order_level_group_sql("day_of_week", _fc().shape))
+
+    def test_one_statement_split_into_totals_and_groups(self):
+        from app.api.analytics import _summary_and_groups
+        db = MagicMock()
+        db.execute.return_value.fetchall.return_value = [
+            _row("2026-03-01", 2, 50.0), _row("2026-03-02", 3, 90.0), _row(None, 5, 140.0, is_total=True),
+        ]
+        totals, groups = _summary_and_groups(db, "day", _fc())
+        self.assertEqual(db.execute.call_count, 1)
+        self.assertEqual((totals.order_count, totals.total_revenue, totals.avg_order_value), (5, 140.0, 28.0))
+        self.assertEqual([g.group_key for g in groups], ["2026-03-01", "2026-03-02"])
+
+    def test_no_total_row_means_zero_totals(self):
+        from app.api.analytics import _summary_and_groups
+        db = MagicMock()
+        db.execute.return_value.fetchall.return_value = []
+        totals, groups = _summary_and_groups(db, "week", _fc())
+        self.assertEqual((totals.order_count, totals.total_revenue, groups), (0, 0.0, []))
+
+    def test_joined_breakdown_uses_two_queries(self):
+        from app.api import analytics
+        totals = analytics.SummaryResponse(total_revenue=1.0, order_count=1, avg_order_value=1.0)
+        with patch.object(analytics, "_summary_totals", return_value=totals) as t, \
+                patch.object(analytics, "_grouped_summary", return_value=["g"]) as g, \
+                patch.object(analytics.settings, "ANALYTICS_QUERY_WORKERS", 1):
+            self.assertEqual(analytics._summary_and_groups(MagicMock(), "category", _fc()), (totals, ["g"]))
+        t.assert_called_once()
+        g.assert_called_once()
+
+
+class TestOrdersForHour(unittest.TestCase):
+
+    def _call(self, db, **kwargs):
+        from app.api.analytics import get_orders_for_hour
+        args = dict(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31), hour=19, meal_period=None)
+        args.update(kwargs)
+        return get_orders_for_hour(db=db, tenant_id=1, **args)
+
+    def test_postgres_single_statement(self):
+        from datetime import datetime
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.execute.return_value.fetchall.return_value = [SimpleNamespace(
+            id=7, table_number=4, status="COMPLETED", total_amount=27.5, ayce_order=False,
+            created_at=datetime(2026, 3, 3, 19, 5),
+            items=[{"name": "Salmon", "quantity": 2, "unit_price": 6.5}, {"name": "Item #9", "quantity": 1, "unit_price": 14}],
+        )]
+        orders = self._call(db, meal_period="dinner")
+
+        self.assertEqual(db.execute.call_count, 1)
+        sql = str(db.execute.call_args.args[0])
+        self.assertIn("json_agg(json_build_object(", sql)
+        self.assertIn("EXTRACT(HOUR FROM o.created_at) >= 16", sql)
+        self.assertEqual(db.execute.call_args.args[1]["hour"], 19)
+        self.assertEqual((orders[0].id, orders[0].table_number, orders[0].status), (7, 4, "COMPLETED"))
+        self.assertEqual([(i.name, i.quantity, i.unit_price) for i in orders[0].items],
+                         [("Salmon", 2, 6.5), ("Item #9", 1, 14.0)])
+
+    def test_orm_fallback_query_count_is_constant(self):
+        from sqlalchemy import create_engine, event, text
+        from sqlalchemy.orm import Session
+        from sqlalchemy.pool import StaticPool
+        from app.models import Category, MenuItem, Order, OrderItem, Table, Tenant
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        for model in (Tenant, Category, MenuItem, Table, Order, OrderItem):
+            model.__table__.create(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO tenants (id, name) VALUES (1, 'A')"))
+            conn.execute(MenuItem.__table__.insert(), [{"id": 1, "tenant_id": 1, "name": "Salmon", "price": 6.5}])
+            conn.execute(text("INSERT INTO tables (id, tenant_id, number, capacity, status) VALUES (1, 1, 4, 4, 'AVAILABLE')"))
+            for oid in range(1, 21):
+                conn.execute(text(
+                    "INSERT INTO orders (id, tenant_id, table_id, status, total_amount, ayce_order, created_at, updated_at) "
+                    "VALUES (:id, 1, 1, :status, 13, 0, :created, :created)"
+                ), {"id": oid, "status": "CANCELLED" if oid == 20 else "COMPLETED",
+                    "created": f"2026-03-{oid:02d} 19:{oid:02d}:00"})
+                conn.execute(text(
+                    "INSERT INTO order_items (order_id, menu_item_id, quantity, unit_price) VALUES (:id, 1, 2, 6.5)"
+                ), {"id": oid})
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        with Session(bind=engine) as db:
+            orders = self._call(db)
+        engine.dispose()
+
+        self.assertEqual(len(orders), 19)
+        self.assertEqual(orders[0].items[0].name, "Salmon")
+        self.assertEqual(orders[0].table_number, 4)
+        self.assertLessEqual(len(statements), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
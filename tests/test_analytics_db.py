@@ -0,0 +1,71 @@
+"""
+Tests for the analytics database engine and session dependency.
+
+Coverage:
+  - get_analytics_db: sessions bound to analytics_engine, not the primary
+    pool, closed after the request
+  - statement timeout: SET on new Postgres connections, skipped elsewhere
+    or when ANALYTICS_STATEMENT_TIMEOUT_MS is 0
+  - Lens and dashboard endpoints depend on get_analytics_db
+"""
+
+import inspect
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+class TestAnalyticsSession(unittest.TestCase):
+
+    def test_session_uses_separate_engine(self):
+        from app.core import database
+        gen = database.get_analytics_db()
+        db = next(gen)
+        self.assertIs(db.get_bind(), database.analytics_engine)
+        self.assertIsNot(database.analytics_engine, database.engine)
+        self.assertIsNot(database.analytics_engine.pool, database.engine.pool)
+        with patch.object(db, "close") as close:
+            gen.close()
+        close.assert_called_once()
+
+    def test_pool_is_bounded_by_settings(self):
+        from app.core.database import analytics_engine
+        from app.core.config import settings
+        self.assertEqual(analytics_engine.pool.size(), settings.ANALYTICS_POOL_SIZE)
+        self.assertEqual(analytics_engine.pool._max_overflow, settings.ANALYTICS_MAX_OVERFLOW)
+
+
+class TestStatementTimeout(unittest.TestCase):
+
+    def _connect(self, dialect, timeout_ms):
+        from app.core import database
+        dbapi_conn = MagicMock()
+        with patch.object(database.analytics_engine.dialect, "name", dialect), \
+                patch.object(database.settings, "ANALYTICS_STATEMENT_TIMEOUT_MS", timeout_ms):
+            database._set_statement_timeout(dbapi_conn, None)
+        return dbapi_conn
+
+    def test_sets_timeout_on_postgres(self):
+        conn = self._connect("postgresql", 5000)
+        conn.cursor.return_value.execute.assert_called_once_with("SET statement_timeout = 5000")
+        conn.commit.assert_called_once()
+
+    def test_skipped_on_other_dialects_or_when_disabled(self):
+        self._connect("sqlite", 5000).cursor.assert_not_called()
+        self._connect("postgresql", 0).cursor.assert_not_called()
+
+
+class TestRouting(unittest.TestCase):
+
+    def test_reporting_endpoints_use_analytics_session(self):
+        from app.api import analytics, dashboard
+        from app.core.database import get_analytics_db, get_db
+        for router in (analytics.router, dashboard.router):
+            for route in router.routes:
+                deps = [p.default.dependency for p in inspect.signature(route.endpoint).parameters.values()
+                        if hasattr(p.default, "dependency")]
+                self.assertIn(get_analytics_db, deps, route.path)
+                self.assertNotIn(get_db, deps, route.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for approximate (sampled) Lens queries.
+
+Coverage:
+  - build_conditions: approximate=true samples orders with a fixed-seed
+    Bernoulli TABLESAMPLE; sample_pct=100 or approximate=false stay exact
+  - sampling math: cv from Σy / Σy², count / sum / mean margins
+  - totals, breakdowns and drill rows scaled by 1/p with margins attached
+  - end to end on a DuckDB snapshot: estimates land within their margins
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+def _fc(**filters):
+    from app.api.analytics import AnalyticsFilter, build_conditions
+    return build_conditions(AnalyticsFilter(start_date=date(2026, 1, 1), end_date=date(2026, 6, 30), **filters), 1)
+
+
+class TestSampledConditions(unittest.TestCase):
+
+    def test_sample_clause_and_sql(self):
+        from app.api.analytics import _order_level_group_sql, _totals_sql
+        fc = _fc(approximate=True, sample_pct=2.5)
+        self.assertEqual(fc.sample_fraction, 0.025)
+        self.assertEqual(fc.orders_from, "orders o TABLESAMPLE BERNOULLI (2.5) REPEATABLE (42)")
+        self.assertIn("FROM orders o TABLESAMPLE BERNOULLI (2.5)", _totals_sql(fc.shape))
+        self.assertIn("AS revenue_sq", _totals_sql(fc.shape))
+        self.assertIn("AS revenue_sq", _order_level_group_sql("day", fc.shape, with_totals=True))
+
+    def test_exact_unless_sampling(self):
+        from app.api.analytics import _totals_sql
+        for fc in (_fc(), _fc(approximate=True, sample_pct=100)):
+            self.assertIsNone(fc.sample_fraction)
+            self.assertNotIn("TABLESAMPLE", _totals_sql(fc.shape))
+            self.assertNotIn("revenue_sq", _totals_sql(fc.shape))
+
+
+class TestSamplingMath(unittest.TestCase):
+
+    def test_cv_and_margins(self):
+        from app.services import sampling
+        values = [10.0, 20.0, 30.0, 40.0]
+        cv = sampling.order_value_cv(4, sum(values), sum(v * v for v in values))
+        self.assertAlmostEqual(cv, 12.9099 / 25, places=4)  # stdev / mean
+        self.assertAlmostEqual(sampling.count_error(400, 0.1), 1.96 * math.sqrt(0.9 / 400))
+        self.assertAlmostEqual(sampling.sum_error(400, 0.1, 0.5), 1.96 * math.sqrt(0.9 / 400 * 1.25))
+        self.assertAlmostEqual(sampling.mean_error(400, 0.5), 1.96 * 0.5 / 20)
+        self.assertIsNone(sampling.count_error(0, 0.1))
+        self.assertEqual(sampling.order_value_cv(1, 10.0, 100.0), 0.0)
+
+
+class TestScaling(unittest.TestCase):
+
+    def test_totals_and_groups_scaled(self):
+        from app.api.analytics import _summary_and_groups
+        db = MagicMock()
+        db.execute.return_value.fetchall.return_value = [
+            SimpleNamespace(group_key="2026-01-01", order_count=30, total_revenue=600.0, avg_order_value=20.0,
+                            is_total=False, revenue_sq=0),
+            SimpleNamespace(group_key=None, order_count=100, total_revenue=2000.0, avg_order_value=20.0,
+                            is_total=True, revenue_sq=100 * 400.0 + 99 * 25.0),  # stdev 5
+        ]
+        totals, groups = _summary_and_groups(db, "day", _fc(approximate=True, sample_pct=10))
+        self.assertEqual((totals.order_count, totals.total_revenue, totals.avg_order_value), (1000, 20000.0, 20.0))
+        approx = totals.approximation
+        self.assertEqual((approx.sample_pct, approx.sampled_orders, approx.order_value_cv), (10.0, 100, 0.25))
+        self.assertAlmostEqual(approx.order_count_error, 1.96 * math.sqrt(0.9 / 100))
+        self.assertEqual((groups[0].order_count, groups[0].total_revenue), (300, 6000.0))
+        self.assertAlmostEqual(groups[0].revenue_error, 1.96 * math.sqrt(0.9 / 30 * (1 + 0.0625)))
+
+    def test_drill_rows_scaled_except_averages(self):
+        from app.api.analytics import DrillRow, SummaryResponse, Approximation, _approximate_drill
+        fc = _fc(approximate=True, sample_pct=20)
+        totals = SummaryResponse(total_revenue=0, order_count=0, avg_order_value=0, approximation=Approximation(
+            sample_pct=20, sampled_orders=50, order_value_cv=0.5))
+        rows, total = _approximate_drill(
+            [DrillRow(label="Rolls", value=100.0, order_count=10)], 100.0, "revenue", totals, fc)
+        self.assertEqual((rows[0].value, rows[0].order_count, total), (500.0, 50, 500.0))
+        self.assertAlmostEqual(rows[0].error, 1.96 * math.sqrt(0.8 / 10 * 1.25))
+        rows, total = _approximate_drill(
+            [DrillRow(label="Rolls", value=12.5, order_count=10)], 12.5, "avg_order_value", totals, fc)
+        self.assertEqual((rows[0].value, total), (12.5, 12.5))
+        self.assertAlmostEqual(rows[0].error, 1.96 * 0.5 / math.sqrt(10))
+
+
+class TestSnapshotEndToEnd(unittest.TestCase):
+
+    def setUp(self):
+        from app.services import lens_olap
+        if not lens_olap.available():
+            self.skipTest("duckdb not installed")
+        import duckdb
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, "lens.duckdb")
+        con = duckdb.connect(path)
+        lens_olap._create_schema(con)
+        # 40,000 orders over six months, totals 5–60 with a few large parties
+        con.execute("""
+            INSERT INTO orders
+            SELECT i, 1, 1, 'COMPLETED',
+                   (5 + (i * 37) % 55 + CASE WHEN i % 97 = 0 THEN 200 ELSE 0 END)::DECIMAL(10, 2),
+                   i % 3 = 0,
+                   TIMESTAMP '2026-01-01 11:00' + INTERVAL (i * 389) SECOND,
+                   NULL
+            FROM range(1, 40001) t(i)
+        """)
+        con.execute("INSERT INTO _lens_sync VALUES ('refreshed_at', ?)", [datetime.utcnow().isoformat()])
+        con.close()
+        self.settings = patch.multiple("app.services.lens_olap.settings", LENS_OLAP_ENABLED=True, LENS_OLAP_PATH=path)
+        self.settings.start()
+        lens_olap.reset()
+
+    def tearDown(self):
+        from app.services import lens_olap
+        self.settings.stop()
+        lens_olap.reset()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_estimates_within_margins(self):
+        from app.api.analytics import _summary_and_groups
+        db = MagicMock()
+        exact, exact_groups = _summary_and_groups(db, "order_type", _fc())
+        approx, approx_groups = _summary_and_groups(db, "order_type", _fc(approximate=True, sample_pct=10))
+        db.execute.assert_not_called()
+
+        a = approx.approximation
+        self.assertLess(a.sampled_orders, exact.order_count / 5)
+        self.assertLessEqual(abs(approx.total_revenue - exact.total_revenue),
+                             a.revenue_error * approx.total_revenue)
+        self.assertLessEqual(abs(approx.order_count - exact.order_count), a.order_count_error * approx.order_count)
+        self.assertLessEqual(abs(approx.avg_order_value - exact.avg_order_value),
+                             a.avg_order_value_error * approx.avg_order_value)
+        for e, g in zip(exact_groups, approx_groups):
+            self.assertEqual(e.group_key, g.group_key)
+            self.assertLessEqual(abs(g.total_revenue - e.total_revenue), g.revenue_error * g.total_revenue)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,18 +2,30 @@
 Tests for the Ask Shari LLM explanation layer.
 
 Coverage:
-  - Cache: hit/miss, invalidation, tenant isolation, query normalization
+  - Cache: hit/miss, invalidation, tenant isolation, query normalization,
+    filter scoping
+  - In-memory backend: LRU order, byte bound, expiry sweep, superseded
+    version purge, stats
+  - Shared menu version store: Redis counter semantics, cross-worker bump
+    observed after the local copy expires, store outage fallback, a failed
+    bump not rolled back by the lagging store
+  - Semantic cache tier: similarity threshold, scope (tenant / version /
+    filters), service reuse of the query embedding
   - Service: LLM fallback on failure, hallucination rejection, narrative
     parsing, featured-item extraction, tenant-scoped retrieval
+  - Streaming: results first, incremental featured validation, held-back
+    hallucinated names, fallback/replace, final response cached
   - Response schema (Pydantic round-trip) with the new narrative / featured
     / llm_used / cache_hit / more_count fields
 """
 
 from __future__ import annotations
 
+import json
+import time
 import unittest
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 
 # ── Fakes ─────────────────────────────────────────────────────────────────────
@@ -112,6 +124,222 @@ class TestAskShariCache(unittest.TestCase):
         with patch("app.services.ask_shari_cache.time.time", return_value=9_999_999_999):
             self.assertIsNone(ask_shari_cache.get_cached(1, "q"))
 
+    def test_filters_are_part_of_the_key(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.set_cached(1, "rolls", {"f": "veg"}, filters={"category_id": 3, "min_price": None})
+        self.assertIsNone(ask_shari_cache.get_cached(1, "rolls"))
+        self.assertEqual(ask_shari_cache.get_cached(1, "rolls", {"category_id": 3}), {"f": "veg"})
+
+    def test_filter_signature_format(self):
+        from app.services.ask_shari_cache import filter_signature
+        # stored in query_frequencies.filters — the format must not drift
+        self.assertEqual(filter_signature({"min_price": None}), "")
+        self.assertEqual(filter_signature(None), "")
+        self.assertEqual(
+            filter_signature({"max_price": 20, "category_id": 3, "meal_period": None}),
+            '{"category_id":3,"max_price":20}',
+        )
+
+
+class TestInMemoryLRU(unittest.TestCase):
+
+    def _cache(self, max_bytes=10_000, sweep_interval_s=60.0):
+        from app.services.ask_shari_cache import _InMemoryCache
+        return _InMemoryCache(max_bytes=max_bytes, sweep_interval_s=sweep_interval_s)
+
+    def test_evicts_least_recently_used(self):
+        value = {"blob": "x" * 40}
+        cache = self._cache(max_bytes=3 * (len("k1") + len(json.dumps(value))))
+        cache.set("k1", value, 60)
+        cache.set("k2", value, 60)
+        cache.set("k3", value, 60)
+        cache.get("k1")                 # k2 is now the LRU entry
+        cache.set("k4", value, 60)
+        self.assertIsNotNone(cache.get("k1"))
+        self.assertIsNone(cache.get("k2"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_accounting_and_oversize_rejection(self):
+        cache = self._cache(max_bytes=100)
+        cache.set("small", {"a": 1}, 60)
+        cache.set("huge", {"a": "x" * 500}, 60)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["bytes"], len("small") + len(json.dumps({"a": 1})))
+        self.assertEqual(stats["rejected"], 1)
+
+    def test_sweep_removes_expired_without_reads(self):
+        cache = self._cache(sweep_interval_s=10)
+        cache.set("a", {"v": 1}, 1)
+        cache.set("b", {"v": 2}, 1000)
+        with patch("app.services.ask_shari_cache.time.time", return_value=time.time() + 30):
+            cache.get("b")
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["expirations"], 1)
+
+    def test_bump_purges_superseded_versions(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.reset_for_tests()
+        ask_shari_cache.set_cached(1, "q1", {"v": 1})
+        ask_shari_cache.set_cached(1, "q2", {"v": 1})
+        ask_shari_cache.set_cached(2, "q1", {"v": 1})
+        ask_shari_cache.bump_menu_version(1)
+        stats = ask_shari_cache.cache_stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["purged"], 2)
+
+    def test_hit_miss_counters(self):
+        cache = self._cache()
+        cache.set("a", {"v": 1}, 60)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        self.data[key] = int(self.data[key]) + 1
+        return self.data[key]
+
+
+class TestMenuVersionStore(unittest.TestCase):
+
+    def setUp(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.reset_for_tests()
+
+    def tearDown(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.reset_for_tests()
+
+    def _redis_store(self, fake):
+        from app.services.ask_shari_cache import _RedisVersionStore
+        store = _RedisVersionStore.__new__(_RedisVersionStore)
+        store._client = fake
+        return store
+
+    def test_redis_counter_seeded_from_clock_and_incremented(self):
+        store = self._redis_store(_FakeRedis())
+        first = store.get(1)
+        self.assertGreater(first, 1_000_000_000)   # never restarts at 1
+        self.assertEqual(store.bump(1), first + 1)
+        self.assertEqual(store.get(1), first + 1)
+
+    def test_bump_from_another_worker_is_seen_after_local_ttl(self):
+        from app.services import ask_shari_cache
+        shared = self._redis_store(_FakeRedis())
+        ask_shari_cache._version_store = shared
+
+        ask_shari_cache.set_cached(1, "spicy", {"v": "old"})
+        shared.bump(1)  # another worker edits the menu
+
+        # within the local TTL this worker may still serve the old entry...
+        self.assertEqual(ask_shari_cache.get_cached(1, "spicy"), {"v": "old"})
+        # ...but not once its copy of the version has expired
+        with patch.object(ask_shari_cache.settings, "ASK_SHARI_VERSION_CACHE_S", 0.0):
+            self.assertIsNone(ask_shari_cache.get_cached(1, "spicy"))
+        self.assertEqual(ask_shari_cache.cache_stats()["purged"], 1)
+
+    def test_store_outage_keeps_serving_last_known_version(self):
+        from app.services import ask_shari_cache
+        broken = MagicMock()
+        broken.get.side_effect = ConnectionError("down")
+        broken.bump.side_effect = ConnectionError("down")
+        ask_shari_cache._menu_versions[1] = (41, 0.0)
+        ask_shari_cache._version_store = broken
+
+        self.assertEqual(ask_shari_cache.get_menu_version(1), 41)
+        self.assertEqual(ask_shari_cache.bump_menu_version(1), 42)
+
+    def test_failed_bump_is_not_undone_by_a_lagging_store(self):
+        from app.services import ask_shari_cache
+        shared = self._redis_store(_FakeRedis())
+        ask_shari_cache._version_store = shared
+        before = ask_shari_cache.get_menu_version(1)
+
+        with patch.object(shared, "bump", side_effect=ConnectionError("down")):
+            bumped = ask_shari_cache.bump_menu_version(1)
+        self.assertEqual(bumped, before + 1)
+
+        # the local copy expires; the store still holds the pre-bump version
+        with patch.object(ask_shari_cache.settings, "ASK_SHARI_VERSION_CACHE_S", 0.0):
+            self.assertEqual(ask_shari_cache.get_menu_version(1), bumped)
+        with patch.object(shared, "get", wraps=shared.get) as read:
+            self.assertEqual(ask_shari_cache.get_menu_version(1), bumped)
+            read.assert_not_called()   # timestamp was refreshed by the lagging read
+
+
+class TestSemanticCache(unittest.TestCase):
+
+    def setUp(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.reset_for_tests()
+        self._threshold = patch.object(ask_shari_cache.settings, "ASK_SHARI_SEMANTIC_THRESHOLD", 0.9)
+        self._threshold.start()
+
+    def tearDown(self):
+        self._threshold.stop()
+
+    def test_near_duplicate_hits_above_threshold(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.set_cached(1, "spicy tuna roll", {"v": 1}, query_vector=[1.0, 0.0, 0.1])
+        self.assertEqual(ask_shari_cache.get_semantic(1, [0.98, 0.05, 0.1]), {"v": 1})
+
+    def test_dissimilar_query_misses(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.set_cached(1, "spicy tuna roll", {"v": 1}, query_vector=[1.0, 0.0, 0.0])
+        self.assertIsNone(ask_shari_cache.get_semantic(1, [0.5, 0.8, 0.0]))
+
+    def test_scoped_to_tenant_version_and_filters(self):
+        from app.services import ask_shari_cache
+        vec = [0.0, 1.0, 0.0]
+        ask_shari_cache.set_cached(1, "vegan", {"v": 1}, filters={"max_price": 20}, query_vector=vec)
+        self.assertIsNone(ask_shari_cache.get_semantic(2, vec, {"max_price": 20}))
+        self.assertIsNone(ask_shari_cache.get_semantic(1, vec))
+        self.assertEqual(ask_shari_cache.get_semantic(1, vec, {"max_price": 20}), {"v": 1})
+        ask_shari_cache.bump_menu_version(1)
+        self.assertIsNone(ask_shari_cache.get_semantic(1, vec, {"max_price": 20}))
+
+    def test_disabled_when_threshold_zero(self):
+        from app.services import ask_shari_cache
+        with patch.object(ask_shari_cache.settings, "ASK_SHARI_SEMANTIC_THRESHOLD", 0.0):
+            ask_shari_cache.set_cached(1, "q", {"v": 1}, query_vector=[1.0, 0.0])
+            self.assertIsNone(ask_shari_cache.get_semantic(1, [1.0, 0.0]))
+
+    def test_service_serves_paraphrase_from_cache(self):
+        from app.services import ask_shari_service
+
+        items = [_make_item(id=1), _make_item(id=2, name="Salmon Nigiri")]
+        vectors = {"spicy tuna roll": [1.0, 0.0], "spicy tuna rolls": [0.99, 0.02]}
+
+        with patch.object(ask_shari_service, "embed_query", side_effect=vectors.get), \
+             patch.object(ask_shari_service, "hybrid_search", return_value=_retrieval_result(items)) as mock_ret, \
+             patch.object(ask_shari_service, "_call_llm", return_value=None) as mock_llm:
+            first = ask_shari_service.ask_shari(db=None, tenant_id=1, query="spicy tuna roll")
+            second = ask_shari_service.ask_shari(db=None, tenant_id=1, query="spicy tuna rolls")
+
+        self.assertEqual(mock_ret.call_count, 1)
+        self.assertEqual(mock_llm.call_count, 1)
+        # retrieval reused the embedding computed for the cache lookup
+        self.assertEqual(mock_ret.call_args.kwargs["query_vector"], [1.0, 0.0])
+        self.assertFalse(first["cache_hit"])
+        self.assertTrue(second["cache_hit"])
+        self.assertEqual(first["narrative"], second["narrative"])
+
 
 # ── Narrative parsing helpers ────────────────────────────────────────────────
 
@@ -296,6 +524,86 @@ class TestAskShariService(unittest.TestCase):
         self.assertFalse(a_ids & b_ids)
 
 
+# ── Streaming ─────────────────────────────────────────────────────────────────
+
+class TestAskShariStream(unittest.TestCase):
+
+    ITEMS = [
+        _make_item(id=1, name="Spicy Tuna Roll"),
+        _make_item(id=2, name="Salmon Nigiri"),
+        _make_item(id=3, name="Dragon Roll"),
+    ]
+
+    def setUp(self):
+        from app.services import ask_shari_cache
+        ask_shari_cache.reset_for_tests()
+
+    def _run(self, deltas=None, error=None):
+        from app.services import ask_shari_service
+
+        def fake_stream(query, llm_items):
+            yield from deltas or []
+            if error:
+                raise ask_shari_service._LLMStreamError("boom")
+
+        with patch.object(ask_shari_service, "hybrid_search", return_value=_retrieval_result(self.ITEMS)), \
+             patch.object(ask_shari_service, "_stream_llm", side_effect=fake_stream):
+            return list(ask_shari_service.ask_shari_stream(None, 1, "spicy"))
+
+    def test_streams_results_then_text_then_done(self):
+        events = self._run([
+            "Try the **Spi", "cy Tuna Roll** for heat, or **Salmon Nigiri**.", "\nFOLLOW", "_UP: More?",
+        ])
+        names = [e for e, _ in events]
+        self.assertEqual(names[0], "results")
+        self.assertEqual(names[-1], "done")
+        text = "".join(d["text"] for e, d in events if e == "delta")
+        self.assertEqual(text.strip(), "Try the **Spicy Tuna Roll** for heat, or **Salmon Nigiri**.")
+        self.assertNotIn("FOLLOW", text)
+        self.assertEqual([d["id"] for e, d in events if e == "featured"], [1, 2])
+        done = events[-1][1]
+        self.assertTrue(done["llm_used"])
+        self.assertEqual(done["follow_up"], "More?")
+
+    def test_open_bold_is_held_back_until_validated(self):
+        from app.services.ask_shari_service import _NarrativeStream
+        allowed = {"dragon roll": {"id": 3, "name": "Dragon Roll"}}
+        stream = _NarrativeStream(allowed)
+        self.assertEqual(stream.feed("Go for the **Drag"), [("delta", {"text": "Go for the "})])
+        events = stream.feed("on Roll** tonight")
+        self.assertEqual(events[0], ("delta", {"text": "**Dragon Roll** tonight"}))
+        self.assertEqual(events[1][0], "featured")
+
+    def test_hallucinated_name_never_sent_and_replaced(self):
+        events = self._run(["Try **Spicy Tuna Roll** or the **Phantom Roll** today."])
+        text = "".join(d["text"] for e, d in events if e == "delta")
+        self.assertNotIn("Phantom", text)
+        replace = [d for e, d in events if e == "replace"]
+        self.assertEqual(len(replace), 1)
+        self.assertIn("**Spicy Tuna Roll**", replace[0]["narrative"])
+        self.assertFalse(events[-1][1]["llm_used"])
+
+    def test_llm_unavailable_sends_fallback_as_text(self):
+        events = self._run([])
+        self.assertNotIn("replace", [e for e, _ in events])
+        self.assertIn("**Spicy Tuna Roll**", next(d["text"] for e, d in events if e == "delta"))
+        self.assertFalse(events[-1][1]["llm_used"])
+
+    def test_failed_stream_falls_back(self):
+        events = self._run(["Try the **Dragon Roll**"], error=True)
+        self.assertIn("replace", [e for e, _ in events])
+        self.assertFalse(events[-1][1]["llm_used"])
+
+    def test_final_response_is_cached_for_blocking_endpoint(self):
+        from app.services import ask_shari_service
+        self._run(["Try the **Dragon Roll**.\nFOLLOW_UP: More?"])
+        with patch.object(ask_shari_service, "hybrid_search") as mock_ret:
+            result = ask_shari_service.ask_shari(db=None, tenant_id=1, query="spicy")
+        mock_ret.assert_not_called()
+        self.assertTrue(result["cache_hit"])
+        self.assertEqual(result["narrative"], "Try the **Dragon Roll**.")
+
+
 # ── Schema (Pydantic round-trip) ──────────────────────────────────────────────
 
 class TestAskShariSchema(unittest.TestCase):
@@ -0,0 +1,136 @@
+"""
+Tests for the cache warm-up subsystem.
+
+Coverage:
+  - record_query / flush: counts buffered in memory, upserted per query
+  - top_queries: most frequent first, filters round-trip
+  - warm_tenant: replays Ask Shari with its filters and search embeddings,
+    stops at the time budget
+  - wiring: a menu version bump schedules a (debounced) warm-up
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+def _engine():
+    """In-memory SQLite stand-in for the query_frequencies table."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from app.models.query_frequency import QueryFrequency
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    QueryFrequency.__table__.create(engine)
+    return engine
+
+
+class _WarmupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from app.services import ask_shari_cache, cache_warmup
+        ask_shari_cache.reset_for_tests()
+        cache_warmup.reset_for_tests()
+        self.engine = _engine()
+        self._patches = [
+            patch.object(cache_warmup, "_engine", return_value=self.engine),
+            # flushes run inline instead of on the background thread
+            patch.object(cache_warmup, "_get_executor", return_value=MagicMock()),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        from app.services import ask_shari_cache, cache_warmup
+        for p in self._patches:
+            p.stop()
+        cache_warmup.reset_for_tests()
+        ask_shari_cache.reset_for_tests()
+        self.engine.dispose()
+
+
+class TestFrequencyLog(_WarmupTestCase):
+
+    def test_counts_are_aggregated_per_normalized_query(self):
+        from app.services import cache_warmup
+        cache_warmup.record_query(1, "ask_shari", "Spicy  Tuna")
+        cache_warmup.record_query(1, "ask_shari", "spicy tuna")
+        cache_warmup.record_query(1, "search", "spicy tuna")
+        cache_warmup.flush()
+        cache_warmup.record_query(1, "ask_shari", "SPICY TUNA")
+        cache_warmup.flush()
+
+        with self.engine.connect() as conn:
+            rows = dict(conn.exec_driver_sql("SELECT kind, hits FROM query_frequencies").fetchall())
+        self.assertEqual(rows, {"ask_shari": 3, "search": 1})
+
+    def test_top_queries_orders_by_hits_and_keeps_filters(self):
+        from app.services import cache_warmup
+        for _ in range(3):
+            cache_warmup.record_query(1, "ask_shari", "vegan", {"max_price": 15, "category_id": None})
+        cache_warmup.record_query(1, "ask_shari", "salmon")
+        cache_warmup.record_query(2, "ask_shari", "other tenant")
+        cache_warmup.flush()
+
+        top = cache_warmup.top_queries(1, 10)
+        self.assertEqual(top, [("ask_shari", "vegan", {"max_price": 15}), ("ask_shari", "salmon", {})])
+
+
+class TestWarmTenant(_WarmupTestCase):
+
+    def _seed(self):
+        from app.services import cache_warmup
+        for _ in range(2):
+            cache_warmup.record_query(1, "ask_shari", "vegan", {"max_price": 15})
+        cache_warmup.record_query(1, "search", "eel")
+        cache_warmup.flush()
+
+    def test_replays_ask_shari_and_search(self):
+        from app.services import cache_warmup
+        self._seed()
+        with patch("app.core.database.SessionLocal", return_value=MagicMock()), \
+             patch("app.services.ask_shari_service.ask_shari") as ask, \
+             patch("app.services.embedding_service.embed_query") as embed:
+            result = cache_warmup.warm_tenant(1)
+
+        ask.assert_called_once()
+        self.assertEqual(ask.call_args.args[1:], (1, "vegan"))
+        self.assertEqual(ask.call_args.kwargs, {"max_price": 15})
+        embed.assert_called_once_with("eel")
+        self.assertEqual(result["replayed"], 2)
+
+    def test_stops_at_budget(self):
+        from app.services import cache_warmup
+        self._seed()
+        with patch.object(cache_warmup.settings, "WARMUP_BUDGET_S", 0.0), \
+             patch("app.core.database.SessionLocal", return_value=MagicMock()), \
+             patch("app.services.ask_shari_service.ask_shari") as ask:
+            result = cache_warmup.warm_tenant(1)
+        ask.assert_not_called()
+        self.assertEqual(result["skipped"], 2)
+
+
+class TestWiring(_WarmupTestCase):
+
+    def test_bump_schedules_warmup_once_per_burst(self):
+        from app.services import ask_shari_cache, cache_warmup
+        timers = []
+
+        def fake_timer(delay, fn):
+            timer = MagicMock()
+            timers.append(timer)
+            return timer
+
+        cache_warmup.install()
+        with patch.object(cache_warmup.threading, "Timer", side_effect=fake_timer):
+            ask_shari_cache.bump_menu_version(1)
+            ask_shari_cache.bump_menu_version(1)
+
+        self.assertEqual(len(timers), 2)
+        timers[0].cancel.assert_called_once()   # debounced by the second bump
+        timers[1].start.assert_called_once()
+        timers[1].cancel.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Tests for the process-wide outbound client registry.
+
+Coverage:
+  - S3 / OpenAI clients are built once and reused
+  - configured pool sizes reach botocore / httpx
+  - per-call OpenAI timeouts share the pooled http client
+  - fork safety: a client owned by another PID is rebuilt
+  - no OpenAI client without an API key
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+
+class TestClientRegistry(unittest.TestCase):
+
+    def setUp(self):
+        from app.core import clients
+        clients.reset_for_tests()
+
+    def tearDown(self):
+        from app.core import clients
+        clients.reset_for_tests()
+
+    def test_s3_client_is_reused(self):
+        from app.core import clients
+        self.assertIs(clients.get_s3_client(), clients.get_s3_client())
+
+    def test_s3_pool_size_from_settings(self):
+        from app.core import clients
+        with patch.object(clients.settings, "S3_MAX_POOL_CONNECTIONS", 7):
+            client = clients.get_s3_client()
+        self.assertEqual(client.meta.config.max_pool_connections, 7)
+
+    def test_openai_disabled_without_key(self):
+        from app.core import clients
+        with patch.object(clients.settings, "OPENAI_API_KEY", None):
+            self.assertIsNone(clients.get_openai_client())
+
+    def test_openai_client_is_reused_and_timeout_view_shares_pool(self):
+        from app.core import clients
+        with patch.object(clients.settings, "OPENAI_API_KEY", "sk-test"):
+            base = clients.get_openai_client()
+            self.assertIs(base, clients.get_openai_client())
+            view = clients.get_openai_client(timeout=2.5)
+        self.assertIsNot(view, base)
+        self.assertEqual(view.timeout, 2.5)
+        self.assertIs(view._client, base._client)
+
+    def test_client_inherited_across_fork_is_rebuilt(self):
+        from app.core import clients
+        first = clients.get_s3_client()
+        with patch.object(clients.os, "getpid", return_value=clients.os.getpid() + 1):
+            second = clients.get_s3_client()
+        self.assertIsNot(first, second)
+
+    def test_reset_after_fork_clears_registry(self):
+        from app.core import clients
+        first = clients.get_s3_client()
+        clients._reset_after_fork()
+        self.assertIsNot(first, clients.get_s3_client())
+
+
+if __name__ == "__main__":
+    unittest.main()
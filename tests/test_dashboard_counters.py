@@ -0,0 +1,206 @@
+"""
+Tests for the per-tenant dashboard counters.
+
+Coverage:
+  - write path: creating, re-pricing, completing and deleting orders moves the
+    counters in the same transaction; a rollback leaves them untouched
+  - completion_time is stamped on COMPLETED and feeds today's ticket time
+  - the first write seeds the row from existing orders
+  - *_today columns restart on a new local day; readers see zero until then
+  - reconcile: recomputes drifted rows and reports them
+  - get_dashboard_stats: reads the single row, real average_order_time
+"""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+
+class _CounterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from app.models import Category, DashboardCounter, Discount, MenuItem, Order, OrderItem, Settings, Table, Tenant
+        from app.services import dashboard_counters
+        dashboard_counters.reset_for_tests()
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (Tenant, Settings, Category, MenuItem, Table, Order, OrderItem, Discount, DashboardCounter):
+            model.__table__.create(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO tenants (id, name) VALUES (1, 'A'), (2, 'B')"))
+            conn.execute(text("INSERT INTO tables (id, tenant_id, number, capacity, status) VALUES (1, 1, 1, 4, 'AVAILABLE')"))
+        self.Session = sessionmaker(bind=self.engine)
+        with patch.object(dashboard_counters.settings, "DASHBOARD_RECONCILE_INTERVAL_S", 0):
+            dashboard_counters.install(self.Session)
+
+    def tearDown(self):
+        from app.services import dashboard_counters
+        dashboard_counters.reset_for_tests()
+        self.engine.dispose()
+
+    def _add(self, db, total, tenant_id=1, **kwargs):
+        from app.models import Order
+        order = Order(tenant_id=tenant_id, table_id=1, total_amount=Decimal(total), **kwargs)
+        db.add(order)
+        return order
+
+    def _counters(self, tenant_id=1):
+        from app.services import dashboard_counters
+        with self.Session() as db:
+            return dashboard_counters.read(db, tenant_id)
+
+
+class TestWritePath(_CounterTestCase):
+
+    def test_create_update_complete_delete(self):
+        from app.models import OrderStatus
+        with self.Session() as db:
+            first = self._add(db, "20.00")
+            self._add(db, "15.50")
+            db.commit()
+            c = self._counters()
+            self.assertEqual((c["total_orders"], c["total_revenue"], c["pending"]), (2, Decimal("35.50"), 2))
+            self.assertEqual((c["orders_today"], c["revenue_today"]), (2, Decimal("35.50")))
+
+            first.total_amount = Decimal("25.00")
+            first.status = OrderStatus.PREPARING
+            db.commit()
+            c = self._counters()
+            self.assertEqual((c["total_revenue"], c["pending"], c["preparing"]), (Decimal("40.50"), 1, 1))
+
+            db.delete(first)
+            db.commit()
+            c = self._counters()
+            self.assertEqual((c["total_orders"], c["total_revenue"], c["preparing"]), (1, Decimal("15.50"), 0))
+
+    def test_rollback_leaves_counters_unchanged(self):
+        with self.Session() as db:
+            self._add(db, "10.00")
+            db.commit()
+            self._add(db, "99.00")
+            db.flush()
+            db.rollback()
+        self.assertEqual(self._counters()["total_orders"], 1)
+
+    def test_completion_feeds_ticket_time(self):
+        from app.models import OrderStatus
+        with self.Session() as db:
+            order = self._add(db, "30.00", created_at=datetime.utcnow() - timedelta(minutes=12))
+            db.commit()
+            order.status = OrderStatus.COMPLETED
+            db.commit()
+            self.assertIsNotNone(order.completion_time)
+            c = self._counters()
+            self.assertEqual((c["completed"], c["completed_today"]), (1, 1))
+            self.assertAlmostEqual(c["ticket_seconds_today"], 720, delta=5)
+
+            order.status = OrderStatus.READY  # re-opened
+            db.commit()
+            self.assertIsNone(order.completion_time)
+            c = self._counters()
+            self.assertEqual((c["completed"], c["ready"], c["completed_today"], c["ticket_seconds_today"]), (0, 1, 0, 0))
+
+    def test_first_write_seeds_from_existing_orders(self):
+        from sqlalchemy import text
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO orders (tenant_id, table_id, status, total_amount, created_at) "
+                "VALUES (1, 1, 'COMPLETED', 12, '2020-01-01 12:00:00'), (1, 1, 'CANCELLED', 8, '2020-01-02 12:00:00')"
+            ))
+        with self.Session() as db:
+            self._add(db, "5.00")
+            db.commit()
+        c = self._counters()
+        self.assertEqual((c["total_orders"], c["total_revenue"], c["completed"], c["cancelled"]), (3, Decimal("25.00"), 1, 1))
+        self.assertEqual(c["orders_today"], 1)
+
+    def test_tenants_are_separate(self):
+        with self.Session() as db:
+            self._add(db, "10.00")
+            self._add(db, "7.00", tenant_id=2)
+            db.commit()
+        self.assertEqual(self._counters(1)["total_revenue"], Decimal("10.00"))
+        self.assertEqual(self._counters(2)["total_revenue"], Decimal("7.00"))
+
+
+class TestLocalDay(_CounterTestCase):
+
+    def test_today_columns_restart_on_a_new_day(self):
+        from sqlalchemy import text
+        with self.Session() as db:
+            self._add(db, "10.00")
+            db.commit()
+        with self.engine.begin() as conn:
+            conn.execute(text("UPDATE dashboard_counters SET day = '2020-01-01'"))
+        c = self._counters()
+        self.assertEqual((c["total_orders"], c["orders_today"], c["revenue_today"]), (1, 0, 0))
+
+        with self.Session() as db:
+            self._add(db, "4.00")
+            db.commit()
+        c = self._counters()
+        self.assertEqual((c["total_orders"], c["orders_today"], c["revenue_today"]), (2, 1, Decimal("4.00")))
+
+    def test_day_follows_tenant_timezone(self):
+        from zoneinfo import ZoneInfo
+        from app.services.dashboard_counters import _day_start_utc, _local_date
+        tz = ZoneInfo("America/New_York")
+        # 02:00 UTC on Mar 4 is still the evening of Mar 3 in New York
+        self.assertEqual(str(_local_date(datetime(2026, 3, 4, 2, 0), tz)), "2026-03-03")
+        self.assertEqual(_day_start_utc(datetime(2026, 3, 3).date(), tz), datetime(2026, 3, 3, 5, 0))
+
+
+class TestReconcile(_CounterTestCase):
+
+    def test_recomputes_drifted_rows(self):
+        from sqlalchemy import text
+        from app.services import dashboard_counters
+        with self.Session() as db:
+            self._add(db, "10.00")
+            db.commit()
+        self.assertEqual(dashboard_counters.reconcile(engine=self.engine), 0)
+
+        with self.engine.begin() as conn:
+            # written behind the app's back
+            conn.execute(text(
+                "INSERT INTO orders (tenant_id, table_id, status, total_amount, created_at) "
+                "VALUES (1, 1, 'PENDING', 6, CURRENT_TIMESTAMP)"
+            ))
+        self.assertEqual(dashboard_counters.reconcile(engine=self.engine), 1)
+        c = self._counters()
+        self.assertEqual((c["total_orders"], c["total_revenue"], c["pending"]), (2, Decimal("16.00"), 2))
+
+
+class TestDashboardStats(_CounterTestCase):
+
+    def test_reads_single_row(self):
+        from sqlalchemy import event
+        from app.api.dashboard import get_dashboard_stats
+        from app.models import OrderStatus
+        with self.Session() as db:
+            done = self._add(db, "40.00", created_at=datetime.utcnow() - timedelta(minutes=20))
+            self._add(db, "10.00", status=OrderStatus.PREPARING)
+            self._add(db, "5.00", status=OrderStatus.CANCELLED)
+            db.commit()
+            done.status = OrderStatus.COMPLETED
+            db.commit()
+
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        with self.Session() as db:
+            stats = get_dashboard_stats(db=db, tenant_id=1)
+
+        self.assertEqual((stats.total_orders, stats.total_revenue, stats.active_orders), (3, 55.0, 1))
+        self.assertEqual(stats.average_order_time, 20)
+        self.assertEqual(stats.status_counts["COMPLETED"], 1)
+        self.assertEqual(stats.orders_today, 3)
+        self.assertFalse(any("FROM orders" in s for s in statements))
+
+
+if __name__ == "__main__":
+    unittest.main()
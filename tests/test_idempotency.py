@@ -0,0 +1,180 @@
+"""
+Tests for idempotent order writes (app/services/idempotency.py).
+
+Coverage:
+  - create_order / add_items_to_order: a repeated Idempotency-Key returns the
+    stored response (with Idempotent-Replayed) and writes nothing new
+  - the same key with another body or endpoint → 422; without a key, unchanged
+  - a failed request leaves no claim, so the key can be retried
+  - expired keys start over; purge_expired sweeps them
+  - concurrent duplicates on separate connections create one order
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+
+class _IdempotencyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import sessionmaker
+        from app.core.database import Base
+        import app.models  # noqa: F401 — register every table
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        # a file, not :memory:, so concurrent requests really get their own connections
+        self.engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False, "timeout": 10})
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO tenants (id, name) VALUES (1, 'A')"))
+            conn.execute(text("INSERT INTO tables (id, tenant_id, number, capacity, status) VALUES (1, 1, 1, 4, 'AVAILABLE')"))
+            conn.execute(text("INSERT INTO categories (id, tenant_id, name, display_order) VALUES (1, 1, 'Rolls', 0)"))
+            conn.execute(text(
+                "INSERT INTO menu_items (id, tenant_id, name, price, category_id, is_available, display_order, "
+                "image_position_x, image_position_y, image_zoom, meal_period) "
+                "VALUES (1, 1, 'Salmon Roll', 8.50, 1, 1, 0, 50, 50, 1, 'BOTH')"
+            ))
+        self.Session = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def _create(self, key, quantity=1):
+        from fastapi import Response
+        from app.api.order import create_order
+        from app.schemas.order import OrderCreate
+        response = Response()
+        with self.Session() as db:
+            body = create_order(
+                OrderCreate(table_id=1, items=[{"menu_item_id": 1, "quantity": quantity}]),
+                response, db=db, tenant_id=1, idempotency_key=key,
+            )
+            if not isinstance(body, dict):
+                body = {"id": body.id}
+        return body, response.headers.get("Idempotent-Replayed")
+
+    def _add_items(self, order_id, key, menu_item_id=1):
+        from fastapi import Response
+        from app.api.order import OrderItemsCreate, add_items_to_order
+        response = Response()
+        with self.Session() as db:
+            body = add_items_to_order(
+                order_id, OrderItemsCreate(items=[{"menu_item_id": menu_item_id, "quantity": 2}]),
+                response, db=db, tenant_id=1, idempotency_key=key,
+            )
+        return body, response.headers.get("Idempotent-Replayed")
+
+    def _count(self, table):
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+class TestReplay(_IdempotencyTestCase):
+
+    def test_create_order_replays_first_response(self):
+        first, replayed = self._create("tablet-1-a")
+        self.assertIsNone(replayed)
+        self.assertEqual((first["total_amount"], len(first["items"])), ("8.50", 1))
+
+        again, replayed = self._create("tablet-1-a")
+        self.assertEqual(replayed, "true")
+        self.assertEqual(again, first)
+        self.assertEqual((self._count("orders"), self._count("order_items")), (1, 1))
+
+        self._create(None)
+        self._create(None)
+        self.assertEqual(self._count("orders"), 3)
+
+    def test_add_items_replays(self):
+        order, _ = self._create("o")
+        first, _ = self._add_items(order["id"], "round-2")
+        again, replayed = self._add_items(order["id"], "round-2")
+        self.assertEqual((replayed, again), ("true", first))
+        self.assertEqual(self._count("order_items"), 2)
+        self.assertEqual(Decimal(first["total_amount"]), Decimal("25.50"))
+
+    def test_key_reused_for_other_request(self):
+        from app.core.error_handling import IdempotencyKeyError
+        order, _ = self._create("k")
+        with self.assertRaises(IdempotencyKeyError) as raised:
+            self._create("k", quantity=2)
+        self.assertEqual(raised.exception.status_code, 422)
+        with self.assertRaises(IdempotencyKeyError):
+            self._add_items(order["id"], "k")
+        self.assertEqual(self._count("orders"), 1)
+
+    def test_failed_request_releases_key(self):
+        from app.core.error_handling import CustomException
+        order, _ = self._create("o")
+        with self.assertRaises(CustomException):
+            self._add_items(order["id"] + 1, "retry-me")   # no such order
+        self.assertEqual(self._count("idempotency_keys"), 1)
+        body, replayed = self._add_items(order["id"], "retry-me")
+        self.assertIsNone(replayed)
+        self.assertEqual(len(body["items"]), 2)
+
+
+class TestExpiry(_IdempotencyTestCase):
+
+    def test_expired_key_starts_over_and_is_purged(self):
+        from app.services import idempotency
+        self._create("old")
+        later = datetime.utcnow() + timedelta(days=2)
+        with patch.object(idempotency, "datetime") as clock:
+            clock.utcnow.return_value = later
+            body, replayed = self._create("old")
+            self.assertIsNone(replayed)
+            self.assertEqual((self._count("orders"), self._count("idempotency_keys")), (2, 1))
+            self._create("fresh")
+            clock.utcnow.return_value = later + timedelta(days=2)
+            self.assertEqual(idempotency.purge_expired(self.engine), 2)
+        self.assertEqual(self._count("idempotency_keys"), 0)
+
+
+class TestConcurrentDuplicates(_IdempotencyTestCase):
+
+    def test_one_order_for_simultaneous_retries(self):
+        from app.api import order as order_api
+        barrier = threading.Barrier(4)
+        original = order_api._calculate_order_total_amount
+
+        def slow_total(*args):
+            # hold the first transaction open while the duplicates arrive
+            try:
+                barrier.wait(timeout=0.5)
+            except threading.BrokenBarrierError:
+                pass
+            return original(*args)
+
+        results, errors = [], []
+
+        def submit():
+            try:
+                results.append(self._create("storm"))
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        with patch.object(order_api, "_calculate_order_total_amount", side_effect=slow_total):
+            threads = [threading.Thread(target=submit) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self._count("orders"), 1)
+        bodies = [body for body, _ in results]
+        self.assertTrue(all(body == bodies[0] for body in bodies))
+        self.assertEqual(sorted(r for _, r in results if r), ["true"] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
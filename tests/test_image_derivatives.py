@@ -0,0 +1,137 @@
+"""
+Tests for the image derivative pipeline.
+
+Coverage:
+  - crop_box: cover crop, object-position sliding, zoom around centre
+  - render_derivatives: bucket sizes, WebP/JPEG output, alpha flattening
+  - process_menu_item_image: variants stored + recorded, superseded uploads skipped
+"""
+
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+
+def _png_bytes(size=(800, 400), mode="RGB", color=(200, 30, 30)) -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestCropBox(unittest.TestCase):
+
+    def test_centered_cover_crop_of_wide_source(self):
+        from app.services.image_derivatives import crop_box
+        # 800x400 into a square: 400x400 window, centred horizontally
+        self.assertEqual(crop_box(800, 400, 100, 100), (200, 0, 600, 400))
+
+    def test_position_slides_window_like_object_position(self):
+        from app.services.image_derivatives import crop_box
+        self.assertEqual(crop_box(800, 400, 100, 100, position_x=0), (0, 0, 400, 400))
+        self.assertEqual(crop_box(800, 400, 100, 100, position_x=100), (400, 0, 800, 400))
+
+    def test_zoom_shrinks_window_around_centre(self):
+        from app.services.image_derivatives import crop_box
+        self.assertEqual(crop_box(800, 400, 100, 100, zoom=2.0), (300, 100, 500, 300))
+
+
+class TestRenderDerivatives(unittest.TestCase):
+
+    def test_bucket_sizes_and_formats(self):
+        from app.services.image_derivatives import render_derivatives
+        out = render_derivatives(_png_bytes((2400, 1600)))
+        self.assertEqual((out["thumb"]["width"], out["thumb"]["height"]), (160, 160))
+        self.assertEqual((out["card"]["width"], out["card"]["height"]), (480, 360))
+        self.assertEqual((out["full"]["width"], out["full"]["height"]), (1200, 800))
+        with Image.open(io.BytesIO(out["card"]["webp"])) as img:
+            self.assertEqual(img.format, "WEBP")
+        with Image.open(io.BytesIO(out["card"]["jpeg"])) as img:
+            self.assertEqual(img.format, "JPEG")
+
+    def test_full_size_never_upscaled(self):
+        from app.services.image_derivatives import render_derivatives
+        out = render_derivatives(_png_bytes((300, 200)))
+        self.assertEqual((out["full"]["width"], out["full"]["height"]), (300, 200))
+
+    def test_transparent_source_flattens_for_jpeg(self):
+        from app.services.image_derivatives import render_derivatives
+        out = render_derivatives(_png_bytes((400, 400), mode="RGBA", color=(0, 0, 0, 0)))
+        with Image.open(io.BytesIO(out["thumb"]["jpeg"])) as img:
+            self.assertEqual(img.mode, "RGB")
+            self.assertEqual(img.getpixel((80, 80)), (255, 255, 255))
+
+
+class TestProcessMenuItemImage(unittest.TestCase):
+
+    def setUp(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import StaticPool
+        from app.core import s3
+        from app.models.stored_image import StoredImage
+        from app.services import image_derivatives
+        self.root = tempfile.mkdtemp()
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        StoredImage.__table__.create(self.engine)
+        self._patches = [
+            patch.object(s3, "_index_engine", return_value=self.engine),
+            patch.object(s3.settings, "IMAGE_STORAGE_BACKEND", "local"),
+            patch.object(s3.settings, "LOCAL_UPLOADS_DIR", self.root),
+            patch.object(image_derivatives, "_get_pool", return_value=self.pool),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self.pool.shutdown()
+        self.engine.dispose()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _item(self, image_url):
+        return SimpleNamespace(
+            id=5, tenant_id=1, image_url=image_url, image_variants=None,
+            image_position_x=50.0, image_position_y=50.0, image_zoom=1.0,
+        )
+
+    def test_records_variant_urls(self):
+        from app.core.s3 import upload_image_stream
+        from app.services.image_derivatives import process_menu_item_image
+
+        url = upload_image_stream([_png_bytes()], "menu-images", 5, "a.png", "image/png")
+        item = self._item(url)
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = item
+
+        process_menu_item_image(db, 1, 5, url)
+
+        db.commit.assert_called_once()
+        self.assertEqual(set(item.image_variants), {"thumb", "card", "full"})
+        self.assertTrue(item.image_variants["card"]["webp"].startswith("/uploads/menu-images/derived/"))
+
+    def test_skips_when_image_was_replaced(self):
+        from app.services.image_derivatives import process_menu_item_image
+
+        item = self._item("/uploads/menu-images/newer.png")
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = item
+
+        with patch("app.core.s3.read_image") as read_image:
+            process_menu_item_image(db, 1, 5, "/uploads/menu-images/older.png")
+
+        read_image.assert_not_called()
+        db.commit.assert_not_called()
+        self.assertIsNone(item.image_variants)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+"""
+Tests for streaming image storage (app/core/s3.py + upload_limits).
+
+Coverage:
+  - iter_upload_chunks: chunking, 413 on oversize (known size and mid-stream)
+  - local backend: round trip, no partial file left after an aborted stream
+  - content-addressed dedup: identical bytes stored once, refcounted deletes
+  - S3 backend: single PUT below one part, multipart above, abort on failure,
+    nothing sent when the incoming stream fails
+  - bounded memory: streaming a large upload never buffers it whole
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+
+
+def _index_engine():
+    """In-memory SQLite stand-in for the stored_images index."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from app.models.stored_image import StoredImage
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    StoredImage.__table__.create(engine)
+    return engine
+
+
+def _upload(data: bytes, size: int | None = None) -> SimpleNamespace:
+    """Minimal stand-in for fastapi.UploadFile."""
+    return SimpleNamespace(file=io.BytesIO(data), size=size)
+
+
+class _LocalStorageTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from app.core import s3
+        self.root = tempfile.mkdtemp()
+        self.engine = _index_engine()
+        self._patches = [
+            patch.object(s3.settings, "IMAGE_STORAGE_BACKEND", "local"),
+            patch.object(s3.settings, "LOCAL_UPLOADS_DIR", self.root),
+            patch.object(s3, "_index_engine", return_value=self.engine),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self.engine.dispose()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _files(self) -> list[str]:
+        found = []
+        for dirpath, _, names in os.walk(self.root):
+            found.extend(os.path.join(dirpath, n) for n in names)
+        return found
+
+
+class TestIterUploadChunks(unittest.TestCase):
+
+    def test_yields_all_bytes_in_chunks(self):
+        from app.core.upload_limits import iter_upload_chunks
+        chunks = list(iter_upload_chunks(_upload(b"x" * 10), 100, "manager", chunk_size=4))
+        self.assertEqual([len(c) for c in chunks], [4, 4, 2])
+
+    def test_rejects_known_oversize_before_reading(self):
+        from app.core.upload_limits import iter_upload_chunks
+        upload = _upload(b"x" * 10, size=10)
+        with self.assertRaises(HTTPException) as ctx:
+            next(iter_upload_chunks(upload, 5, "customer"))
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertEqual(upload.file.tell(), 0)
+
+    def test_rejects_oversize_mid_stream(self):
+        from app.core.upload_limits import iter_upload_chunks
+        with self.assertRaises(HTTPException) as ctx:
+            list(iter_upload_chunks(_upload(b"x" * 10), 5, "customer", chunk_size=2))
+        self.assertEqual(ctx.exception.status_code, 413)
+
+
+class TestLocalBackend(_LocalStorageTestCase):
+
+    def test_round_trip_and_delete(self):
+        from app.core import s3
+        url = s3.upload_image_stream([b"abc", b"def"], "menu-images", 7, "photo.PNG", "image/png")
+        self.assertEqual(url, f"/uploads/menu-images/{hashlib.sha256(b'abcdef').hexdigest()}.png")
+        self.assertTrue(url.endswith(".png"))
+        path = os.path.join(self.root, url[len("/uploads/"):])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"abcdef")
+        s3.delete_image(url)
+        self.assertFalse(os.path.exists(path))
+
+    def test_oversize_stream_leaves_nothing_behind(self):
+        from app.core import s3
+        from app.core.upload_limits import iter_upload_chunks
+        chunks = iter_upload_chunks(_upload(b"x" * 100), 50, "customer", chunk_size=10)
+        with self.assertRaises(HTTPException):
+            s3.upload_image_stream(chunks, "user-images", 1, "a.jpg", "image/jpeg")
+        self.assertEqual(self._files(), [])
+
+    def test_delete_refuses_paths_outside_root(self):
+        from app.core import s3
+        outside = tempfile.NamedTemporaryFile(delete=False)
+        outside.close()
+        try:
+            s3.delete_image(f"/uploads/../{os.path.basename(outside.name)}")
+            s3.delete_image("/uploads/" + os.path.relpath(outside.name, self.root))
+            self.assertTrue(os.path.exists(outside.name))
+        finally:
+            os.remove(outside.name)
+
+    def test_streaming_memory_is_bounded(self):
+        from app.core import s3
+        from app.core.upload_limits import iter_upload_chunks
+        total = 4 * 1024 * 1024
+        upload = SimpleNamespace(file=tempfile.TemporaryFile(), size=None)
+        upload.file.write(b"\0" * total)
+        upload.file.flush()
+
+        tracemalloc.start()
+        try:
+            chunks = iter_upload_chunks(upload, total, "manager", chunk_size=64 * 1024)
+            s3.upload_image_stream(chunks, "menu-images", 1, "big.jpg", "image/jpeg")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            upload.file.close()
+        self.assertLess(peak, total // 4)
+
+
+class TestContentDedup(_LocalStorageTestCase):
+
+    def _ref_count(self, url):
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT ref_count FROM stored_images WHERE url = :u"), {"u": url}
+            ).scalar()
+
+    def test_identical_bytes_stored_once(self):
+        from app.core import s3
+        first = s3.upload_image_stream([b"same photo"], "menu-images", 1, "a.jpg", "image/jpeg")
+        with patch.object(s3, "_put_object") as put:
+            second = s3.upload_image_stream([b"same ", b"photo"], "menu-images", 2, "b.jpg", "image/jpeg")
+        put.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(len(self._files()), 1)
+        self.assertEqual(self._ref_count(first), 2)
+
+    def test_different_bytes_get_different_objects(self):
+        from app.core import s3
+        a = s3.upload_image_stream([b"one"], "menu-images", 1, "a.jpg", "image/jpeg")
+        b = s3.upload_image_stream([b"two"], "menu-images", 1, "a.jpg", "image/jpeg")
+        self.assertNotEqual(a, b)
+        self.assertEqual(len(self._files()), 2)
+
+    def test_object_removed_only_with_last_reference(self):
+        from app.core import s3
+        url = s3.upload_image_stream([b"shared"], "menu-images", 1, "a.jpg", "image/jpeg")
+        s3.upload_image_stream([b"shared"], "menu-images", 2, "a.jpg", "image/jpeg")
+        path = os.path.join(self.root, url[len("/uploads/"):])
+
+        s3.delete_image(url)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self._ref_count(url), 1)
+
+        s3.delete_image(url)
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(self._ref_count(url))
+
+    def test_reupload_after_full_delete_restores_object(self):
+        from app.core import s3
+        url = s3.upload_image_stream([b"again"], "menu-images", 1, "a.jpg", "image/jpeg")
+        s3.delete_image(url)
+        again = s3.upload_image_stream([b"again"], "menu-images", 1, "a.jpg", "image/jpeg")
+        self.assertEqual(url, again)
+        self.assertTrue(os.path.exists(os.path.join(self.root, url[len("/uploads/"):])))
+
+    def test_legacy_url_outside_index_deleted_directly(self):
+        from app.core import s3
+        legacy = os.path.join(self.root, "menu-images", "7_old.jpg")
+        os.makedirs(os.path.dirname(legacy))
+        open(legacy, "wb").close()
+        s3.delete_image("/uploads/menu-images/7_old.jpg")
+        self.assertFalse(os.path.exists(legacy))
+
+
+class TestS3Backend(unittest.TestCase):
+
+    def setUp(self):
+        from app.core import s3
+        self.client = MagicMock()
+        self.client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+        self.client.upload_part.side_effect = lambda **kw: {"ETag": f"etag-{kw['PartNumber']}"}
+        self.engine = _index_engine()
+        self._patches = [
+            patch.object(s3, "_index_engine", return_value=self.engine),
+            patch.object(s3.settings, "IMAGE_STORAGE_BACKEND", "s3"),
+            patch.object(s3.settings, "S3_MULTIPART_PART_BYTES", 5 * 1024 * 1024),
+            patch.object(s3, "_s3_client", return_value=self.client),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    def test_small_object_uses_single_put(self):
+        from app.core import s3
+        url = s3.upload_image_stream([b"a" * 1000], "menu-images", 3, "x.jpg", "image/jpeg")
+        self.assertTrue(url.startswith("https://"))
+        self.client.put_object.assert_called_once()
+        self.client.create_multipart_upload.assert_not_called()
+
+    def test_large_object_uses_multipart(self):
+        from app.core import s3
+        mib = 1024 * 1024
+        chunks = (b"a" * mib for _ in range(12))
+        s3.upload_image_stream(chunks, "menu-images", 3, "x.jpg", "image/jpeg")
+        self.client.put_object.assert_not_called()
+        self.assertEqual(self.client.upload_part.call_count, 3)  # 5 + 5 + 2 MiB
+        parts = self.client.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        self.assertEqual([p["PartNumber"] for p in parts], [1, 2, 3])
+
+    def test_failed_stream_never_reaches_s3(self):
+        from app.core import s3
+        mib = 1024 * 1024
+
+        def chunks():
+            for _ in range(6):
+                yield b"a" * mib
+            raise HTTPException(status_code=413)
+
+        with self.assertRaises(HTTPException):
+            s3.upload_image_stream(chunks(), "menu-images", 3, "x.jpg", "image/jpeg")
+        self.client.create_multipart_upload.assert_not_called()
+        self.client.put_object.assert_not_called()
+
+    def test_failed_part_aborts_multipart(self):
+        from app.core import s3
+        mib = 1024 * 1024
+        self.client.upload_part.side_effect = [{"ETag": "etag-1"}, RuntimeError("network")]
+        with self.assertRaises(RuntimeError):
+            s3.upload_image_stream((b"a" * mib for _ in range(12)), "menu-images", 3, "x.jpg", "image/jpeg")
+        self.client.abort_multipart_upload.assert_called_once()
+        self.client.complete_multipart_upload.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
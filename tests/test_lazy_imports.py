@@ -0,0 +1,92 @@
+"""
+Tests for lazy loading of heavy optional dependencies.
+
+Coverage:
+  - `import app.main` stays under an import-time budget (fresh interpreter)
+  - boto3 / openai / pgvector / numpy are not imported until first use
+  - lazy_imports helpers: memoisation, optional vs required behaviour
+  - the lazy pgvector column still compiles to VECTOR(1536) DDL
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for a cold CI container; override with APP_IMPORT_BUDGET_S.
+_IMPORT_BUDGET_S = float(os.getenv("APP_IMPORT_BUDGET_S", "5.0"))
+
+_HEAVY_MODULES = ("boto3", "botocore", "openai", "pgvector", "numpy")
+
+_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import app.main\n"
+    "elapsed = time.perf_counter() - started\n"
+    f"heavy = [m for m in {_HEAVY_MODULES!r} if m in sys.modules]\n"
+    "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+)
+
+
+class TestImportBudget(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Fresh interpreter so modules already imported by other tests don't hide the cost.
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            cwd=_PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        if proc.returncode != 0:
+            raise AssertionError(f"import app.main failed:\n{proc.stderr}")
+        cls.result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def test_import_app_main_within_budget(self):
+        self.assertLess(
+            self.result["elapsed"],
+            _IMPORT_BUDGET_S,
+            f"import app.main took {self.result['elapsed']:.2f}s (budget {_IMPORT_BUDGET_S:.2f}s)",
+        )
+
+    def test_heavy_dependencies_not_imported(self):
+        self.assertEqual(self.result["heavy"], [])
+
+
+class TestLazyImportHelpers(unittest.TestCase):
+
+    def test_require_module_memoises(self):
+        from app.core.lazy_imports import require_module
+        self.assertIs(require_module("json"), require_module("json"))
+
+    def test_require_module_raises_when_missing(self):
+        from app.core.lazy_imports import require_module
+        with self.assertRaises(ImportError):
+            require_module("definitely_not_a_real_package_xyz")
+
+    def test_optional_module_returns_none_when_missing(self):
+        from app.core.lazy_imports import is_loaded, optional_module
+        self.assertIsNone(optional_module("definitely_not_a_real_package_xyz", "tests"))
+        self.assertFalse(is_loaded("definitely_not_a_real_package_xyz"))
+
+
+class TestLazyVectorColumn(unittest.TestCase):
+
+    def test_vector_ddl_compiles(self):
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.schema import CreateTable
+        from app.models.embeddings import MenuItemEmbedding
+
+        ddl = str(CreateTable(MenuItemEmbedding.__table__).compile(dialect=postgresql.dialect()))
+        self.assertIn("embedding VECTOR(1536)", ddl)
+
+
+if __name__ == "__main__":
+    unittest.main()
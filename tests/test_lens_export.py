@@ -0,0 +1,142 @@
+"""
+Tests for the Lens data export.
+
+Coverage:
+  - CSV: header + rows, tenant/date scope, streamed in batch-sized chunks
+  - item filters: narrow orders via EXISTS, filter order_items rows
+  - Parquet / Arrow: round-trip with typed columns (decimal money, timestamps)
+  - export_to_file writes the same bytes as the stream
+"""
+
+import csv
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+
+def _fc(**extra):
+    from app.api.analytics import FilterConditions
+    params = {"tenant_id": 1, "start_dt": datetime(2026, 3, 1), "end_dt": datetime(2026, 3, 31, 23, 59, 59)}
+    item_parts = []
+    if "category_id" in extra:
+        item_parts.append("mi.category_id = :category_id")
+        params["category_id"] = extra["category_id"]
+    return FilterConditions(
+        # build_conditions' fragments minus the Postgres-only status cast
+        order_clause="o.tenant_id = :tenant_id AND o.created_at >= :start_dt AND o.created_at <= :end_dt",
+        item_clause="".join(f" AND {p}" for p in item_parts),
+        params=params,
+        needs_items_join=bool(item_parts),
+    )
+
+
+class _ExportCase(unittest.TestCase):
+
+    def setUp(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import StaticPool
+        from app.models import Category, MenuItem, Order, OrderItem, Table, Tenant
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (Tenant, Category, MenuItem, Table, Order, OrderItem):
+            model.__table__.create(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO tenants (id, name) VALUES (1, 'A'), (2, 'B')"))
+            # Core inserts so the models' Python-side defaults are applied
+            conn.execute(Category.__table__.insert(), [
+                {"id": 1, "tenant_id": 1, "name": "Nigiri"},
+                {"id": 2, "tenant_id": 1, "name": "Rolls"},
+            ])
+            conn.execute(MenuItem.__table__.insert(), [
+                {"id": 1, "tenant_id": 1, "category_id": 1, "name": "Salmon", "price": 6.5},
+                {"id": 2, "tenant_id": 1, "category_id": 2, "name": "Dragon Roll", "price": 14},
+            ])
+            conn.execute(text(
+                "INSERT INTO tables (id, tenant_id, number, capacity, status) VALUES (1, 1, 7, 4, 'AVAILABLE')"
+            ))
+            orders = [
+                # id, tenant, created_at, total
+                (1, 1, "2026-03-02 12:00:00", 13.0),
+                (2, 1, "2026-03-03 19:30:00", 14.0),
+                (3, 1, "2026-03-04 18:00:00", 20.5),
+                (4, 1, "2026-04-02 12:00:00", 99.0),   # outside the window
+                (5, 2, "2026-03-02 12:00:00", 50.0),   # other tenant
+            ]
+            for oid, tid, created, total in orders:
+                conn.execute(text(
+                    "INSERT INTO orders (id, tenant_id, table_id, status, total_amount, ayce_order, created_at, updated_at) "
+                    "VALUES (:id, :tid, 1, 'COMPLETED', :total, 0, :created, :created)"
+                ), {"id": oid, "tid": tid, "total": total, "created": created})
+            conn.execute(text(
+                "INSERT INTO order_items (id, order_id, menu_item_id, quantity, unit_price) VALUES "
+                "(1, 1, 1, 2, 6.5), (2, 2, 2, 1, 14), (3, 3, 1, 1, 6.5), (4, 3, 2, 1, 14), (5, 4, 1, 1, 6.5)"
+            ))
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _csv(self, table, fc, batch_rows=100):
+        from app.services.lens_export import iter_export
+        chunks = list(iter_export(self.engine, table, fc, "csv", batch_rows))
+        return chunks, list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+
+
+class TestCsvExport(_ExportCase):
+
+    def test_orders_scoped_to_tenant_and_window(self):
+        from app.services.lens_export import columns
+        chunks, rows = self._csv("orders", _fc())
+        self.assertEqual(list(rows[0]), columns("orders"))
+        self.assertEqual([r["order_id"] for r in rows], ["1", "2", "3"])
+        self.assertEqual(rows[0]["table_number"], "7")
+        self.assertEqual(rows[2]["total_amount"], "20.5")
+
+    def test_streams_one_chunk_per_batch(self):
+        chunks, rows = self._csv("orders", _fc(), batch_rows=1)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len(chunks), 3)
+
+    def test_item_filter_narrows_orders_and_lines(self):
+        _, orders = self._csv("orders", _fc(category_id=2))
+        self.assertEqual([r["order_id"] for r in orders], ["2", "3"])
+        _, lines = self._csv("order_items", _fc(category_id=2))
+        self.assertEqual([(r["order_item_id"], r["item_name"], r["category_name"]) for r in lines],
+                         [("2", "Dragon Roll", "Rolls"), ("4", "Dragon Roll", "Rolls")])
+
+
+class TestColumnarExport(_ExportCase):
+
+    def setUp(self):
+        from app.services.lens_export import pyarrow_available
+        if not pyarrow_available():
+            self.skipTest("pyarrow not installed")
+        super().setUp()
+
+    def test_parquet_round_trip(self):
+        import pyarrow.parquet as pq
+        from app.services.lens_export import iter_export
+        data = b"".join(iter_export(self.engine, "order_items", _fc(), "parquet", batch_rows=2))
+        table = pq.read_table(io.BytesIO(data))
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(pq.ParquetFile(io.BytesIO(data)).num_row_groups, 2)
+        self.assertEqual(table.column("line_total").to_pylist(), [Decimal("13.00"), Decimal("14.00"), Decimal("6.50"), Decimal("14.00")])
+        self.assertEqual(table.column("order_created_at")[0].as_py(), datetime(2026, 3, 2, 12, 0))
+
+    def test_arrow_stream_and_file_export_match(self):
+        import pyarrow as pa
+        from app.services.lens_export import export_to_file, iter_export
+        data = b"".join(iter_export(self.engine, "orders", _fc(), "arrow"))
+        table = pa.ipc.open_stream(data).read_all()
+        self.assertEqual(table.column("order_id").to_pylist(), [1, 2, 3])
+        self.assertEqual(table.column("ayce_order").to_pylist(), [False, False, False])
+
+        path = os.path.join(tempfile.mkdtemp(), "orders.arrows")
+        self.assertEqual(export_to_file(self.engine, "orders", _fc(), "arrow", path), len(data))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
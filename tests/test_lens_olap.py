@@ -0,0 +1,160 @@
+"""
+Tests for the Lens columnar snapshot (DuckDB).
+
+Coverage:
+  - full refresh mirrors the Lens tables; summary / drill / grouped SQL runs
+    unchanged on the snapshot and never touches the request session
+  - incremental refresh: changed orders upserted, their lines replaced,
+    deleted orders dropped, snapshot file swapped under an open reader
+  - fallback to the database when disabled, stale, or the query fails
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+
+def _fc(**filters):
+    from app.api.analytics import AnalyticsFilter, build_conditions
+    return build_conditions(AnalyticsFilter(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31), **filters), 1)
+
+
+class _SnapshotCase(unittest.TestCase):
+
+    def setUp(self):
+        from app.services import lens_olap
+        if not lens_olap.available():
+            self.skipTest("duckdb not installed")
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import StaticPool
+        from app.models import Category, MenuItem, Order, OrderItem, Table, Tenant
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (Tenant, Category, MenuItem, Table, Order, OrderItem):
+            model.__table__.create(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO tenants (id, name) VALUES (1, 'A'), (2, 'B')"))
+            conn.execute(Category.__table__.insert(), [
+                {"id": 1, "tenant_id": 1, "name": "Nigiri"},
+                {"id": 2, "tenant_id": 1, "name": "Rolls"},
+            ])
+            conn.execute(MenuItem.__table__.insert(), [
+                {"id": 1, "tenant_id": 1, "category_id": 1, "name": "Salmon", "price": 6.5},
+                {"id": 2, "tenant_id": 1, "category_id": 2, "name": "Dragon Roll", "price": 14},
+            ])
+            conn.execute(text(
+                "INSERT INTO tables (id, tenant_id, number, capacity, status) VALUES (1, 1, 7, 4, 'AVAILABLE')"
+            ))
+            for oid, tid, created, total in [
+                (1, 1, "2026-03-02 12:00:00", 13.0),
+                (2, 1, "2026-03-03 19:30:00", 14.0),
+                (3, 1, "2026-03-04 18:00:00", 20.5),
+                (4, 1, "2026-04-02 12:00:00", 99.0),   # outside the window
+                (5, 2, "2026-03-02 12:00:00", 50.0),   # other tenant
+            ]:
+                conn.execute(text(
+                    "INSERT INTO orders (id, tenant_id, table_id, status, total_amount, ayce_order, created_at, updated_at) "
+                    "VALUES (:id, :tid, 1, 'COMPLETED', :total, 0, :created, :created)"
+                ), {"id": oid, "tid": tid, "total": total, "created": created})
+            conn.execute(text(
+                "INSERT INTO order_items (id, order_id, menu_item_id, quantity, unit_price, created_at) VALUES "
+                "(1, 1, 1, 2, 6.5, '2026-03-02'), (2, 2, 2, 1, 14, '2026-03-03'), (3, 3, 1, 1, 6.5, '2026-03-04'), "
+                "(4, 3, 2, 1, 14, '2026-03-04'), (5, 4, 1, 1, 6.5, '2026-04-02')"
+            ))
+
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "lens.duckdb")
+        self.settings = patch.multiple(
+            "app.services.lens_olap.settings", LENS_OLAP_ENABLED=True, LENS_OLAP_PATH=self.path,
+        )
+        self.settings.start()
+        lens_olap.reset()
+        lens_olap.refresh(self.engine, full=True)
+        self.db = MagicMock()  # any Postgres fallback shows up as db.execute calls
+
+    def tearDown(self):
+        from app.services import lens_olap
+        self.settings.stop()
+        lens_olap.reset()
+        self.engine.dispose()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class TestSnapshotQueries(_SnapshotCase):
+
+    def test_summary_in_one_statement(self):
+        from app.api.analytics import _summary_and_groups
+        totals, groups = _summary_and_groups(self.db, "day", _fc())
+        self.assertEqual((totals.order_count, totals.total_revenue), (3, 47.5))
+        self.assertEqual([(g.group_key, g.total_revenue) for g in groups],
+                         [("2026-03-02", 13.0), ("2026-03-03", 14.0), ("2026-03-04", 20.5)])
+        self.db.execute.assert_not_called()
+
+    def test_drill_dimensions(self):
+        from app.api.analytics import _drill_query
+        rows, total = _drill_query(self.db, "category", "revenue", _fc())
+        self.assertEqual([(r.label, r.value, r.metadata) for r in rows],
+                         [("Rolls", 28.0, {"category_id": 2}), ("Nigiri", 19.5, {"category_id": 1})])
+        self.assertEqual(total, 47.5)
+        rows, _ = _drill_query(self.db, "table", "order_count", _fc())
+        self.assertEqual([(r.label, r.value) for r in rows], [("Table 7", 3.0)])
+        rows, _ = _drill_query(self.db, "day_of_week", "revenue", _fc())
+        self.assertEqual([r.label for r in rows], ["Mon", "Tue", "Wed"])
+        self.db.execute.assert_not_called()
+
+    def test_grouped_summary_with_item_filter(self):
+        from app.api.analytics import _grouped_summary
+        groups = _grouped_summary(self.db, "day", _fc(category_id=2))
+        self.assertEqual([(g.group_key, g.total_revenue) for g in groups], [("2026-03-03", 14.0), ("2026-03-04", 14.0)])
+        self.db.execute.assert_not_called()
+
+
+class TestIncrementalRefresh(_SnapshotCase):
+
+    def test_changes_and_deletes_are_applied(self):
+        from sqlalchemy import text
+        from app.api.analytics import _drill_query, _summary_totals
+        from app.services import lens_olap
+        self.assertEqual(_summary_totals(self.db, _fc()).order_count, 3)  # reader open on the old file
+
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            conn.execute(text("UPDATE orders SET total_amount = 27.5, updated_at = :now WHERE id = 1"), {"now": now})
+            conn.execute(text("UPDATE order_items SET quantity = 1 WHERE id = 1"))
+            conn.execute(text(
+                "INSERT INTO order_items (id, order_id, menu_item_id, quantity, unit_price) VALUES (6, 1, 2, 1, 14)"
+            ))
+            conn.execute(text("DELETE FROM order_items WHERE order_id = 3"))
+            conn.execute(text("DELETE FROM orders WHERE id = 3"))
+
+        counts = lens_olap.refresh(self.engine)
+        self.assertEqual((counts["orders"], counts["orders_deleted"]), (1, 1))
+
+        totals = _summary_totals(self.db, _fc())
+        self.assertEqual((totals.order_count, totals.total_revenue), (2, 41.5))
+        rows, _ = _drill_query(self.db, "category", "revenue", _fc())
+        self.assertEqual([(r.label, r.value) for r in rows], [("Rolls", 28.0), ("Nigiri", 6.5)])
+        self.db.execute.assert_not_called()
+
+
+class TestFallback(_SnapshotCase):
+
+    def test_disabled_or_stale_snapshot_uses_database(self):
+        from app.services import lens_olap
+        with patch.object(lens_olap.settings, "LENS_OLAP_ENABLED", False):
+            self.assertIsNone(lens_olap.execute("SELECT 1", {}))
+        with patch.object(lens_olap.settings, "LENS_OLAP_MAX_AGE_S", -1):
+            self.assertIsNone(lens_olap.execute("SELECT 1", {}))
+        self.assertEqual(lens_olap.execute("SELECT :x + 1 AS y", {"x": 1}).fetchone().y, 2)
+
+    def test_failed_query_falls_back(self):
+        from app.api.analytics import _execute
+        with self.assertLogs("app.services.lens_olap", "ERROR"):
+            _execute(self.db, "SELECT * FROM no_such_table", {})
+        self.db.execute.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for the dinner-rush load harness (scripts/load_dinner_rush.py).
+
+Coverage:
+  - percentile / summarize: interpolated p50/p95/p99, per-endpoint rps and
+    error rate over the measured window only, pool-wait stats
+  - instrument_pool + PoolWaitMiddleware: time blocked on a full pool is
+    attributed to the request and returned in X-Pool-Wait-Ms
+  - Tablet.party: browse → order → rounds → kitchen → bill, against a fake client;
+    every order write sends its own Idempotency-Key
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+
+class TestSummaries(unittest.TestCase):
+
+    def test_percentile(self):
+        from load_dinner_rush import percentile
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize_window_and_errors(self):
+        from load_dinner_rush import Sample, summarize
+        samples = [Sample("POST /orders/", 0.5, 5.0, False, None)]  # warm-up: excluded
+        samples += [Sample("POST /orders/", 1 + i / 10, 0.010 * (i + 1), i != 3, 2.0) for i in range(10)]
+        samples += [Sample("GET /menu/categories/", 2.0, 0.004, True, None)]
+        report = summarize(samples, since=1.0, until=6.0)
+
+        orders = report["endpoints"]["POST /orders/"]
+        self.assertEqual((orders["requests"], orders["rps"], orders["errors"]), (10, 2.0, 1))
+        self.assertEqual(orders["error_rate"], 0.1)
+        self.assertEqual(orders["p50_ms"], 55.0)
+        self.assertEqual((orders["pool_wait_mean_ms"], orders["pool_wait_max_ms"]), (2.0, 2.0))
+        self.assertIsNone(report["endpoints"]["GET /menu/categories/"]["pool_wait_mean_ms"])
+        self.assertEqual(report["overall"]["requests"], 11)
+
+
+class TestPoolWait(unittest.TestCase):
+
+    def test_blocked_checkout_reported_in_header(self):
+        import asyncio
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import QueuePool
+        from load_dinner_rush import POOL_WAIT_HEADER, PoolWaitMiddleware, instrument_pool
+        engine = create_engine(
+            "sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0,
+            connect_args={"check_same_thread": False},
+        )
+        instrument_pool(engine)
+        held = engine.connect()
+
+        def release():
+            time.sleep(0.2)
+            held.close()
+
+        async def endpoint(scope, receive, send):
+            # sync DB work, as FastAPI runs it, in a worker thread with the request's context
+            await asyncio.to_thread(lambda: engine.connect().execute(text("SELECT 1")).close())
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        threading.Thread(target=release).start()
+        asyncio.run(PoolWaitMiddleware(endpoint)({"type": "http"}, None, send))
+        engine.dispose()
+
+        headers = dict(sent[0]["headers"])
+        self.assertGreaterEqual(float(headers[POOL_WAIT_HEADER.encode()]), 150)
+
+
+class _FakeResponse:
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.headers = {"x-pool-wait-ms": "0.5"}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _FakeClient:
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, path, **kwargs):
+        self.calls.append((method, path, kwargs))
+        if path.endswith("/categories/"):
+            return _FakeResponse(200, [{"id": 1}, {"id": 2}])
+        if path.endswith("/menu-items/"):
+            return _FakeResponse(200, [{"id": 10 * kwargs["params"]["category_id"], "is_available": True}])
+        if method == "POST" and path.endswith("/orders/"):
+            return _FakeResponse(200, {"id": 77})
+        return _FakeResponse(200, {})
+
+
+class TestTablet(unittest.TestCase):
+
+    def test_party_flow(self):
+        import random
+        from load_dinner_rush import Recorder, Tablet
+        client, recorder = _FakeClient(), Recorder()
+        tablet = Tablet(client, recorder, random.Random(3), table_id=5, think_s=0, stop=threading.Event())
+        tablet.party()
+
+        endpoints = [s.endpoint for s in recorder.samples]
+        self.assertEqual(endpoints[0], "GET /menu/categories/")
+        self.assertIn("POST /orders/{id}/items", endpoints)
+        self.assertEqual(endpoints[-2:], ["GET /orders/{id}/total", "PUT /orders/{id}/status"])
+        create = next(c for c in client.calls if c[0] == "POST" and c[1] == "/api/v1/orders/")
+        self.assertEqual(create[2]["json"]["table_id"], 5)
+        keys = [c[2]["headers"]["Idempotency-Key"] for c in client.calls if c[0] == "POST"]
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertTrue({i["menu_item_id"] for i in create[2]["json"]["items"]} <= {10, 20})
+        statuses = [c[2]["params"]["status"] for c in client.calls if c[0] == "PUT"]
+        self.assertEqual(statuses, ["READY", "DELIVERED", "COMPLETED"])
+        self.assertEqual(tablet.parties, 1)
+        self.assertTrue(all(s.ok and s.pool_wait_ms == 0.5 for s in recorder.samples))
+
+
+if __name__ == "__main__":
+    unittest.main()
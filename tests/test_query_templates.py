@@ -0,0 +1,108 @@
+"""
+Tests for app.core.query_templates.
+
+Coverage:
+  - compile_template: :name binds → $n in first-seen order, repeats reuse
+    their number, ::type casts untouched, stable statement names
+  - execute on Postgres: PREPARE once per pooled connection, EXECUTE with
+    positional values every time; a fresh connection prepares again
+  - execute elsewhere (SQLite) or with ANALYTICS_PREPARED_STATEMENTS off:
+    plain text() statement
+  - Lens SQL builders are cached per (dimension, metric, filter shape)
+"""
+
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+
+def _pg_conn():
+    conn = MagicMock()
+    conn.dialect.name = "postgresql"
+    conn.info = {}
+    return conn
+
+
+class TestCompileTemplate(unittest.TestCase):
+
+    def test_positional_binds(self):
+        from app.core.query_templates import compile_template
+        t = compile_template(
+            "SELECT o.status::text FROM orders o "
+            "WHERE o.tenant_id = :tenant_id AND o.created_at >= :start_dt AND o.tenant_id = :tenant_id"
+        )
+        self.assertEqual(t.param_names, ("tenant_id", "start_dt"))
+        self.assertEqual(
+            t.positional_sql,
+            "SELECT o.status::text FROM orders o WHERE o.tenant_id = $1 AND o.created_at >= $2 AND o.tenant_id = $1",
+        )
+
+    def test_name_is_stable_per_sql(self):
+        from app.core.query_templates import compile_template
+        a = compile_template("SELECT :x")
+        self.assertIs(a, compile_template("SELECT :x"))
+        self.assertTrue(a.name.startswith("q_"))
+        self.assertNotEqual(a.name, compile_template("SELECT :y").name)
+
+
+class TestExecute(unittest.TestCase):
+
+    SQL = "SELECT COUNT(*) FROM orders o WHERE o.tenant_id = :tenant_id AND o.created_at >= :start_dt"
+
+    def test_prepares_once_per_connection(self):
+        from app.core import query_templates
+        conn = _pg_conn()
+        with patch.object(query_templates.settings, "ANALYTICS_PREPARED_STATEMENTS", True):
+            for tenant in (1, 2):
+                query_templates.execute(conn, self.SQL, {"tenant_id": tenant, "start_dt": date(2026, 3, 1), "extra": 0})
+
+        name = query_templates.compile_template(self.SQL).name
+        calls = [c.args for c in conn.exec_driver_sql.call_args_list]
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0], (f"PREPARE {name} AS SELECT COUNT(*) FROM orders o "
+                                    "WHERE o.tenant_id = $1 AND o.created_at >= $2",))
+        self.assertEqual(calls[1], (f"EXECUTE {name}(%s, %s)", (1, date(2026, 3, 1))))
+        self.assertEqual(calls[2], (f"EXECUTE {name}(%s, %s)", (2, date(2026, 3, 1))))
+        conn.execute.assert_not_called()
+
+        fresh = _pg_conn()
+        with patch.object(query_templates.settings, "ANALYTICS_PREPARED_STATEMENTS", True):
+            query_templates.execute(fresh, self.SQL, {"tenant_id": 1, "start_dt": date(2026, 3, 1)})
+        self.assertTrue(fresh.exec_driver_sql.call_args_list[0].args[0].startswith("PREPARE"))
+
+    def test_disabled_setting_sends_plain_text(self):
+        from app.core import query_templates
+        conn = _pg_conn()
+        with patch.object(query_templates.settings, "ANALYTICS_PREPARED_STATEMENTS", False):
+            query_templates.execute(conn, self.SQL, {"tenant_id": 1, "start_dt": date(2026, 3, 1)})
+        conn.exec_driver_sql.assert_not_called()
+        conn.execute.assert_called_once()
+
+    def test_sqlite_session_runs_text(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from app.core.query_templates import execute
+        engine = create_engine("sqlite://")
+        with Session(bind=engine) as db:
+            self.assertEqual(execute(db, "SELECT :a + :b, :a", {"a": 2, "b": 3}).fetchone(), (5, 2))
+        engine.dispose()
+
+
+class TestBuilderCache(unittest.TestCase):
+
+    def test_same_shape_reuses_sql(self):
+        from app.api.analytics import AnalyticsFilter, _drill_sql, build_conditions
+        march = build_conditions(AnalyticsFilter(start_date=date(2026, 3, 1), end_date=date(2026, 3, 31)), 1)
+        april = build_conditions(AnalyticsFilter(start_date=date(2026, 4, 1), end_date=date(2026, 4, 30)), 2)
+        self.assertEqual(march.shape, april.shape)
+
+        before = _drill_sql.cache_info().hits
+        self.assertIs(_drill_sql("category", "revenue", march.shape), _drill_sql("category", "revenue", april.shape))
+        self.assertGreater(_drill_sql.cache_info().hits, before)
+
+        items = build_conditions(AnalyticsFilter(start_date=date(2026, 3, 1), category_id=3), 1)
+        self.assertNotEqual(items.shape, march.shape)
+
+
+if __name__ == "__main__":
+    unittest.main()
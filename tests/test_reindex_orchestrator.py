@@ -0,0 +1,74 @@
+"""
+Tests for the reindex_embeddings orchestrator (scripts/reindex_embeddings.py).
+
+Coverage:
+  - a run where every tenant succeeds deletes its checkpoint, so the next
+    routine run processes every tenant again
+  - a run with a failed tenant keeps the checkpoint; the re-run resumes with
+    only that tenant, then cleans up
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+
+class _InlinePool(ThreadPoolExecutor):
+    """ProcessPoolExecutor stand-in: same call, threads, no budget initializer."""
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=max_workers)
+
+
+class TestCheckpointLifecycle(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.args = Namespace(
+            checkpoint=os.path.join(self.dir.name, "checkpoint.json"), fresh=False, dry_run=False,
+            full_rebuild=False, workers=2, rpm=0, tpm=0, price_per_1m=0.02,
+        )
+        self.processed = []
+        self.failing = set()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _process(self, tenant_id, full_rebuild, estimate_only):
+        self.processed.append(tenant_id)
+        failed = 1 if tenant_id in self.failing else 0
+        return {"total": 3, "skipped": 0, "upserted": 3 - failed, "failed": failed, "seconds": 0.0}
+
+    def _run(self, tenant_ids):
+        import reindex_embeddings
+        self.processed.clear()
+        with patch.object(reindex_embeddings, "ProcessPoolExecutor", _InlinePool), \
+                patch.object(reindex_embeddings, "_process_tenant", side_effect=self._process), \
+                patch("builtins.print"):
+            reindex_embeddings.orchestrate(tenant_ids, self.args)
+        return sorted(self.processed)
+
+    def test_complete_run_does_not_suppress_the_next(self):
+        self.assertEqual(self._run([1, 2, 3]), [1, 2, 3])
+        self.assertFalse(os.path.exists(self.args.checkpoint))
+        self.assertEqual(self._run([1, 2, 3]), [1, 2, 3])
+
+    def test_failed_tenant_resumes_then_cleans_up(self):
+        self.failing = {2}
+        self.assertEqual(self._run([1, 2, 3]), [1, 2, 3])
+        self.assertTrue(os.path.exists(self.args.checkpoint))
+
+        self.failing = set()
+        self.assertEqual(self._run([1, 2, 3]), [2])
+        self.assertFalse(os.path.exists(self.args.checkpoint))
+        self.assertEqual(self._run([1, 2, 3]), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ Coverage:
   - upsert_menu_item_embeddings: hash-gated skipping; upsert behaviour
   - hybrid_search: tenant isolation; fallback to keyword-only
   - hybrid score combination maths
+  - EmbeddingRateBudget: slot spacing by requests and tokens; embed_texts draws from it
 """
 
 import hashlib
@@ -305,5 +306,41 @@ class TestTenantIsolation(unittest.TestCase):
         self.assertIsNone(result["model"])
 
 
+class TestEmbeddingRateBudget(unittest.TestCase):
+
+    def _run(self, budget, token_counts, now=1000.0):
+        waits = []
+        with patch("app.services.embedding_service.time") as mock_time:
+            mock_time.time.return_value = now
+            for tokens in token_counts:
+                waits.append(round(budget.acquire(tokens), 6))
+        return waits
+
+    def test_request_budget_spaces_calls(self):
+        from app.services.embedding_service import EmbeddingRateBudget
+        budget = EmbeddingRateBudget(requests_per_min=60, tokens_per_min=0)
+        self.assertEqual(self._run(budget, [10, 10, 10]), [0.0, 1.0, 2.0])
+
+    def test_token_budget_spaces_by_batch_size(self):
+        from app.services.embedding_service import EmbeddingRateBudget
+        budget = EmbeddingRateBudget(requests_per_min=0, tokens_per_min=600)
+        # 300 tokens at 10 tokens/s → next call waits 30s
+        self.assertEqual(self._run(budget, [300, 10]), [0.0, 30.0])
+
+    def test_embed_texts_acquires_before_each_call(self):
+        from app.services import embedding_service
+
+        budget = MagicMock()
+        client = MagicMock()
+        client.embeddings.create.return_value = SimpleNamespace(data=[SimpleNamespace(embedding=[0.1])])
+        embedding_service.set_rate_budget(budget)
+        try:
+            with patch.object(embedding_service, "_get_openai_client", return_value=client):
+                embedding_service.embed_texts(["x" * 40])
+        finally:
+            embedding_service.set_rate_budget(None)
+        budget.acquire.assert_called_once_with(10)
+
+
 if __name__ == "__main__":
     unittest.main()
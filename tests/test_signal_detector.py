@@ -0,0 +1,131 @@
+"""
+Tests for the vectorized Lens signal detector.
+
+Coverage:
+  - build_cube: day alignment, missing days stay NaN
+  - detect: spike flagged by rolling + robust baselines; history days not reported
+  - seasonal baseline: a regular weekend rush is not flagged by same-weekday
+  - missing days / short history never flag
+  - batch: tenants in one cube score independently
+  - loops benchmark reference agrees with detect
+  - _window_zscore_signals: legacy /signals output unchanged
+"""
+
+import unittest
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+START = date(2026, 1, 5)  # a Monday
+
+
+def _rows(orders_by_day: list, aov: float = 30.0, start: date = START) -> list:
+    rows = []
+    for d, orders in enumerate(orders_by_day):
+        if orders is None:
+            continue
+        rows.append(SimpleNamespace(
+            group_key=(start + timedelta(days=d)).isoformat(),
+            order_count=orders,
+            total_revenue=orders * aov,
+            avg_order_value=aov,
+        ))
+    return rows
+
+
+def _steady(days: int, spike_day: int | None = None) -> list:
+    # small deterministic wobble so spreads are non-zero
+    orders = [50 + (d * 7) % 5 for d in range(days)]
+    if spike_day is not None:
+        orders[spike_day] = 150
+    return orders
+
+
+class TestBuildCube(unittest.TestCase):
+
+    def test_days_aligned_and_missing_days_nan(self):
+        import numpy as np
+        from app.services.signal_detector import METRICS, build_cube
+        cube = build_cube([_rows([10, None, 12])], START, 4)
+        self.assertEqual(cube.shape, (1, len(METRICS), 4))
+        self.assertEqual(cube[0, METRICS.index("order_count"), 0], 10)
+        self.assertTrue(np.isnan(cube[0, :, 1]).all())
+        self.assertTrue(np.isnan(cube[0, :, 3]).all())
+
+
+class TestDetect(unittest.TestCase):
+
+    def test_spike_flagged_by_trailing_baselines(self):
+        from app.services.signal_detector import build_cube, detect
+        cube = build_cube([_rows(_steady(40, spike_day=35))], START, 40)
+        found = detect(cube, [1], START, windows=(7, 14), seasonal_weeks=4, report_from=28)[1]
+        counts = [s for s in found if s.metric == "order_count"]
+        spike = counts[0]
+        self.assertEqual(spike.date, START + timedelta(days=35))
+        self.assertGreater(spike.z_score, 3)
+        self.assertIn("rolling_7d", spike.confirmed_by)
+        self.assertIn("robust_14d", spike.confirmed_by)
+        self.assertIn("seasonal_4w", spike.confirmed_by)
+
+    def test_days_before_report_from_are_history_only(self):
+        from app.services.signal_detector import build_cube, detect
+        cube = build_cube([_rows(_steady(40, spike_day=20))], START, 40)
+        self.assertEqual(detect(cube, [1], START, report_from=28)[1], [])
+
+    def test_weekend_rush_is_not_seasonal_anomaly(self):
+        import numpy as np
+        from app.services.signal_detector import METRICS, build_cube, score_cube
+        orders = [120 + d % 3 if (START + timedelta(days=d)).weekday() == 5 else 50 + d % 4 for d in range(42)]
+        cube = build_cube([_rows(orders)], START, 42)
+        scores = score_cube(cube, windows=(14,), seasonal_weeks=4)
+        m = METRICS.index("order_count")
+        saturday = 40  # sixth Saturday
+        self.assertGreater(abs(scores["rolling_14d"][1][0, m, saturday]), 2)
+        self.assertLess(abs(scores["seasonal_4w"][1][0, m, saturday]), 2)
+        self.assertTrue(np.isnan(scores["seasonal_4w"][1][0, m, 12]))  # < 3 prior Saturdays
+
+    def test_missing_days_and_flat_history_never_flag(self):
+        from app.services.signal_detector import build_cube, detect
+        orders = [None if d % 2 else 40 for d in range(30)]
+        cube = build_cube([_rows(orders)], START, 30)
+        self.assertEqual(detect(cube, [1], START)[1], [])
+
+    def test_batch_matches_single_tenant_runs(self):
+        from app.services.signal_detector import build_cube, detect
+        daily = [_rows(_steady(40, spike_day=33)), _rows(_steady(40)), _rows(_steady(40, spike_day=38), aov=25.0)]
+        batch = detect(build_cube(daily, START, 40), [7, 8, 9], START, report_from=28)
+        for tid, rows in zip([7, 8, 9], daily):
+            single = detect(build_cube([rows], START, 40), [tid], START, report_from=28)[tid]
+            self.assertEqual(batch[tid], single)
+        self.assertEqual(batch[8], [])
+
+    def test_loops_reference_agrees(self):
+        import os
+        import sys
+        from app.services.signal_detector import build_cube, detect
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+        from bench_signals import loops_detect
+        orders = _steady(45, spike_day=40)
+        orders[31] = None
+        orders[36] = 20
+        rows = _rows(orders)
+        found = detect(build_cube([rows], START, 45), [1], START, report_from=28)[1]
+        self.assertEqual(loops_detect(rows, START, 45, (7, 14, 28), 4, 28), len(found))
+
+
+class TestLegacySignals(unittest.TestCase):
+
+    def test_window_zscore_output_unchanged(self):
+        from app.api.analytics import _window_zscore_signals
+        orders = [50, 52, 49, 51, 50, 48, 52, 51, 50, 49, 51, 50, 140, 50]
+        signals = _window_zscore_signals(_rows(orders), 14)
+        self.assertEqual(len(signals), 2)  # order count + revenue; AOV is flat
+        top = signals[0]
+        self.assertEqual(top.date, (START + timedelta(days=12)).isoformat())
+        self.assertEqual(top.severity, "high")
+        self.assertEqual(top.direction, "increase")
+        self.assertTrue(top.message.endswith("above 14-day average"))
+        self.assertIsNone(top.method)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Tests for the synthetic dataset generator and the endpoint benchmark suite.
+
+Coverage:
+  - generate: same seed → same data; ids continue after existing rows;
+    dinner/lunch split, AYCE share and pricing, regular totals = sum of
+    lines, completion_time on completed orders; dashboard counters reconciled
+  - daily_volumes: sums to the requested orders, Saturday busiest, Monday quietest
+  - call_endpoint: Query() defaults filled, dependencies required
+  - run_case / compare: timings and statement counts per case; slower or
+    chattier results flagged against a baseline
+"""
+
+import os
+import sys
+import unittest
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+
+def _engine():
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from app.core.database import Base
+    import app.models  # noqa: F401 — register every table
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _spec(**kwargs):
+    from generate_synthetic_data import SyntheticSpec
+    args = dict(tenants=1, orders=3000, days=28, tables=6, end=date(2026, 3, 29), seed=7)
+    args.update(kwargs)
+    return SyntheticSpec(**args)
+
+
+class TestGenerator(unittest.TestCase):
+
+    def setUp(self):
+        from generate_synthetic_data import generate
+        self.engine = _engine()
+        self.result = generate(self.engine, _spec(), batch_orders=500)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _scalar(self, sql):
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            return conn.execute(text(sql)).scalar()
+
+    def test_counts_and_distributions(self):
+        self.assertEqual(self.result["orders"], 3000)
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM order_items"), self.result["order_items"])
+        dinner = self._scalar("SELECT COUNT(*) FROM orders WHERE CAST(strftime('%H', created_at) AS INT) >= 16")
+        self.assertTrue(0.6 < dinner / 3000 < 0.78)
+        lunch_ayce = self._scalar(
+            "SELECT AVG(ayce_order) FROM orders WHERE CAST(strftime('%H', created_at) AS INT) < 16")
+        dinner_ayce = self._scalar(
+            "SELECT AVG(ayce_order) FROM orders WHERE CAST(strftime('%H', created_at) AS INT) >= 16")
+        self.assertLess(lunch_ayce, dinner_ayce)
+        self.assertEqual(self._scalar("SELECT MIN(date(created_at)) FROM orders"), "2026-03-02")
+        self.assertEqual(self._scalar("SELECT MAX(date(created_at)) FROM orders"), "2026-03-29")
+
+    def test_order_totals_are_consistent(self):
+        mismatched = self._scalar("""
+            SELECT COUNT(*) FROM orders o
+            WHERE NOT o.ayce_order AND ABS(o.total_amount - (
+                SELECT SUM(oi.quantity * oi.unit_price) FROM order_items oi WHERE oi.order_id = o.id)) > 0.005
+        """)
+        self.assertEqual(mismatched, 0)
+        self.assertEqual(self._scalar(
+            "SELECT COUNT(*) FROM orders WHERE ayce_order AND total_amount < ayce_price * party_size - 0.005"), 0)
+        self.assertEqual(self._scalar(
+            "SELECT COUNT(*) FROM orders WHERE status = 'COMPLETED' AND completion_time IS NULL"), 0)
+
+    def test_deterministic_and_appends(self):
+        from generate_synthetic_data import generate
+        first = self._scalar("SELECT SUM(total_amount) FROM orders")
+        again = generate(self.engine, _spec(), batch_orders=500)
+        self.assertEqual(again["tenant_ids"], [2])
+        self.assertEqual(self._scalar("SELECT COUNT(DISTINCT id) FROM orders"), 6000)
+        self.assertEqual(self._scalar("SELECT SUM(total_amount) FROM orders WHERE tenant_id = 2"), first)
+
+    def test_dashboard_counters_reconciled(self):
+        from sqlalchemy.orm import Session
+        from app.services import dashboard_counters
+        with Session(bind=self.engine) as db:
+            counters = dashboard_counters.read(db, 1)
+        self.assertEqual(counters["total_orders"], 3000)
+        expected = Decimal(str(self._scalar("SELECT SUM(total_amount) FROM orders"))).quantize(Decimal("0.01"))
+        self.assertEqual(counters["total_revenue"], expected)
+
+    def test_daily_volumes(self):
+        import random
+        from datetime import timedelta
+        from generate_synthetic_data import daily_volumes
+        volumes = daily_volumes(random.Random(1), _spec(orders=50_000, days=70))
+        self.assertEqual(sum(volumes), 50_000)
+        spec = _spec(days=70)
+        by_weekday = [0] * 7
+        for d, n in enumerate(volumes):
+            by_weekday[(spec.start + timedelta(days=d)).weekday()] += n
+        self.assertEqual(by_weekday.index(max(by_weekday)), 5)  # Saturday
+        self.assertEqual(by_weekday.index(min(by_weekday)), 0)  # Monday
+
+
+class TestBenchHelpers(unittest.TestCase):
+
+    def test_call_endpoint_fills_query_defaults(self):
+        from bench_endpoints import call_endpoint
+        from fastapi import Depends, Query
+
+        def endpoint(window_days: int = Query(14), meal_period: str = Query(None), db=Depends(lambda: None)):
+            return window_days, meal_period, db
+
+        self.assertEqual(call_endpoint(endpoint, db="db"), (14, None, "db"))
+        with self.assertRaises(TypeError):
+            call_endpoint(endpoint)
+
+    def test_run_case_counts_statements(self):
+        from sqlalchemy.orm import sessionmaker
+        from bench_endpoints import CASES, run_case
+        from generate_synthetic_data import generate
+        engine = _engine()
+        generate(engine, _spec(orders=200), batch_orders=100)
+        case = next(c for c in CASES if c.name == "dashboard/stats")
+        result = run_case(case, sessionmaker(bind=engine), engine, 1, date(2026, 3, 1), date(2026, 3, 29), repeat=2)
+        engine.dispose()
+        self.assertIsNone(result.days)
+        self.assertLessEqual(result.queries, 2)  # counter row (+ timezone on a cold cache)
+        self.assertGreater(result.queries, 0)
+        self.assertLessEqual(result.best_ms, result.median_ms)
+
+    def test_compare_flags_regressions(self):
+        from bench_endpoints import Result, compare
+        results = [Result("summary", 30, 12.0, 13.0, 1), Result("drill", 30, 10.0, 10.0, 3), Result("new", 7, 1.0, 1.0, 1)]
+        baseline = [
+            {"case": "summary", "days": 30, "best_ms": 11.0, "queries": 1},
+            {"case": "drill", "days": 30, "best_ms": 10.0, "queries": 2},
+        ]
+        flags = [(r.case, flagged) for r, _, flagged in compare(results, baseline, threshold_pct=20)]
+        self.assertEqual(flags, [("summary", False), ("drill", True), ("new", False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for the bulk menu image importer (scripts/upload_menu_images.py).
+
+Coverage:
+  - extract_name_from_filename + ItemIndex.best_match: the most specific
+    item wins, run-together names match an item they contain, ties go to
+    the first item, names sharing no word (or too little of the file name)
+    are left unmatched
+  - Manifest + upload_all: a partial manifest resumes — unchanged files are
+    not re-sent, files changed on disk or for another item are
+  - apply_updates: only uploaded-but-unapplied files are written, old photos
+    released, and a second pass is a no-op
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+
+def _items(*names):
+    from app.models.menu import MenuItem
+    return [MenuItem(id=i, tenant_id=1, name=name) for i, name in enumerate(names, start=1)]
+
+
+class TestMatching(unittest.TestCase):
+
+    def _match(self, items, filename):
+        from upload_menu_images import ItemIndex, extract_name_from_filename
+        item = ItemIndex(items).best_match(extract_name_from_filename(filename))
+        return item.name if item else None
+
+    def test_most_specific_item_wins(self):
+        items = _items("Tuna Roll", "Spicy Tuna Roll", "Salmon Nigiri")
+        self.assertEqual(self._match(items, "spicy-tuna-roll-1200x800.jpg"), "Spicy Tuna Roll")
+        self.assertEqual(self._match(items, "Recipe_tuna_roll_2.jpg"), "Tuna Roll")
+
+    def test_run_together_name_matches_contained_item(self):
+        items = _items("Udon", "Shrimp Tempura", "Tuna Roll")
+        self.assertEqual(self._match(items, "nabeyakiudon.jpg"), "Udon")
+        # containment (+0.5) still beats a partial token overlap
+        self.assertEqual(self._match(items, "nabeyakiudon-tempura.jpg"), "Udon")
+
+    def test_ambiguous_name_goes_to_first_item(self):
+        # "salmon" scores the same against both; the earlier item is kept, every run
+        items = _items("Salmon Nigiri", "Salmon Sashimi")
+        self.assertEqual(self._match(items, "salmon.jpg"), "Salmon Nigiri")
+        self.assertEqual(self._match(list(reversed(items)), "salmon.jpg"), "Salmon Sashimi")
+
+    def test_missing_or_weak_match_is_unmatched(self):
+        items = _items("Miso Soup", "Edamame")
+        self.assertIsNone(self._match(items, "IMG_2041.jpg"))
+        # one shared word out of many is below the quality floor
+        self.assertIsNone(self._match(items, "grandmas famous weekend family style hot miso ramen bowl.jpg"))
+        self.assertIsNone(self._match([], "miso-soup.jpg"))
+
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.folder = self.dir.name
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            with open(os.path.join(self.folder, name), "wb") as f:
+                f.write(name.encode() * 10)
+        self.items = _items("Alpha", "Bravo", "Charlie")
+        self.plan = list(zip(("a.jpg", "b.jpg", "c.jpg"), self.items))
+        self.manifest_path = os.path.join(self.folder, ".manifest.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _stat(self, name):
+        return os.stat(os.path.join(self.folder, name))
+
+    def _upload(self, manifest):
+        import upload_menu_images
+        sent = []
+
+        def fake_upload(f, prefix, item_id, filename, content_type):
+            sent.append(filename)
+            return f"https://cdn/{filename}"
+
+        with patch.object(upload_menu_images, "upload_image", side_effect=fake_upload), patch("builtins.print"):
+            errors = upload_menu_images.upload_all(self.plan, self.folder, manifest, workers=2)
+        self.assertEqual(errors, [])
+        return sorted(sent)
+
+    def test_partial_manifest_resumes(self):
+        from upload_menu_images import Manifest
+        # a previous run uploaded a.jpg and b.jpg, then stopped
+        first = Manifest(self.manifest_path)
+        first.record("a.jpg", 1, self._stat("a.jpg"), "https://cdn/a-old")
+        first.record("b.jpg", 2, self._stat("b.jpg"), "https://cdn/b-old")
+        # b.jpg has since been replaced on disk
+        with open(os.path.join(self.folder, "b.jpg"), "wb") as f:
+            f.write(b"a different photo")
+
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual(self._upload(manifest), ["b.jpg", "c.jpg"])
+        self.assertEqual(manifest.uploaded_url("a.jpg", 1, self._stat("a.jpg")), "https://cdn/a-old")
+        self.assertEqual(Manifest(self.manifest_path).uploaded_url("b.jpg", 2, self._stat("b.jpg")), "https://cdn/b.jpg")
+        # the same file now matched to another item is a new upload
+        self.assertIsNone(manifest.uploaded_url("a.jpg", 3, self._stat("a.jpg")))
+
+    def test_apply_writes_only_unapplied_once(self):
+        import upload_menu_images
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import StaticPool
+        from upload_menu_images import Manifest
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE menu_items (id INTEGER PRIMARY KEY, tenant_id INTEGER, image_url TEXT)"))
+            conn.execute(text("INSERT INTO menu_items VALUES (1, 1, 'https://cdn/a-prev'), (2, 1, NULL), (3, 1, NULL)"))
+        self.items[0].image_url = "https://cdn/a-prev"
+
+        manifest = Manifest(self.manifest_path)
+        manifest.record("a.jpg", 1, self._stat("a.jpg"), "https://cdn/a.jpg")
+        manifest.record("b.jpg", 2, self._stat("b.jpg"), "https://cdn/b.jpg")
+        manifest.mark_applied(["b.jpg"])   # committed by the interrupted run
+
+        with patch.object(upload_menu_images, "engine", engine), \
+                patch.object(upload_menu_images, "delete_image") as released:
+            self.assertEqual(upload_menu_images.apply_updates(self.plan, self.folder, manifest), 1)
+            released.assert_called_once_with("https://cdn/a-prev")
+            self.assertEqual(upload_menu_images.apply_updates(self.plan, self.folder, manifest), 0)
+
+        with engine.connect() as conn:
+            urls = conn.execute(text("SELECT id, image_url FROM menu_items ORDER BY id")).all()
+        engine.dispose()
+        self.assertEqual([tuple(r) for r in urls], [(1, "https://cdn/a.jpg"), (2, None), (3, None)])
+        self.assertTrue(Manifest(self.manifest_path).is_applied("a.jpg", 1, self._stat("a.jpg")))
+
+
+if __name__ == "__main__":
+    unittest.main()